@@ -3,15 +3,28 @@ warnings.filterwarnings("ignore", message="Could not infer format.*")
 
 import streamlit as st
 import pandas as pd
-import requests, re, urllib.parse
+import numpy as np
+import re
+import urllib.parse
 from io import BytesIO
-from pathlib import Path
-import datetime
+import tempfile
+import requests
+
+from elc.config import DEBUG_TIMING, DEFAULT_STATE, FACILITIES_PATH, METRICS_PROM_PATH, SMTP_HOST
+from elc.contacts import memory_report
+from elc.dispatch import dispatch_config_error, dispatch_enabled, get_dispatch_queue, get_dispatcher
+from elc.export import iter_batch_packages, iter_package_files, package_drafts, safe_name, write_zip
+from elc.facilities import get_facility_index
+from elc.geocode import geocode_address, get_geocode_cache, get_geocode_scheduler
+from elc.httpclient import get_http_client
+from elc.normalize import with_state
+from elc.resolve import build_search_package, collect_results, read_sites, resolve_sites
+from elc.store import filter_positions, get_directory_registry
+from elc.tracing import Tracer, get_tracer
+from elc.tracking import STATUSES, get_request_tracker
 
 st.set_page_config(page_title="ELC Public Records Directory", layout="wide")
 
-DATA_PATH = Path(__file__).parent / "data" / "master.xlsx"
-
 # ---- Custom button colors ----
 st.markdown("""
 <style>
@@ -52,8 +65,10 @@ st.markdown("""
 
 
 
+get_tracer().begin()
+
 # ---------------------- NAV + STATE ----------------------
-PAGES = ["📒 Directory", "🧭 Jurisdiction Finder", "🔎 OCULUS Search"]
+PAGES = ["📒 Directory", "🧭 Jurisdiction Finder", "🗂️ Batch Finder", "📈 Request Tracking", "🔎 OCULUS Search"]
 
 # Router + form memory
 if "active_page" not in st.session_state:
@@ -72,403 +87,6 @@ if st.session_state._sync_nav:
     st.session_state.nav_choice = st.session_state.active_page
     st.session_state._sync_nav = False
 
-# =============== Hard-coded templates — ELC (current) ===============
-TEMPLATES = {
-    "building": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
-        "body": """{county} Building Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To whom it may concern:
-
-Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
-
-I am currently conducting a Phase I Environmental Site Assessment for the above property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Permit summary (date, type of permit, applicant/tenant) or available permits from construction to present. Upon review of a permit summary we may request review of individual permits.
-- Construction date (current building, previous buildings if applicable)
-- List of tenants which have occupied the subject property
-- Permits of environmental concern (petroleum storage tanks, septic systems, oil/water separators)
-- Oldest and most recent site layout plan from the above mentioned property if available
-- Erosion control plans on record for the subject property
-- Record violations or complaints registered against the subject property
-
-Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
-"""
-    },
-    "planning": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
-        "body": """{county} Planning Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To whom it may concern:
-
-Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
-
-I am currently conducting a Phase I Environmental Site Assessment for the above property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Record of any Activity Use Limitations (AULs) in connection with the property. An AUL is a legal or physical restriction or limitation on the use of, or access to, a site or facility. (1) to reduce or eliminate potential exposure to hazardous substances or petroleum products in the soil, soil vapor, groundwater, and/or surface water on the property, or (2) to prevent activities that could interfere with the effectiveness of a response action, in order to ensure maintenance of a condition of no significance risk to public health or the environment. These legal or physical restrictions, which may include institutional and/or engineering controls, are intended to prevent adverse impacts to individuals or populations that may be exposed to hazardous substances and petroleum products in the soil, soil vapor, groundwater, and/or surface water on a property. AULs are typically in place at sites which would prevent future uses of a property.
-- Subject property zoning and any current zoning violations.
-
-Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
-"""
-    },
-    "fire": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
-        "body": """{county} Fire Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To whom it may concern:
-
-Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
-
-I am currently conducting a Phase I Environmental Site Assessment for the above property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Records regarding hazardous materials usage/storage/incidents or fires at the property,
-- Records regarding aboveground or underground storage tank (UST) systems, which are currently or historically located at the property,
-- Records of fire inspections at the subject property.
-
-Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
-"""
-    },
-    "environmental": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
-        "body": """{county} Environmental Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To whom it may concern:
-
-Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
-
-I am currently conducting a Phase I Environmental Site Assessment for the property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for the following items:
-
-- Records regarding hazardous materials usage/storage/incidents or known environmental concerns/contamination which may have affected the property,
-- Records regarding aboveground or underground storage tank (UST) systems, which are currently or historically located at the property,
-- Record of septic systems installation and repairs at the subject property, and/or
-- Records of wells in connection with the subject property.
-
-Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
-"""
-    },
-    "all": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
-        "body": """{county} County Clerk
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To whom it may concern:
-
-Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property. ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-Building Department
-- Permit summary or available permits from construction to present. Upon review of a permit summary we may request review of individual permits. 
-- Construction date (current building, previous buildings if applicable) 
-- List of tenants which have occupied the subject property
-- Oldest and most recent site layout plan from the above mentioned property if available
-- Record violations or complaints registered against the subject property
-
-Planning Department
-- Record of any Activity Use Limitations (AULs) in connection with the property. AULs are typically in place at sites which would prevent future uses of a property.
-- Subject property zoning and any current zoning violations.
-
-Fire Department
-- Records regarding hazardous materials incidents or fires at the property.
-- Records of fire inspections at the subject property.
-
-Environmental Department
-- Records regarding hazardous materials usage/storage/incidents or known environmental concerns/contamination which may have affected the property,
-- Records regarding aboveground or underground storage tank (UST) systems, which are currently or historically located at the property,  
-- Record of septic systems installation and repairs at the subject property, and/or
-- Records of wells in connection with the subject property.
-
-"""
-    },
-}
-
-# =============== Hard-coded templates — AEI (placeholder; edit me) ===============
-# Keep the same keys so the app can swap seamlessly. Replace the bodies with AEI’s exact language.
-TEMPLATES_AEI = {
-    "building": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
-        "body": """{county} Building Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To Whom It May Concern:
-
-Please accept this request for any information/documentation/files with your department regarding the above-referenced subject property. 
-
-AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Available permits, licenses, and certificates of occupancy (including oldest historical records) OR permit summary (date, type of permit, applicant/tenant) 
-  (NOTE: upon review of a permit summary, we may request review of individual permits)
-- Construction date(s) [current building(s), and previous building(s) if applicable]
-- List of tenants which have occupied the subject property
-- Permits of environmental concern (e.g., petroleum storage tanks, septic systems, oil/water separators)
-- Oldest and most recent maps and site layout plan of the subject property (if available)
-- Records of any major environmental violations or significant complaints registered against the subject property
-
-Please indicate if older historical records have been archived and require additional fees for retrieval.
-"""
-    },
-    "planning": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
-        "body": """{county} Planning Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To Whom It May Concern:
-
-Please accept this request for any information/documentation/files with your department regarding the above-referenced subject property. 
-
-AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Building permit history (including recent, historical, and archived records);
-- Other relevant information regarding historical development and former use/occupancy at the subject property; and/or
-- Environmental property use limitations/restrictions related to contamination and/or other environmental conditions at the subject property (e.g., environmental deed restrictions, groundwater use restrictions, methane zones)
-"""
-    },
-    "fire": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
-        "body": """{county} Fire Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To Whom It May Concern:
-
-Please accept this request for any information/documentation/files with your department regarding the above-referenced property. 
-
-AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Records of fire inspections at the subject property; 
-- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
-- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
-- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property; and/or
-- Records of significant fires that may have used AFFF/Class B firefighting foams at the subject property.
-
-NOTE: we are interested in both current and historical records pertaining to the items listed above.
-"""
-    },
-    "environmental": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
-        "body": """{county} Environmental/Health Department
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To Whom It May Concern:
-
-Please accept this request for any information/documentation/files with your department regarding the above-referenced property. 
-
-AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
-- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
-- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property;
-- Records of violations or corrective actions;
-- Records of septic system installations and repairs at the subject property; 
-- Records of wells in connection with the subject property; and/or
-- Environmental permits (wastewater discharges and/or air emissions) and the most recent associated effluent/emission sampling.
-
-NOTE: we are interested in both current and historical records pertaining to the items listed above.
-"""
-    },
-    "all": {
-        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
-        "body": """{county} County/City Clerk
-
-Address: {address}
-Parcel ID#: {apn}
-Project No. {project}
-
-To whom it may concern:
-
-Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property. ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
-
-Building Department
-- Available permits, licenses, and certificates of occupancy (including oldest historical records) OR permit summary (date, type of permit, applicant/tenant) 
-  (NOTE: upon review of a permit summary, we may request review of individual permits)
-- Construction date(s) [current building(s), and previous building(s) if applicable]
-- List of tenants which have occupied the subject property
-- Permits of environmental concern (e.g., petroleum storage tanks, septic systems, oil/water separators)
-- Oldest and most recent maps and site layout plan of the subject property (if available)
-- Records of any major environmental violations or significant complaints registered against the subject property
-
-Planning Department
-- Environmental property use limitations/restrictions related to contamination and/or other environmental conditions at the subject property (e.g., environmental deed restrictions, groundwater use restrictions, methane zones)
-- Subject property zoning and any current zoning violations.
-
-Fire Department
-- Records of fire inspections at the subject property; 
-- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
-- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
-- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property; and/or
-- Records of significant fires that may have used AFFF/Class B firefighting foams at the subject property.
-
-Environmental Department
-- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
-- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
-- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property;
-- Records of violations or corrective actions;
-- Records of septic system installations and repairs at the subject property; 
-- Records of wells in connection with the subject property; and/or
-- Environmental permits (wastewater discharges and/or air emissions) and the most recent associated effluent/emission sampling.
-
-"""
-    },
-}
-
-# Group for easy switching
-TEMPLATE_SETS = {"ELC": TEMPLATES, "AEI": TEMPLATES_AEI}
-
-# =============== Helpers ===============
-def norm_county(val: str) -> str:
-    if not isinstance(val, str): return ""
-    v = val.strip().lower()
-    v = re.sub(r"\s+county\b.*", "", v)
-    v = v.replace("saint", "st").replace(".", "").strip()
-    return v
-
-def norm_city(val: str) -> str:
-    if not isinstance(val, str): return ""
-    v = val.strip().lower()
-    v = v.replace("saint", "st").replace(".", "").strip()
-    return v
-
-@st.cache_data
-def load_contacts(path: Path) -> pd.DataFrame:
-    xl = pd.ExcelFile(path)
-    lower_map = {name.strip().lower(): name for name in xl.sheet_names}
-    for candidate in ("contacts", "contact", "directory", "master", "data", "sheet1"):
-        if candidate in lower_map:
-            sheet = lower_map[candidate]; break
-    else:
-        sheet = xl.sheet_names[0]
-        st.info(f"Using sheet '{sheet}' (no sheet named 'contacts' found).")
-
-    df = xl.parse(sheet).copy()
-    df.columns = [c.strip() for c in df.columns]
-
-    rename_pairs = {
-        "County": ["County"],
-        "City": ["City", "Municipality", "Municipality / City", "Municipality/City"],
-        "Dept Type": ["Dept Type", "Department Type", "Dept"],
-        "Dept Name": ["Dept Name", "Department Name"],
-        "Contact": ["Contact", "Contact Person"],
-        "Title/Role": ["Title/Role", "Title", "Role"],
-        "Phone": ["Phone", "Phone Number"],
-        "Email": ["Email", "Emails"],
-        "Portal URL": ["Portal URL", "Portal", "Public Records Portal", "Records Portal"],
-        "Preferred Method": ["Preferred Method", "Method"],
-        "Notes": ["Notes", "Note"],
-        "Verified": ["Verified"],
-        "Date Verified": ["Date Verified", "Verified Date", "Date Verified (YYYY-MM-DD)"],
-    }
-
-    rename_map = {}
-    for std, alts in rename_pairs.items():
-        for alt in alts:
-            if alt in df.columns:
-                rename_map[alt] = std; break
-    df = df.rename(columns=rename_map)
-
-    required = ["County", "City", "Dept Type", "Dept Name"]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        st.error(
-            "Your workbook is missing required columns: "
-            f"{missing}. Found: {list(df.columns)}"
-        )
-        return pd.DataFrame(columns=required + [
-            "Contact","Title/Role","Phone","Email","Portal URL",
-            "Preferred Method","Notes","Verified","Date Verified"
-        ])
-
-    df = df.fillna("")
-    df["_n_county"] = df["County"].astype(str).map(norm_county)
-    df["_n_city"]   = df["City"].astype(str).map(norm_city)
-    df["_n_dept"]   = df["Dept Type"].astype(str).str.strip().str.lower()
-    return df
-
-def geocode_address(addr: str):
-    url = "https://geocoding.geo.census.gov/geocoder/locations/onelineaddress"
-    params = {"address": addr, "benchmark": "Public_AR_Current", "format": "json"}
-    r = requests.get(url, params=params, timeout=12)
-    r.raise_for_status()
-    data = r.json()
-    matches = data.get("result", {}).get("addressMatches", [])
-    if not matches: return None, "No geocoder match"
-    m = matches[0]
-    comps = m.get("addressComponents", {})
-    geog = m.get("geographies", {})
-    county = ""
-    if geog:
-        for k in ["Counties","County"]:
-            if k in geog and geog[k]:
-                county = geog[k][0].get("NAME", county)
-    if not county:
-        county = comps.get("county","")
-    city = comps.get("city") or comps.get("municipality") or ""
-    return {"city": city, "county": county, "state": comps.get("state","FL")}, None
-
-def match_contacts(contacts, county, city):
-    ncounty, ncity = norm_county(county), norm_city(city)
-    in_county = contacts[contacts["_n_county"] == ncounty]
-    exact     = in_county[in_county["_n_city"] == ncity]
-    uninc     = in_county[in_county["_n_city"] == "unincorporated"]
-    wildcard  = in_county[in_county["_n_city"] == "*"]
-    if not exact.empty:
-        return pd.concat([exact, wildcard], ignore_index=True).drop_duplicates(), True
-    if not uninc.empty:
-        return pd.concat([uninc, wildcard], ignore_index=True).drop_duplicates(), False
-    if not wildcard.empty:
-        return wildcard, False
-    return contacts.iloc[0:0], False
-
-def split_by_dept(df):
-    out = {}
-    for dep in ["building","planning","environmental","fire"]:
-        out[dep] = df[df["_n_dept"]==dep]
-    return out
-
-def email_list(df):
-    ems = []
-    if "Email" in df.columns:
-        for v in df["Email"].astype(str).tolist():
-            if v.strip():
-                ems += [p.strip() for p in v.split(",") if p.strip()]
-    return sorted(set(ems))
-
-def portal_urls(df):
-    if "Portal URL" not in df.columns: return []
-    urls = [str(u).strip() for u in df["Portal URL"].tolist() if str(u).strip()]
-    seen=set(); out=[]
-    for u in urls:
-        if u not in seen:
-            out.append(u); seen.add(u)
-    return out
-
 def _oculus_base_url() -> str:
     base = "https://depedms.dep.state.fl.us/Oculus/servlet/lookupUtility"
     params = {
@@ -479,60 +97,13 @@ def _oculus_base_url() -> str:
     }
     return f"{base}?{urllib.parse.urlencode(params)}"
 
-# ---- Miami-Dade folio (APN) → municipality code map ----
-MIAMI_DADE_CODES = {
-    "01": "Miami",
-    "02": "Miami Beach",
-    "03": "Coral Gables",
-    "04": "Hialeah",
-    "05": "Miami Springs",
-    "06": "North Miami",
-    "07": "North Miami Beach",
-    "08": "Opa-locka",
-    "09": "South Miami",
-    "10": "Homestead",
-    "11": "Miami Shores",
-    "12": "Bal Harbour",
-    "13": "Bay Harbor Island",
-    "14": "Surfside",
-    "15": "West Miami",
-    "16": "Florida City",
-    "17": "Biscayne Park",
-    "18": "El Portal",
-    "19": "Golden Beach",
-    "20": "Pinecrest",
-    "21": "Indian Creek",
-    "22": "Medley",
-    "23": "North Bay Village",
-    "24": "Key Biscayne",
-    "25": "Sweetwater",
-    "26": "Virginia Gardens",
-    "27": "Hialeah Gardens",
-    "28": "Aventura",
-    "29": "Islandia",
-    "30": "Unincorporated",
-    "31": "Sunny Isles Beach",
-    "32": "Miami Lakes",
-    "33": "Palmetto Bay",
-    "34": "Miami Gardens",
-    "35": "Doral",
-    "36": "Cutler Bay",
-}
-
-def _mdc_prefix_from_apn(apn: str) -> str | None:
-    """Return the first two digits of a Miami-Dade APN (folio) or None."""
-    if not isinstance(apn, str):
-        return None
-    digits = re.sub(r"\D", "", apn)
-    return digits[:2] if len(digits) >= 2 else None
-
-def _mdc_expected_city_from_apn(apn: str) -> str | None:
-    """Return expected municipality name from APN prefix, or None if unknown."""
-    code = _mdc_prefix_from_apn(apn)
-    return MIAMI_DADE_CODES.get(code) if code else None
-
 # =======================================================
-contacts = load_contacts(DATA_PATH)
+registry = get_directory_registry()               # per-state directories, each loaded on first use
+directory = registry.current(DEFAULT_STATE)       # one consistent view per rerun
+contacts = directory.contacts
+
+for level, msg in directory.notices:
+    getattr(st, level)(msg)
 
 # ---------------------- NAV BAR ------------------------
 st.title("ELC Public Records Directory")
@@ -546,134 +117,149 @@ st.radio(
 st.session_state.active_page = st.session_state.nav_choice
 
 # ---------------------- PAGES --------------------------
+DIRECTORY_COLUMNS = ["County","City","Dept Type","Dept Name","Contact","Title/Role","Phone","Email","Portal URL","Preferred Method","Notes","Verified","Date Verified"]
+DIRECTORY_PAGE_SIZES = [50, 100, 250, 500]
+
 def page_directory():
     st.subheader("Directory")
+    shown = directory
+    states = registry.states()
+    if len(states) > 1:
+        state = st.selectbox("State", states, index=states.index(DEFAULT_STATE))
+        if state != DEFAULT_STATE:
+            with st.spinner(f"Loading the {state} directory..."):
+                shown = registry.current(state)
+            for level, msg in shown.notices:
+                getattr(st, level)(msg)
+    contacts, facets = shown.contacts, shown.facets
     c1, c2, c3 = st.columns(3)
     with c1:
-        counties = ["(All)"] + sorted(contacts["County"].unique().tolist())
-        f_county = st.selectbox("County", counties)
+        f_county = st.selectbox("County", ["(All)"] + facets["counties"])
     with c2:
         if f_county != "(All)":
-            cities = ["(All)"] + sorted(contacts[contacts["County"]==f_county]["City"].unique().tolist())
+            cities = ["(All)"] + facets["cities_in"].get(f_county, [])
         else:
-            cities = ["(All)"] + sorted(contacts["City"].unique().tolist())
+            cities = ["(All)"] + facets["cities"]
         f_city = st.selectbox("City/Municipality", cities)
     with c3:
-        dept_types = ["(All)"] + sorted(contacts["Dept Type"].str.capitalize().unique().tolist())
-        f_dept = st.selectbox("Department Type", dept_types)
-
-    filtered = contacts.copy()
-    if f_county != "(All)": filtered = filtered[filtered["County"]==f_county]
-    if f_city != "(All)": filtered = filtered[filtered["City"]==f_city]
-    if f_dept != "(All)": filtered = filtered[filtered["Dept Type"].str.capitalize()==f_dept]
+        f_dept = st.selectbox("Department Type", ["(All)"] + facets["dept_types"])
+    query = st.text_input("Search", placeholder="e.g. broward fire marshal portal",
+                          help="Searches department, contact, title, email, city and notes; tolerates typos.")
+
+    pos = filter_positions(facets, len(contacts), f_county, f_city, f_dept)
+    if query.strip():
+        # Rank inside the filtered rows, uncapped: pagination below shows every match
+        pos = np.asarray(shown.search.search(query, limit=None, within=pos), dtype=np.int64)
+    cols = [c for c in DIRECTORY_COLUMNS if c in contacts.columns]
+
+    n = len(pos)
+    p1, p2, p3 = st.columns([1, 1, 4])
+    with p1:
+        size = st.selectbox("Rows per page", DIRECTORY_PAGE_SIZES, index=1)
+    pages = max(1, -(-n // size))
+    with p2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"dir_page_{f_county}_{f_city}_{f_dept}_{size}_{query}")   # new filter -> page 1
+    start = (int(page) - 1) * size
+    with p3:
+        st.caption(f"Showing {min(start + 1, n)}–{min(start + size, n)} of {n} contacts")
+    st.dataframe(contacts.iloc[pos[start:start + size]][cols], use_container_width=True, height=460,
+                 column_config={"Date Verified": st.column_config.DateColumn(format="YYYY-MM-DD")})
+
+SEARCH_MEMO_SIZE = 16   # computed search packages kept per session
+
+def render_search_package(pkg, project_type):
+    for level, msg in pkg["notices"]:
+        getattr(st, level)(msg)
+    if not pkg["sections"]:
+        return
+
+    bodies = {}
+    for sec in pkg["sections"]:
+        st.subheader(sec["label"])
+        if sec["table"] is None:
+            st.info("No contact configured in your workbook.")
+            continue
+        st.dataframe(sec["table"], use_container_width=True)
+
+        st.markdown('<div class="portalScope">', unsafe_allow_html=True)
+        for url in sec["portals"]:
+            st.link_button("Open Portal", url)
+        st.markdown('</div>', unsafe_allow_html=True)
 
-    cols = [c for c in ["County","City","Dept Type","Dept Name","Contact","Title/Role","Phone","Email","Portal URL","Preferred Method","Notes","Verified","Date Verified"] if c in filtered.columns]
-    st.dataframe(filtered[cols], use_container_width=True, height=460)
+        d = sec["draft"]
+        if d:
+            st.markdown("**Subject:** " + d["subject"])
+            bodies[sec["key"]] = st.text_area("Email body", d["body"], height=260, key=f"{project_type}_body_{sec['key']}")
+            if d["emails"]:
+                st.code(", ".join(d["emails"]))
+
+    st.subheader("All-in-one Email")
+    d = pkg["all"]
+    if d:
+        st.markdown("**Subject:** " + d["subject"])
+        bodies["all"] = st.text_area("Email body (all depts)", d["body"], height=260, key=f"{project_type}_body_all")
+        if d["emails"]:
+            st.code(", ".join(d["emails"]))
+        else:
+            st.info("No emails found to send an all-in-one request for this jurisdiction.")
+
+    # Edited bodies go into the export, not the original template text; the ZIP
+    # is only built when the button is clicked, not on every rerun
+    if st.download_button("Download drafts (.eml, ZIP)", lambda: drafts_zip(pkg, bodies),
+                          file_name=f"{safe_name(pkg.get('project', ''), 'requests')}.zip", mime="application/zip"):
+        get_request_tracker().log_package(pkg, project_type)   # issued, not just looked up
+    if dispatch_enabled():
+        render_dispatch(pkg, bodies, project_type)
+    elif SMTP_HOST:
+        st.warning(f"Email sending is off: {dispatch_config_error()}.")
+
+def drafts_zip(pkg, bodies) -> bytes:
+    buf = BytesIO()
+    write_zip(iter_package_files([("drafts", pkg, bodies)]), buf)
+    return buf.getvalue()
+
+def render_dispatch(pkg, bodies, project_type):
+    """Opt-in sending (ELC_SMTP_HOST + ELC_MAIL_FROM): queue the drafts as edited, then send what is due."""
+    st.subheader("Send")
+    which = st.radio("Send", ["One email per department", "All-in-one email"], horizontal=True,
+                     label_visibility="collapsed", key=f"{project_type}_send_mode")
+    drafts = [d for d in package_drafts(pkg, bodies)
+              if d["emails"] and (d["key"] == "all") == (which == "All-in-one email")]
+    if not drafts:
+        st.info("No recipients to send to.")
+        return
+    if st.button(f"Queue & send {len(drafts)} email(s)", key=f"{project_type}_send"):
+        queue, tracker = get_dispatch_queue(), get_request_tracker()
+        tracker.log_package(pkg, project_type)     # rows turn "sent" / "failed" as the outbox settles them
+        new = sum(queue.enqueue(d, track=tracker.dispatch_track(pkg, project_type, d))[1] for d in drafts)
+        if new < len(drafts):
+            st.info(f"{len(drafts) - new} of these were already queued or sent; they won't be sent again.")
+        with st.spinner("Sending..."):
+            out = get_dispatcher().send_due()
+        msg = f"Sent {out['sent']}; {out['deferred'] + out['retry']} waiting in the queue; {out['failed']} failed."
+        (st.warning if out["failed"] else st.success)(msg)
+    st.caption(f"Outbox: {get_dispatch_queue().stats()} · waiting messages go out on the next send "
+               "or with `python -m elc dispatch --drain`")
 
 def _run_and_render_search(addr, county_override, municipality_override, apn, project, project_type):
-    if not addr.strip():
-        st.error("Address is required."); return
-
-    # Pick template set by project type
-    templates = TEMPLATE_SETS.get(project_type, TEMPLATES)
-
-    with st.spinner("Geocoding & matching..."):
-        info, err = geocode_address(addr + ", FL")
-        if err and not county_override.strip() and not municipality_override.strip():
-            st.error(err); return
-        geocoded_city = (info or {}).get("city", "")
-        geocoded_county = (info or {}).get("county", "")
-        final_city = (municipality_override or "").strip() or geocoded_city
-        final_county = (county_override or "").strip() or geocoded_county
-        if not final_county:
-            st.error("Could not determine county. Please provide a county override."); return
-
-        st.success(f"Using jurisdiction: {final_city or '(unincorporated)'} — {final_county} · Project type: {project_type}")
-
-        # ---- Miami-Dade APN prefix → municipality validation ----
-        county_norm = norm_county(final_county)
-        if county_norm in {"miami-dade", "miami dade", "miamidade"}:
-            expected_city = _mdc_expected_city_from_apn(apn)
-            if expected_city:
-                entered_city_norm = norm_city(final_city) or "unincorporated"
-                expected_norm = norm_city("unincorporated" if expected_city.lower() == "unincorporated"
-                                          else expected_city)
-
-                msg_prefix = f"APN prefix **{_mdc_prefix_from_apn(apn)}** → **{expected_city}**"
-                if entered_city_norm != expected_norm:
-                    st.warning(
-                        f"{msg_prefix}. You entered **{final_city or 'Unincorporated'}**. "
-                        "Please double-check which jurisdiction to contact."
-                    )
-                else:
-                    st.info(f"{msg_prefix}. ✅ APN and municipality are consistent.")
-            else:
-                if not apn.strip():
-                    st.info("Enter an APN to validate the Miami-Dade municipality from the folio prefix.")
-                else:
-                    st.info("Couldn’t read a Miami-Dade municipality from this APN. Check the folio format.")
-
-        matched, _ = match_contacts(contacts, final_county, final_city)
-        if matched.empty:
-            st.warning("No contacts configured yet for this jurisdiction."); return
-
-        depts = split_by_dept(matched)
-        ctx = {"address": addr, "city": final_city, "county": final_county, "apn": apn, "project": project}
-
-
-        for dep_key, dep_label in [("building","Building"),("planning","Planning"),("environmental","Environmental"),("fire","Fire")]:
-            st.subheader(dep_label)
-            df = depts.get(dep_key, pd.DataFrame())
-            if df.empty:
-                st.info("No contact configured in your workbook.")
-                continue
-            show = ["County","City","Dept Type","Dept Name","Contact","Email","Portal URL","Preferred Method","Notes"]
-            show = [c for c in show if c in df.columns]
-            st.dataframe(df[show], use_container_width=True)
-
-            st.markdown('<div class="portalScope">', unsafe_allow_html=True)
-            for url in portal_urls(df):
-                st.link_button("Open Portal", url)
-            st.markdown('</div>', unsafe_allow_html=True)
-
-            tpl = templates.get(dep_key)
-            if tpl:
-                subj = tpl["subject"]
-                body = tpl["body"].format(**ctx)
-                st.markdown("**Subject:** " + subj)
-                st.text_area("Email body", body, height=260, key=f"{project_type}_body_{dep_key}")
-                emails = email_list(df)
-                if emails:
-                    st.code(", ".join(emails))
-
-        dept_emails_map = {
-            "building": email_list(depts.get("building", pd.DataFrame())),
-            "planning": email_list(depts.get("planning", pd.DataFrame())),
-            "environmental": email_list(depts.get("environmental", pd.DataFrame())),
-            "fire": email_list(depts.get("fire", pd.DataFrame())),
-        }
-        all_emails = sorted({e for lst in dept_emails_map.values() for e in lst})
-
-        ctx_all = dict(ctx)
-        ctx_all.update({
-            "building_emails": ", ".join(dept_emails_map["building"]),
-            "planning_emails": ", ".join(dept_emails_map["planning"]),
-            "environmental_emails": ", ".join(dept_emails_map["environmental"]),
-            "fire_emails": ", ".join(dept_emails_map["fire"]),
-            "all_emails": ", ".join(all_emails),
-        })
-
-        st.subheader("All-in-one Email")
-        tpl_all = templates.get("all")
-        if tpl_all:
-            subj_all = tpl_all["subject"]
-            body_all = tpl_all["body"].format(**ctx_all)
-            st.markdown("**Subject:** " + subj_all)
-            st.text_area("Email body (all depts)", body_all, height=260, key=f"{project_type}_body_all")
-            if all_emails:
-                st.code(", ".join(all_emails))
-            else:
-                st.info("No emails found to send an all-in-one request for this jurisdiction.")
+    """Compute the package on the first run of a search; later reruns (typing in a
+    draft, nav clicks) redraw it from session state without geocoding again."""
+    key = (addr, county_override, municipality_override, apn, project, project_type)
+    memo = st.session_state.setdefault("search_memo", {})
+    pkg = memo.get(key)
+    if pkg is not None and pkg.get("stamp") != registry.stamp(pkg.get("state")):
+        pkg = None                 # that state's directory was reloaded (or evicted) since
+    if pkg is None:
+        with st.spinner("Geocoding & matching..."):
+            pkg = build_search_package(registry, addr, county_override, municipality_override,
+                                       apn, project, project_type)
+        pkg["stamp"] = registry.stamp(pkg.get("state"))
+        if not pkg.get("transient"):
+            while len(memo) >= SEARCH_MEMO_SIZE:
+                memo.pop(next(iter(memo)))
+            memo[key] = pkg
+    render_search_package(pkg, project_type)
 
 def page_jurisdiction():
     st.subheader("Jurisdiction Finder")
@@ -720,19 +306,211 @@ def page_jurisdiction():
             ps.get("project_type", "ELC"),
         )
 
+    with st.expander("Geocoder status"):
+        st.json({"http": get_http_client().metrics(), "cache": get_geocode_cache().stats(),
+                 "scheduler": get_geocode_scheduler().metrics(), "directories": registry.metrics()})
+
+def page_batch():
+    st.subheader("Batch Jurisdiction Finder")
+    up = st.file_uploader("Sites (CSV or XLSX)", type=["csv", "xlsx", "xls"],
+                          help="Columns: Address (required), APN, Project; optional County / City overrides.")
+    project_type = st.radio("Project type", options=["ELC", "AEI"], horizontal=True, key="batch_project_type")
+    use_census_batch = st.checkbox("Pre-geocode with the Census batch service", value=True,
+                                   help="One bulk request per 10,000 rows; rows it can't settle are geocoded individually.")
+    if up is None:
+        st.session_state.pop("batch_results", None)
+        return
+
+    sites = read_sites(up.name, up.getvalue())
+    if sites.empty:
+        st.error("No rows with an address found in this file."); return
+    st.caption(f"{len(sites)} site(s) loaded from **{up.name}**.")
+
+    progress = st.progress(0.0)
+    table = st.empty()
+    if st.button("Resolve all", type="primary"):
+        if use_census_batch:
+            progress.progress(0.0, text=f"Batch geocoding {len(sites)} address(es)...")
+        rows = []
+        resolved = resolve_sites(registry, sites, census_batch=use_census_batch, on_census_progress=lambda done, total:
+                                 progress.progress(0.0, text=f"Batch geocoded {done}/{total} unique address(es)"))
+        for done, row in enumerate(resolved, start=1):
+            rows.append(row)
+            progress.progress(done / len(sites), text=f"{done}/{len(sites)} resolved")
+            table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.session_state.batch_results = collect_results(rows)
+
+    results = st.session_state.get("batch_results")
+    if results is None:
+        return
+    progress.progress(1.0, text=f"{len(results)}/{len(results)} resolved")
+    table.dataframe(results, use_container_width=True, hide_index=True)
+    st.download_button("Download results (CSV)", results.to_csv(index=False).encode("utf-8"),
+                       file_name="jurisdictions.csv", mime="text/csv")
+
+    if st.button("Build request packages (.eml, ZIP)"):
+        # Sites -> packages -> .eml -> ZIP on disk, one draft at a time, so memory stays
+        # flat while the ZIP is built. Serving it still hands the finished file to
+        # Streamlit's media store, which holds the whole ZIP in memory for the session.
+        status = st.empty()
+        with tempfile.TemporaryFile() as tmp:
+            packages = get_request_tracker().logged(iter_batch_packages(registry, results, project_type), project_type)
+            n = write_zip(iter_package_files(packages), tmp,
+                          on_file=lambda i, name: status.caption(f"{i} drafts · {name}"))
+            tmp.seek(0)
+            status.caption(f"{n} drafts packaged.")
+            st.download_button("Download request packages", tmp, file_name="request-packages.zip",
+                               mime="application/zip")
+
+    # Open any row as a normal single search (same drafts/portals as the Finder)
+    ok = results[results["Status"] == "OK"]
+    if not ok.empty:
+        pick = st.selectbox("Open site in Jurisdiction Finder", ok["#"].tolist(),
+                            format_func=lambda n: f"{n}. {results.loc[results['#'] == n, 'Address'].iloc[0]}")
+        if st.button("Open drafts"):
+            r = results.loc[results["#"] == pick].iloc[0]
+            st.session_state.pending_search = {
+                "addr": r["Address"],
+                "county_override": r["County"],
+                "municipality_override": r["City"],
+                "apn": r["APN"],
+                "project": r["Project"],
+                "project_type": project_type,
+            }
+            st.session_state.active_page = "🧭 Jurisdiction Finder"
+            st.session_state._sync_nav = True
+            st.rerun()
+
+TRACKING_PAGE_SIZE = 100
+
+def page_tracking():
+    st.subheader("Request Tracking")
+    tracker = get_request_tracker()
+    facets = tracker.facets()
+    c1, c2, c3, c4, c5 = st.columns(5)
+    filters = {
+        "project": c1.selectbox("Project", ["(All)"] + facets["projects"]),
+        "county": c2.selectbox("County", ["(All)"] + facets["counties"], key="trk_county"),
+        "dept": c3.selectbox("Department", ["(All)"] + facets["depts"]),
+        "status": c4.selectbox("Status", ["(All)"] + STATUSES),
+        "project_type": c5.selectbox("Project type", ["(All)", "ELC", "AEI"]),
+        "address": st.text_input("Site address", help="Matched on the normalized address."),
+    }
+    # Applied before the tables below are read, so they already show the change
+    with st.form("trk_update"):
+        u1, u2 = st.columns([3, 1])
+        ids = u1.text_input("Request IDs", placeholder="e.g. 12, 13, 20")
+        status = u2.selectbox("Set status", STATUSES, index=STATUSES.index("responded"))
+        if st.form_submit_button("Update"):
+            wanted = [int(v) for v in re.findall(r"\d+", ids)]
+            n = tracker.set_status(wanted, status) if wanted else 0
+            st.success(f"{n} request(s) marked {status}.")
+    by = st.radio("Summarize by", ["county", "dept"], horizontal=True, format_func=str.title)
+    summary = tracker.summary(filters, by)
+    if not summary:
+        if tracker.count():
+            st.info("No requests match these filters.")
+        else:
+            st.info("No requests logged yet. A request is recorded here when its package is downloaded, "
+                    "queued for sending or exported.")
+        return
+    st.dataframe(pd.DataFrame(summary).drop(columns="key").rename(
+                     columns={"label": by.title(), "median_days": "Median days to response"}),
+                 use_container_width=True, hide_index=True)
+
+    total = tracker.count(filters)
+    pages = max(1, -(-total // TRACKING_PAGE_SIZE))
+    p1, p2 = st.columns([1, 5])
+    page = p1.number_input("Page", min_value=1, max_value=pages, value=1, step=1,
+                           key="trk_page_" + "_".join(str(v) for v in filters.values()))   # new filter -> page 1
+    start = (int(page) - 1) * TRACKING_PAGE_SIZE
+    rows = tracker.query(filters, limit=TRACKING_PAGE_SIZE, offset=start)
+    p2.caption(f"Showing {min(start + 1, total)}–{min(start + TRACKING_PAGE_SIZE, total)} of {total:,} requests")
+    log = pd.DataFrame(rows)
+    for col in ("created", "sent_at", "responded_at"):
+        log[col] = pd.to_datetime(log[col], unit="s")
+    st.dataframe(log, use_container_width=True, hide_index=True,
+                 column_config={c: st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm")
+                                for c in ("created", "sent_at", "responded_at")})
+
+
+FACILITY_COLUMNS = ["Distance (mi)", "Facility-Site ID", "Name", "Address", "City", "County", "Program"]
+
+def render_nearby_facilities():
+    """Ranked DEP facilities around a property, from the local extract (ELC_DEP_FACILITIES)."""
+    facilities = get_facility_index()
+    if facilities is None:
+        st.info("Add a DEP facility extract (Facility-Site ID, name, latitude, longitude) at "
+                f"`{FACILITIES_PATH}` to list the nearest OCULUS facilities for an address.")
+        return
+    ps = st.session_state.pending_search or {}
+    with st.form("oculus_nearby"):
+        addr = st.text_input("Property address", value=ps.get("addr", ""),
+                             placeholder="e.g., 17520 Rockefeller Circle, Fort Myers, FL 33967")
+        c1, c2 = st.columns(2)
+        k = c1.number_input("Facilities", min_value=1, max_value=100, value=10, step=1)
+        radius = c2.number_input("Within (miles)", min_value=0.1, max_value=50.0, value=1.0, step=0.25)
+        submitted = st.form_submit_button("Find nearby facilities")
+    if not submitted or not addr.strip():
+        st.caption(f"{len(facilities):,} facilities in the local extract.")
+        return
+    try:
+        info, err = geocode_address(with_state(addr, "FL"))          # OCULUS covers Florida only
+    except requests.RequestException as e:
+        st.error(f"The Census geocoder is not responding ({e})."); return
+    if err or info.get("lat") is None:
+        st.error(err or "The geocoder returned no coordinates for this address."); return
+    near = facilities.nearest(info["lat"], info["lon"], int(k), float(radius))
+    if near.empty:
+        st.info(f"No DEP facilities within {radius:g} mi of {addr}."); return
+    st.dataframe(near[[c for c in FACILITY_COLUMNS if c in near.columns]], use_container_width=True, hide_index=True)
+    st.caption("Copy a Facility-Site ID into the OCULUS search form:")
+    st.code("\n".join(near["Facility-Site ID"]))
+
 def page_oculus():
     st.subheader("Florida DEP — OCULUS Quick Search")
     st.link_button("Open OCULUS Search", _oculus_base_url())
+    render_nearby_facilities()
     with st.expander("Open OCULUS inside the app"):
         st.components.v1.iframe(_oculus_base_url(), height=620, scrolling=True)
     st.caption("Note: OCULUS doesn’t accept those field values via URL. "
-               "Use the ‘Copy to OCULUS’ boxes above to paste Address and County into the OCULUS form, then click **Search**.")
+               "Paste a Facility-Site ID from the list above (or the Address and County) into the OCULUS form, "
+               "then click **Search**.")
+
+def render_timing_panel(tracer: Tracer):
+    spans = [s_ for s_ in tracer.collected() if s_["ms"] is not None]
+    with st.expander("⏱ Timing (this rerun)"):
+        if spans:
+            st.dataframe(pd.DataFrame([{"span": "  " * s_["depth"] + s_["span"], "start ms": round(s_["start_ms"], 1),
+                                        "ms": round(s_["ms"], 2)} for s_ in spans]),
+                         use_container_width=True, hide_index=True)
+        c1, c2 = st.columns(2)
+        c1.download_button("Histograms (Prometheus)", tracer.prometheus(), file_name="elc_metrics.prom",
+                           mime="text/plain")
+        c2.download_button("Histograms (JSON lines)", tracer.jsonl(), file_name="elc_metrics.jsonl",
+                           mime="application/json")
+
+def render_memory_panel(df: pd.DataFrame):
+    rep = memory_report(df)
+    with st.expander(f"🧠 Memory (contacts: {len(df):,} rows, {rep['bytes'].sum() / 1e6:.2f} MB)"):
+        st.dataframe(rep, use_container_width=True, hide_index=True)
 
 # ---------------------- ROUTER -------------------------
 page = st.session_state.active_page
-if page == "📒 Directory":
-    page_directory()
-elif page == "🧭 Jurisdiction Finder":
-    page_jurisdiction()
-else:
-    page_oculus()
+with get_tracer().span(f"page {page}"):
+    if page == "📒 Directory":
+        page_directory()
+    elif page == "🧭 Jurisdiction Finder":
+        page_jurisdiction()
+    elif page == "🗂️ Batch Finder":
+        page_batch()
+    elif page == "📈 Request Tracking":
+        page_tracking()
+    else:
+        page_oculus()
+
+if DEBUG_TIMING or st.query_params.get("debug") == "1":
+    render_timing_panel(get_tracer())
+    render_memory_panel(contacts)
+get_tracer().write_prometheus(METRICS_PROM_PATH)
+
@@ -0,0 +1,46 @@
+"""Cold start: parsing master.xlsx vs loading the pickled snapshot.
+
+    python bench/bench_cold_start.py [SYNTHETIC_ROWS]
+
+Times both paths on a copy of data/master.xlsx and on a synthetic workbook
+(default 20k rows), in a temp dir so the real data/ folder is untouched.
+"""
+import shutil, sys, tempfile, time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from elc import contacts  # noqa: E402
+from elc.config import DATA_PATH  # noqa: E402
+from synth import write_workbook  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+
+def best_of(fn, n=3):
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter(); out = fn(); best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def report(label: str, wb: Path):
+    contacts._snapshot_path(wb).unlink(missing_ok=True)
+    t_parse, df = best_of(lambda: contacts.parse_contacts_workbook(wb), n=1)
+    contacts.write_contacts_snapshot(wb, df)
+    t_snap, df2 = best_of(lambda: contacts.read_contacts_snapshot(wb))
+    pd.testing.assert_frame_equal(df, df2)
+    print(f"{label:<24} rows {len(df):>7,}   xlsx parse {t_parse * 1000:9.1f} ms   "
+          f"snapshot {t_snap * 1000:7.1f} ms   x{t_parse / t_snap:.0f}")
+
+
+tmp = Path(tempfile.mkdtemp())
+try:
+    shutil.copy(DATA_PATH, tmp / "master.xlsx")
+    report("data/master.xlsx", tmp / "master.xlsx")
+    write_workbook(tmp / "synthetic.xlsx", ROWS)
+    report("synthetic", tmp / "synthetic.xlsx")
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,41 @@
+"""Throughput: sequential onelineaddress geocoding vs the Census addressbatch backend.
+
+    python bench/bench_geocode_batch.py [N] [LATENCY_SECONDS]
+
+Runs against the local stand-in (bench/census_standin.py) with a throwaway
+geocode cache, so nothing touches the real Census service.
+"""
+import os, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import census_standin
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+LATENCY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+server, base, stats = census_standin.start(latency=LATENCY)
+tmp = tempfile.mkdtemp()
+os.environ["ELC_CENSUS_GEOCODER"] = base
+os.environ["ELC_GEOCODE_CACHE"] = str(Path(tmp) / "geocode.sqlite")
+from elc import geocode  # noqa: E402  (reads the env vars above at import)
+
+addrs = [f"{i} Main St, Fort Myers, FL 33967" for i in range(N)]
+addrs += [f"{i} Nomatch Rd, FL" for i in range(N // 20)]
+
+t0 = time.perf_counter()
+seq = [geocode._census_geocode(a) for a in addrs]
+t_seq = time.perf_counter() - t0
+
+geocode.get_geocode_cache().clear()
+t0 = time.perf_counter()
+bat = geocode.CensusBatchGeocoder(base_url=base).geocode_many(addrs)
+t_bat = time.perf_counter() - t0
+
+assert [s[1] for s in seq] == [b[1] for b in bat], "batch and sequential disagree on match status"
+print(f"addresses: {len(addrs)}  (latency {LATENCY * 1000:.0f} ms/request)")
+print(f"sequential : {t_seq:7.2f} s  {len(addrs) / t_seq:8.1f} addr/s")
+print(f"addressbatch: {t_bat:7.2f} s  {len(addrs) / t_bat:8.1f} addr/s  "
+      f"({stats['batch']} batch call(s), speedup x{t_seq / t_bat:.1f})")
+server.shutdown()
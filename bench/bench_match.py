@@ -0,0 +1,80 @@
+"""match_contacts + split_by_dept (mask scans) vs JurisdictionIndex lookups.
+
+    python bench/bench_match.py [ROWS] [QUERIES]
+
+Loads a synthetic directory (default 100k rows) through load_contacts,
+checks that both paths return identical frames for every query, then
+times them.
+"""
+import random, sys, tempfile, time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from elc import contacts  # noqa: E402
+from synth import write_workbook  # noqa: E402
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+QUERIES = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+
+def synthetic_directory(rows: int, seed: int = 7) -> pd.DataFrame:
+    """The frame the app matches against: a bench/synth.py workbook read by load_contacts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        return contacts.load_contacts(write_workbook(Path(tmp) / "contacts.xlsx", rows, seed))
+
+
+def queries(df: pd.DataFrame, n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    pairs = df[["County", "City"]].drop_duplicates().values.tolist()
+    out = []
+    for _ in range(n):
+        county, city = rnd.choice(pairs)
+        kind = rnd.random()
+        if kind < 0.2:
+            city = "Nowhere Springs"               # falls back to unincorporated / "*"
+        elif kind < 0.25:
+            county = "Atlantis County"             # no contacts at all
+        out.append((county, city))
+    return out
+
+
+df = synthetic_directory(ROWS)
+qs = queries(df, QUERIES)
+
+t0 = time.perf_counter()
+jindex = contacts.JurisdictionIndex(df)
+t_build = time.perf_counter() - t0
+
+for county, city in qs:
+    m_ref, exact_ref = contacts.match_contacts(df, county, city)
+    d_ref = contacts.split_by_dept(m_ref)
+    m_idx, d_idx, exact_idx = jindex.lookup(county, city)
+    assert exact_ref == exact_idx
+    pd.testing.assert_frame_equal(m_ref, m_idx, check_index_type=False)
+    for dep in contacts.DEPTS:
+        pd.testing.assert_frame_equal(d_ref[dep], d_idx[dep], check_index_type=False)
+jindex._memo.clear()
+
+t0 = time.perf_counter()
+for county, city in qs:
+    m, _ = contacts.match_contacts(df, county, city)
+    contacts.split_by_dept(m)
+t_scan = (time.perf_counter() - t0) / len(qs)
+
+t0 = time.perf_counter()
+for county, city in qs:
+    jindex.lookup(county, city)
+t_cold = (time.perf_counter() - t0) / len(qs)
+
+t0 = time.perf_counter()
+for county, city in qs:
+    jindex.lookup(county, city)
+t_warm = (time.perf_counter() - t0) / len(qs)
+
+print(f"rows: {len(df):,}  queries: {len(qs)}  (results identical)")
+print(f"index build       : {t_build * 1000:9.1f} ms (once per load)")
+print(f"mask scans        : {t_scan * 1000:9.3f} ms/search")
+print(f"index, first hit  : {t_cold * 1000:9.3f} ms/search  x{t_scan / t_cold:.0f}")
+print(f"index, memoized   : {t_warm * 1000:9.3f} ms/search  x{t_scan / t_warm:.0f}")
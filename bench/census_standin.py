@@ -0,0 +1,92 @@
+"""Local HTTP stand-in for the Census geocoder (onelineaddress, addressbatch and
+geographies/coordinates for naming a batch row's county).
+
+Point the app at it with ``ELC_CENSUS_GEOCODER=http://127.0.0.1:<port>`` before
+importing ``elc``. Every address geocodes to Fort Myers / Lee County (or, if it
+ends in ", GA", Atlanta / Fulton County) unless it contains "nomatch";
+``latency`` simulates the Census round trip per request and ``per_row`` the
+per-address cost inside a batch.
+"""
+import csv, io, json, re, threading, time, urllib.parse
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# state -> (city, county, zip, state FIPS, county FIPS, lon, lat)
+PLACES = {"FL": ("FORT MYERS", "Lee County", "33967", "12", "071", -81.87, 26.64),
+          "GA": ("ATLANTA", "Fulton County", "30303", "13", "121", -84.39, 33.75)}
+
+
+def _place(text: str):
+    """-> (state, *PLACES[state]) for the state an address ends with, FL otherwise."""
+    m = re.search(r"\b([A-Za-z]{2})\W*(?:\d{5})?\W*$", text)
+    state = m.group(1).upper() if m and m.group(1).upper() in PLACES else "FL"
+    return (state,) + PLACES[state]
+
+
+def _handler(latency: float, per_row: float, stats: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body: bytes, ctype: str):
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            if url.path.endswith("/geographies/coordinates"):
+                stats["coordinates"] += 1
+                x = float(urllib.parse.parse_qs(url.query).get("x", ["0"])[0])
+                county = min(PLACES.values(), key=lambda p: abs(p[5] - x))[1]
+                time.sleep(latency)
+                body = {"result": {"geographies": {"Counties": [{"NAME": county}]}}}
+                self._send(json.dumps(body).encode(), "application/json"); return
+            if not url.path.endswith("/locations/onelineaddress"):
+                self.send_error(404); return
+            stats["single"] += 1
+            addr = urllib.parse.parse_qs(url.query).get("address", [""])[0]
+            time.sleep(latency)
+            state, city, county, zipc, _, _, lon, lat = _place(addr)
+            matches = [] if "nomatch" in addr.lower() else [{
+                "matchedAddress": addr.upper(),
+                "coordinates": {"x": lon, "y": lat},
+                "addressComponents": {"city": city, "state": state, "zip": zipc},
+                "geographies": {"Counties": [{"NAME": county}]},
+            }]
+            self._send(json.dumps({"result": {"addressMatches": matches}}).encode(), "application/json")
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/addressbatch"):
+                self.send_error(404); return
+            stats["batch"] += 1
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            msg = BytesParser().parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body)
+            payload = next((p.get_payload(decode=True) for p in msg.get_payload()
+                            if p.get_param("name", header="content-disposition") == "addressFile"), b"")
+            rows = list(csv.reader(io.StringIO(payload.decode("utf-8"))))
+            time.sleep(latency + per_row * len(rows))
+            out = io.StringIO()
+            w = csv.writer(out)
+            for rid, street, city, state, zipc in rows:
+                one = ", ".join(p for p in (street, city, state, zipc) if p)
+                if "nomatch" in one.lower():
+                    w.writerow([rid, one, "No_Match"])
+                else:
+                    pstate, pcity, _, pzip, sfips, cfips, lon, lat = _place(state)
+                    w.writerow([rid, one, "Match", "Exact", f"{street.upper()}, {pcity}, {pstate}, {pzip}",
+                                f"{lon},{lat}", "12345", "L", sfips, cfips, "050100", "1000"])
+            self._send(out.getvalue().encode(), "text/csv")
+
+    return Handler
+
+
+def start(latency: float = 0.05, per_row: float = 0.0005, port: int = 0):
+    """Start the stand-in on a daemon thread; returns (server, base_url, stats)."""
+    stats = {"single": 0, "batch": 0, "coordinates": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(latency, per_row, stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", stats
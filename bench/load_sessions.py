@@ -0,0 +1,257 @@
+"""Concurrent-session load test: N simulated analysts against one ``streamlit run app.py``.
+
+    pip install -r bench/requirements.txt      # the app's requirements plus websockets
+    python bench/load_sessions.py [--sessions 1 2 4 8 16] [--reruns 20] [--rows 0] [--latency 0.05] [--out FILE.json]
+
+Starts the app as a real headless Streamlit server (pointed at the local
+Census stand-in, bench/census_standin.py, with ``--latency`` seconds per
+lookup) and drives it with lightweight websocket clients that speak the same
+BackMsg / ForwardMsg protocol as the browser. ``AppTest`` can't be used here:
+it swaps process-wide Streamlit globals on every run, so concurrent instances
+in one process trip over each other.
+
+Each session alternates Directory filtering / search with Jurisdiction Finder
+searches (about half the addresses repeat, as on a real portfolio). Per
+concurrency level it reports rerun latency percentiles (request sent -> last
+``script_finished``, including an ``st.rerun``), throughput, and the server
+process's CPU (share of one core) and peak RSS from /proc (Linux).
+``--rows`` swaps data/master.xlsx for a synthetic workbook of that size.
+"""
+import argparse, asyncio, datetime, json, os, random, socket, statistics, subprocess, sys, tempfile, time
+import urllib.request
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(HERE))
+
+RESULTS_DIR = HERE / "results"
+DIR_QUERIES = ["fire", "records clerk", "building permit", "portal", "planning", "environmental health"]
+FINISHED_EARLY_FOR_RERUN = 2          # ScriptFinishedStatus: st.rerun() follows
+
+
+# ---- Server process ----
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(env: dict, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(ROOT / "app.py"), "--server.headless", "true",
+         "--server.port", str(port), "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                raise SystemExit("streamlit server exited during startup")
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("streamlit server did not come up")
+
+
+class ProcUsage:
+    """CPU seconds and RSS of another process from /proc."""
+
+    def __init__(self, pid: int):
+        self.pid, self.tick, self.page = pid, os.sysconf("SC_CLK_TCK"), os.sysconf("SC_PAGE_SIZE")
+
+    def cpu(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.tick          # utime + stime
+
+    def rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * self.page / 1e6
+
+
+# ---- Headless client ----
+class Session:
+    """One browser tab: keeps widget values by id and resends them on every rerun."""
+
+    def __init__(self, url: str):
+        self.url, self.values, self.widgets, self.errors = url, {}, {}, []
+
+    async def open(self):
+        import websockets
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return await self.rerun()
+
+    async def close(self):
+        await self.ws.close()
+
+    def set(self, label: str, value: str):
+        self.values[self.widgets[label][0]] = value
+
+    def options(self, label: str):
+        return list(self.widgets[label][1])
+
+    async def rerun(self, trigger: str = None) -> float:
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        msg = BackMsg()
+        cs = msg.rerun_script
+        cs.SetInParent()                  # an empty first rerun still has to select the oneof
+        for wid, value in self.values.items():
+            cs.widget_states.widgets.add(id=wid, string_value=value)
+        if trigger:
+            cs.widget_states.widgets.add(id=self.widgets[trigger][0], trigger_value=True)
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        await self._until_finished()
+        return (time.perf_counter() - t0) * 1000
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        self.widgets = {}
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), 120))
+            kind = fwd.WhichOneof("type")
+            if kind == "script_finished":
+                if fwd.script_finished != FINISHED_EARLY_FOR_RERUN:
+                    return
+                self.widgets = {}
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                el = fwd.delta.new_element
+                et = el.WhichOneof("type")
+                if et == "exception":
+                    self.errors.append(f"{el.exception.type}: {el.exception.message}")
+                    continue
+                w = getattr(el, et)
+                if getattr(w, "id", "") and getattr(w, "label", ""):
+                    self.widgets.setdefault(w.label, (w.id, list(getattr(w, "options", []))))
+
+
+async def _analyst(sid: int, url: str, reruns: int, sites, out: list, errors: list, start: asyncio.Event):
+    rnd = random.Random(sid)
+    s = Session(url)
+    await start.wait()
+    out.append(("first load", await s.open()))
+    try:
+        for i in range(reruns):
+            if i % 2 == 0:
+                s.set("Navigate", "📒 Directory")
+                out.append(("directory page", await s.rerun()))
+                s.set("County", rnd.choice(s.options("County")))
+                out.append(("directory filter", await s.rerun()))
+                s.set("Search", rnd.choice(DIR_QUERIES))
+                out.append(("directory search", await s.rerun()))
+            else:
+                s.set("Navigate", "🧭 Jurisdiction Finder")
+                out.append(("finder page", await s.rerun()))
+                addr, county, city = rnd.choice(sites)
+                for label, value in (("Address*", addr), ("County", county), ("City / Municipality", city),
+                                     ("Project #", f"25-{sid:04d}")):
+                    s.set(label, value)
+                out.append(("finder search", await s.rerun(trigger="Find")))
+                for label in ("Address*", "County", "City / Municipality", "Project #"):
+                    s.values.pop(s.widgets.get(label, ("",))[0], None)     # form values aren't sticky elsewhere
+    finally:
+        errors.extend(f"session {sid}: {e}" for e in s.errors)
+        await s.close()
+
+
+async def _run_sessions(n, url, reruns, sites, usage: ProcUsage):
+    samples, errors, peak = [], [], [usage.rss_mb()]
+    start = asyncio.Event()
+
+    async def sample_rss():
+        while True:
+            peak[0] = max(peak[0], usage.rss_mb())
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_rss())
+    tasks = [asyncio.create_task(_analyst(i, url, reruns, sites, samples, errors, start)) for i in range(n)]
+    cpu0, t0 = usage.cpu(), time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    wall, cpu = time.perf_counter() - t0, usage.cpu() - cpu0
+    sampler.cancel()
+    return samples, errors, wall, cpu, peak[0]
+
+
+def run_level(n: int, url: str, reruns: int, sites, usage: ProcUsage) -> dict:
+    samples, errors, wall, cpu, peak = asyncio.run(_run_sessions(n, url, reruns, sites, usage))
+    ms = sorted(v for _, v in samples)
+    pct = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))]
+    by_kind = {}
+    for kind, v in samples:
+        by_kind.setdefault(kind, []).append(v)
+    return {"sessions": n, "reruns": len(ms), "p50_ms": pct(0.50), "p90_ms": pct(0.90), "p99_ms": pct(0.99),
+            "max_ms": ms[-1], "reruns_per_s": len(ms) / wall, "cpu_pct": 100 * cpu / wall, "peak_rss_mb": peak,
+            "errors": errors[:10], "median_ms_by_step": {k: statistics.median(v) for k, v in sorted(by_kind.items())}}
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="concurrency levels")
+    p.add_argument("--reruns", type=int, default=20, help="interactions per session and level")
+    p.add_argument("--rows", type=int, default=0, help="synthetic workbook rows (default: data/master.xlsx)")
+    p.add_argument("--latency", type=float, default=0.05, help="stand-in geocoder seconds per lookup")
+    p.add_argument("--out", help="output JSON (default bench/results/load-<timestamp>.json)")
+    args = p.parse_args(argv)
+    try:
+        import websockets  # noqa: F401  (the clients' transport)
+    except ImportError:
+        raise SystemExit("load_sessions.py needs websockets: pip install -r bench/requirements.txt")
+
+    import census_standin
+    tmp = Path(tempfile.mkdtemp(prefix="elc-load-"))
+    _, base, geo_stats = census_standin.start(args.latency)
+    env = {"ELC_CENSUS_GEOCODER": base, "ELC_GEOCODE_CACHE": str(tmp / "geocode.sqlite"),
+           "ELC_TRACKING_DB": str(tmp / "tracking.sqlite"), "ELC_RELOAD_POLL": "0"}
+    if args.rows:
+        from synth import write_workbook
+        env["ELC_DATA_PATH"] = str(write_workbook(tmp / f"contacts_{args.rows}.xlsx", args.rows))
+    os.environ.update(env)
+
+    from elc.config import DATA_PATH
+    from elc.contacts import load_contacts
+    df = load_contacts(DATA_PATH)                  # writes the snapshot, so the server starts warm
+    pairs = df[["County", "City"]].astype(str).drop_duplicates().values.tolist()
+    rnd = random.Random(7)
+    sites = [(f"{rnd.randrange(1, 40) if rnd.random() < 0.5 else rnd.randrange(100, 99999)} Main St", c, ci)
+             for c, ci in (rnd.choice(pairs) for _ in range(500))]
+
+    port = _free_port()
+    server = start_server(env, port)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    usage = ProcUsage(server.pid)
+    try:
+        print(f"{len(df):,} contacts · stand-in latency {args.latency * 1000:.0f} ms · "
+              f"{args.reruns} interactions/session · server pid {server.pid}, idle RSS {usage.rss_mb():.0f} MB")
+        print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+              f"{'rerun/s':>8} {'cpu %':>6} {'rss MB':>7}")
+        levels = []
+        for n in args.sessions:
+            r = run_level(n, url, args.reruns, sites, usage)
+            levels.append(r)
+            print(f"{n:>8} {r['reruns']:>7} {r['p50_ms']:8.1f} {r['p90_ms']:8.1f} {r['p99_ms']:8.1f} "
+                  f"{r['max_ms']:8.1f} {r['reruns_per_s']:8.1f} {r['cpu_pct']:6.0f} {r['peak_rss_mb']:7.0f}")
+            for e in r["errors"]:
+                print(f"         ! {e}")
+    finally:
+        server.terminate()
+        server.wait(10)
+    print("median ms per step:")
+    for r in levels:
+        print(f"{r['sessions']:>8}  " + "  ".join(f"{k} {v:.0f}" for k, v in r["median_ms_by_step"].items()))
+
+    doc = {"meta": {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "contacts": len(df),
+                    "latency_s": args.latency, "reruns": args.reruns, "geocoder_calls": dict(geo_stats)},
+           "levels": levels}
+    out = Path(args.out) if args.out else RESULTS_DIR / f"load-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2))
+    print(f"wrote {out}")
+    return 1 if any(r["errors"] for r in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Local SMTP stand-in for exercising elc.dispatch without a mail server.
+
+    ELC_SMTP_HOST=127.0.0.1 ELC_SMTP_PORT=<port> ELC_SMTP_STARTTLS=0 ELC_MAIL_FROM=records@example.com
+
+Speaks just enough ESMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) and
+keeps every accepted message in ``stats["messages"]``. ``fail`` maps a recipient
+substring to the SMTP reply RCPT gets (e.g. ``{"tempfail": "451 try later"}``).
+tests/test_dispatch.py drives the outbox through it; for manual runs
+``python -m aiosmtpd -n -l 127.0.0.1:8025`` works as well.
+"""
+import socketserver, threading
+
+
+def _handler(stats: dict, fail: dict):
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line: str):
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def handle(self):
+            stats["connections"] += 1
+            self.reply("220 standin ESMTP")
+            sender, rcpts = None, []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                cmd = line.decode("utf-8", "replace").strip()
+                verb = cmd[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    self.reply("250-standin\r\n250 8BITMIME" if verb == "EHLO" else "250 standin")
+                elif verb == "MAIL":
+                    sender, rcpts = cmd.split(":", 1)[1].strip(" <>"), []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    rcpt = cmd.split(":", 1)[1].strip(" <>")
+                    code = next((r for k, r in fail.items() if k in rcpt), None)
+                    if code:
+                        self.reply(code)
+                    else:
+                        rcpts.append(rcpt)
+                        self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = []
+                    for raw in self.rfile:
+                        if raw in (b".\r\n", b".\n"):
+                            break
+                        data.append(raw[1:] if raw.startswith(b"..") else raw)
+                    stats["messages"].append({"from": sender, "to": rcpts, "data": b"".join(data)})
+                    self.reply("250 OK queued")
+                elif verb == "RSET":
+                    sender, rcpts = None, []
+                    self.reply("250 OK")
+                elif verb == "NOOP":
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+
+    return Handler
+
+
+def start(port: int = 0, fail: dict = None):
+    """Start the stand-in on a daemon thread; returns (server, port, stats)."""
+    stats = {"connections": 0, "messages": []}
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", port), _handler(stats, fail or {}))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1], stats
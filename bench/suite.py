@@ -0,0 +1,197 @@
+"""Benchmark suite for the directory and jurisdiction hot paths.
+
+    python bench/suite.py run [--sizes 1000 10000 100000] [--out FILE.json]
+    python bench/suite.py compare BASE.json NEW.json [--threshold 0.15]
+
+``run`` writes synthetic workbooks (bench/synth.py) and times load_contacts,
+norm_county/norm_city, match_contacts, split_by_dept, the jurisdiction index,
+email_list, portal_urls, contact_points, template rendering, APN checks, a full
+search package and the Directory search (with facet filters) against an in-process fake geocoder;
+results go to JSON.
+``compare`` prints the median ratio per benchmark and exits 1 if any got
+slower than ``threshold``.
+"""
+import argparse, datetime, json, os, platform, random, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE))
+
+RESULTS_DIR = HERE / "results"
+
+
+def _import_core(tmp: Path):
+    # No live-reload thread, no real geocode cache, no network.
+    os.environ.setdefault("ELC_RELOAD_POLL", "0")
+    os.environ.setdefault("ELC_GEOCODE_CACHE", str(tmp / "geocode.sqlite"))
+    from elc import apn, contacts, resolve, search, templates
+    return apn, contacts, resolve, search, templates
+
+
+def timed(fn, repeat: int, number: int = 1) -> dict:
+    """Median / p95 / min over ``repeat`` samples of ``number`` calls each (ms per call)."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) * 1000 / number)
+    samples.sort()
+    return {"median_ms": statistics.median(samples), "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+            "min_ms": samples[0], "repeat": repeat, "number": number}
+
+
+def bench_size(rows: int, tmp: Path, queries: int = 50) -> dict:
+    import pandas as pd
+    from synth import write_workbook
+    apn, contacts, resolve, search, templates = _import_core(tmp)
+    wb = write_workbook(tmp / f"contacts_{rows}.xlsx", rows)
+    out = {}
+    heavy = 1 if rows >= 100_000 else 3
+
+    contacts._snapshot_path(wb).unlink(missing_ok=True)
+    out["load_contacts.xlsx"] = timed(lambda: contacts.parse_contacts_workbook(wb), repeat=heavy)
+    df = contacts.load_contacts(wb)                       # writes the snapshot
+    out["load_contacts.snapshot"] = timed(lambda: contacts.load_contacts(wb), repeat=5)
+
+    counties, cities = df["County"].astype(str), df["City"].astype(str)
+    out["norm_county.column"] = timed(lambda: counties.map(contacts.norm_county), repeat=heavy)
+    out["norm_city.column"] = timed(lambda: cities.map(contacts.norm_city), repeat=heavy)
+
+    rnd = random.Random(3)
+    pairs = df[["County", "City"]].drop_duplicates().values.tolist()
+    qs = [(c, ci if rnd.random() > 0.2 else "Nowhere") for c, ci in (rnd.choice(pairs) for _ in range(queries))]
+    it = iter(qs * 1000)
+
+    out["match_contacts"] = timed(lambda: contacts.match_contacts(df, *next(it)), repeat=queries)
+    matched = [contacts.match_contacts(df, c, ci)[0] for c, ci in qs]
+    mit = iter(matched * 1000)
+    out["split_by_dept"] = timed(lambda: contacts.split_by_dept(next(mit)), repeat=queries)
+
+    out["jurisdiction_index.build"] = timed(lambda: contacts.JurisdictionIndex(df), repeat=heavy)
+    jindex = contacts.JurisdictionIndex(df)
+    out["jurisdiction_index.lookup_cold"] = timed(lambda: (jindex._memo.clear(), jindex.lookup(*next(it))), repeat=queries)
+
+    depts = [jindex.lookup(c, ci)[1] for c, ci in qs]
+    dit = iter(depts * 1000)
+    out["email_list.4_depts"] = timed(lambda: [contacts.email_list(d) for d in next(dit).values()], repeat=queries)
+    out["portal_urls.4_depts"] = timed(lambda: [contacts.portal_urls(d) for d in next(dit).values()], repeat=queries)
+    out["contact_points.cold"] = timed(lambda: (jindex._points.clear(), jindex.contact_points(*next(it))), repeat=queries)
+
+    ctx = {"address": "1 Main St", "city": "X", "county": "Y", "apn": "01-2345", "project": "25-0001"}
+    tpls = [t for ts in templates.TEMPLATE_SETS.values() for k, t in ts.items() if k != "all"]
+    out["templates.render_all"] = timed(lambda: [t["body"].format(**ctx) for t in tpls], repeat=20, number=50)
+
+    geo = {f"{i} Main St, FL": {"city": ci, "county": c, "state": "FL"} for i, (c, ci) in enumerate(qs)}
+    real_geocode = resolve.geocode_address
+    resolve.geocode_address = lambda addr, priority="interactive": (geo.get(addr), None if addr in geo else "No geocoder match")
+    try:
+        n = iter(list(range(len(qs))) * 1000)
+        out["search_package.end_to_end"] = timed(
+            lambda: (jindex._memo.clear(),
+                     resolve.build_search_package(jindex, f"{next(n)} Main St", "", "", "01-2345", "25-0001", "ELC")),
+            repeat=queries)
+    finally:
+        resolve.geocode_address = real_geocode
+
+    registry = apn.get_apn_registry()
+    # Every spelling the Finder has accepted for Miami-Dade gets the folio check
+    spellings = pd.Series(["Miami-Dade", "Miami Dade", "MiamiDade", "miamidade", "Dade", "Miami-Dade County"])
+    assert (registry.check(pd.Series(["0131050000010"] * len(spellings)), spellings,
+                           pd.Series(["Miami"] * len(spellings)))["status"] == "ok").all()
+    apns = pd.Series([f"{rnd.randrange(10 ** 12, 10 ** 13)}" for _ in range(len(df))])
+    out["apn_registry.check"] = timed(lambda: registry.check(apns, df["County"], df["City"]), repeat=heavy)
+
+    out["search_index.build"] = timed(lambda: search.ContactSearchIndex(df), repeat=heavy)
+    sidx = search.ContactSearchIndex(df)
+    terms = iter(["broward fire", "records clerk", "fire marshl", "palm beach portal", "permit desk"] * 1000)
+    out["search_index.query"] = timed(lambda: sidx.search(next(terms)), repeat=25)
+
+    # Directory filters + query: ranking runs inside the filtered rows, so no match is cut by the limit
+    from elc.store import build_facets, filter_positions
+    facets = build_facets(df)
+    filtered = [(filter_positions(facets, len(df), c, "(All)", "Fire"), q)
+                for c, q in ((rnd.choice(facets["counties"]), "fire") for _ in range(10))]
+    for pos, q in filtered:
+        keep = set(pos.tolist())
+        assert sidx.search(q, limit=None, within=pos) == [r for r in sidx.search(q, limit=None) if r in keep]
+    fit = iter(filtered * 1000)
+
+    def filtered_query():
+        pos, q = next(fit)
+        return sidx.search(q, limit=None, within=pos)
+    out["search_index.query_filtered"] = timed(filtered_query, repeat=25)
+    return out
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE.parent,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def cmd_run(args):
+    import pandas as pd
+    tmp = Path(tempfile.mkdtemp(prefix="elc-bench-"))
+    results = {}
+    for rows in args.sizes:
+        t0 = time.perf_counter()
+        for name, r in bench_size(rows, tmp).items():
+            results[f"{name}@{rows}"] = r
+            print(f"{rows:>7,}  {name:<34} {r['median_ms']:10.3f} ms  (p95 {r['p95_ms']:.3f})")
+        print(f"{rows:>7,}  done in {time.perf_counter() - t0:.1f} s")
+    doc = {
+        "meta": {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "git": _git_rev(),
+                 "python": platform.python_version(), "pandas": pd.__version__, "machine": platform.platform()},
+        "results": results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"run-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2))
+    print(f"wrote {out}")
+
+
+def cmd_compare(args) -> int:
+    base = json.loads(Path(args.base).read_text())["results"]
+    new = json.loads(Path(args.new).read_text())["results"]
+    regressions = 0
+    print(f"{'benchmark':<46} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for key in sorted(set(base) | set(new)):
+        if key not in base or key not in new:
+            print(f"{key:<46} {'—' if key not in base else base[key]['median_ms']:>10} "
+                  f"{'—' if key not in new else new[key]['median_ms']:>10}")
+            continue
+        b, n = base[key]["median_ms"], new[key]["median_ms"]
+        ratio = n / b if b else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold and n - b > args.min_ms:
+            flag, regressions = "  REGRESSION", regressions + 1
+        elif ratio < 1 - args.threshold:
+            flag = "  faster"
+        print(f"{key:<46} {b:10.3f} {n:10.3f} {ratio:7.2f}{flag}")
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run the suite and write JSON")
+    r.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    r.add_argument("--out", help="output JSON (default bench/results/run-<timestamp>.json)")
+    c = sub.add_parser("compare", help="compare two result files")
+    c.add_argument("base"); c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.15, help="relative slowdown that counts (default 0.15)")
+    c.add_argument("--min-ms", type=float, default=0.05, help="ignore absolute differences below this")
+    args = p.parse_args(argv)
+    if args.cmd == "run":
+        cmd_run(args)
+        return 0
+    return cmd_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Synthetic contacts workbooks for the benchmarks.
+
+Column headers deliberately use the aliases load_contacts renames
+("Municipality", "Department Type", "Emails", ...), and each county gets
+incorporated cities plus "Unincorporated" and "*" rows so every
+match_contacts fallback is exercised.
+"""
+import random
+from pathlib import Path
+
+import pandas as pd
+
+COUNTIES = ["Alachua", "Broward", "Collier", "Duval", "Hillsborough", "Lee", "Leon", "Miami-Dade",
+            "Monroe", "Orange", "Palm Beach", "Pinellas", "Polk", "St. Johns", "St. Lucie", "Volusia"]
+DEPT_TYPES = ["Building", "Planning", "Environmental", "Fire"]
+
+
+def synthetic_contacts(rows: int, seed: int = 7, cities_per_county: int = 40) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    cities = {c: [f"{c} City {i}" for i in range(cities_per_county)] + ["Unincorporated", "*"]
+              for c in COUNTIES}
+    recs = []
+    for i in range(rows):
+        county = rnd.choice(COUNTIES)
+        city = rnd.choice(cities[county])
+        dept = rnd.choice(DEPT_TYPES)
+        n_mail = rnd.choice([0, 1, 1, 2, 3])
+        recs.append({
+            "County": county,
+            "Municipality": city,
+            "Department Type": dept.lower() if i % 3 else dept,
+            "Department Name": f"{city if city not in ('*', 'Unincorporated') else county} {dept} Dept",
+            "Contact Person": rnd.choice(["Records Clerk", "Fire Marshal", "Permit Desk", ""]),
+            "Title": rnd.choice(["Custodian of Records", "Clerk", ""]),
+            "Phone Number": f"({rnd.randint(200, 999)}) 555-{rnd.randint(0, 9999):04d}",
+            "Emails": ", ".join(f"rec{i}.{k}@{county.lower().replace(' ', '')}.gov" for k in range(n_mail)),
+            "Portal": rnd.choice(["", f"https://records.example.gov/{i % 500}"]),
+            "Method": rnd.choice(["Portal", "Email"]),
+            "Notes": rnd.choice(["", "Use the portal", "Call first", "Green Next Button"]),
+            "Verified": rnd.choice(["Yes", "No", ""]),
+            "Date Verified": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        })
+    return pd.DataFrame(recs)
+
+
+def write_workbook(path: Path, rows: int, seed: int = 7) -> Path:
+    synthetic_contacts(rows, seed).to_excel(path, index=False, sheet_name="contacts")
+    return path
@@ -0,0 +1,37 @@
+"""ELC public-records core: contacts directory, jurisdiction lookup and request drafts.
+
+Importing ``elc`` is cheap; pandas and requests load only when one of the
+names below (or a submodule that needs them) is first used, so scripts and the
+``python -m elc`` CLI don't pay for Streamlit or the data stack up front.
+"""
+import importlib
+
+_EXPORTS = {
+    "DATA_PATH": "config",
+    "norm_county": "normalize", "norm_city": "normalize", "address_key": "normalize",
+    "norm_state": "normalize", "with_state": "normalize",
+    "TEMPLATES": "templates", "TEMPLATES_AEI": "templates", "TEMPLATE_SETS": "templates",
+    "render_template": "templates",
+    "apn_notice": "apn", "get_apn_registry": "apn", "ApnRegistry": "apn",
+    "load_contacts": "contacts", "match_contacts": "contacts", "split_by_dept": "contacts",
+    "JurisdictionIndex": "contacts", "email_list": "contacts", "portal_urls": "contacts", "DEPTS": "contacts",
+    "geocode_address": "geocode", "CensusBatchGeocoder": "geocode", "get_geocode_scheduler": "geocode",
+    "resolve_location": "resolve", "resolve_jurisdiction": "resolve", "resolve_site": "resolve", "resolve_sites": "resolve",
+    "read_sites": "resolve", "build_search_package": "resolve",
+    "write_zip": "export", "iter_package_files": "export", "iter_batch_packages": "export",
+    "get_dispatch_queue": "dispatch", "get_dispatcher": "dispatch",
+    "get_request_tracker": "tracking",
+    "get_facility_index": "facilities", "FacilityIndex": "facilities",
+    "get_contacts_store": "store", "Directory": "store", "ContactsStore": "store",
+    "get_directory_registry": "store", "DirectoryRegistry": "store",
+    "get_tracer": "tracing",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'elc' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
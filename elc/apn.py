@@ -0,0 +1,143 @@
+"""APN (parcel / folio) checks against the resolved jurisdiction.
+
+Per-county formats and prefix → municipality tables live in
+data/apn_registry.json (``ELC_APN_REGISTRY``); counties without an entry are
+not checked.
+"""
+import json, re
+from pathlib import Path
+from typing import NamedTuple
+
+from .config import APN_REGISTRY_PATH
+from .normalize import norm_city_column, norm_county, norm_county_column
+from .resources import shared
+
+class ApnRule(NamedTuple):
+    county: str
+    term: str = "APN"                    # what the county calls it: folio, PCN, STRAP...
+    digits: tuple = ()                   # accepted digit counts; empty accepts any
+    mask: str = ""                       # "#" per digit, e.g. "##-####-###-####"
+    prefix_len: int = 0
+    municipalities: "dict | None" = None # digit prefix -> municipality ("Unincorporated" allowed)
+
+def _county_key(val) -> str:
+    """norm_county with separators dropped: "Miami-Dade", "Miami Dade" and "MiamiDade" share a rule."""
+    return re.sub(r"[^0-9a-z]", "", norm_county(val))
+
+def _apply_mask(digits, mask: str):
+    """'0131050000010' + '##-####-###-####' -> '01-3105-000-0010', column-wise."""
+    out, pos = None, 0
+    for run in re.findall(r"#+|[^#]+", mask):
+        if run[0] == "#":
+            piece, pos = digits.str.slice(pos, pos + len(run)), pos + len(run)
+        else:
+            piece = run
+        out = piece if out is None else out + piece
+    return out
+
+class ApnRegistry:
+    """County -> ApnRule, validating whole columns of APNs with vectorized string ops.
+
+    ``check`` returns one row per APN with the digits, the APN reformatted to
+    the county mask (when the digit count fits), the municipality its prefix
+    implies and a status: ``missing``, ``format`` (wrong digit count),
+    ``prefix`` (unknown municipality code), ``mismatch`` (prefix disagrees with
+    the city), ``ok`` (agrees), ``valid`` (format fine, no prefix table), or
+    "" when the county has no rule.
+    """
+
+    def __init__(self, rules, aliases=None):
+        self.rules = {_county_key(r.county): r for r in rules}
+        for alias, county in (aliases or {}).items():
+            self.rules[_county_key(alias)] = self.rules[_county_key(county)]
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ApnRegistry":
+        try:
+            with open(path, encoding="utf-8") as f:
+                doc = json.load(f)
+        except FileNotFoundError:
+            return cls([])
+        rules, aliases = [], {}
+        for c in doc.get("counties", []):
+            rules.append(ApnRule(c["county"], c.get("term", "APN"), tuple(c.get("digits", ())), c.get("mask", ""),
+                                 int(c.get("prefix_len", 0)), c.get("municipalities") or None))
+            aliases.update({a: c["county"] for a in c.get("aliases", [])})
+        return cls(rules, aliases)
+
+    def check(self, apns, counties, cities):
+        import numpy as np
+        import pandas as pd
+        apns = apns.fillna("").astype(str).str.strip()
+        digits = apns.str.replace(r"\D", "", regex=True)
+        out = pd.DataFrame({"digits": digits, "normalized": apns, "prefix": "", "expected": "", "status": ""},
+                           index=apns.index)
+        keys = norm_county_column(counties).str.replace(r"[^0-9a-z]", "", regex=True)
+        for key in keys.unique():                    # a batch spans only a few counties
+            rule = self.rules.get(key)
+            if rule is None:
+                continue
+            idx = keys.index[keys.to_numpy() == key]
+            d = digits.loc[idx]
+            n = d.str.len()
+            ok_len = n.isin(rule.digits) if rule.digits else n > 0
+            status = np.where(n == 0, "missing", np.where(ok_len, "valid", "format"))
+            if rule.mask:
+                fits = (n == rule.mask.count("#")).to_numpy()
+                out.loc[idx[fits], "normalized"] = _apply_mask(d[fits], rule.mask)
+            if rule.municipalities and rule.prefix_len:
+                prefix = d.str.slice(0, rule.prefix_len).where(n >= rule.prefix_len, "")
+                expected = prefix.map(rule.municipalities).fillna("")
+                entered = norm_city_column(cities.loc[idx]).replace("", "unincorporated")
+                agree = (entered == norm_city_column(expected)).to_numpy()
+                status = np.select([status != "valid", (expected == "").to_numpy(), agree],
+                                   [status, "prefix", "ok"], "mismatch")
+                out.loc[idx, "prefix"] = prefix
+                out.loc[idx, "expected"] = expected
+            out.loc[idx, "status"] = status
+        return out
+
+    def notice(self, county, city, apn):
+        """Finder message for one site -> (level, message) or None."""
+        rule = self.rules.get(_county_key(county))
+        if rule is None:
+            return None
+        import pandas as pd
+        r = self.check(pd.Series([apn or ""]), pd.Series([county]), pd.Series([city])).iloc[0]
+        term = rule.term
+        if r["status"] == "missing":
+            if not rule.municipalities:
+                return None
+            return ("info", f"Enter an APN to validate the {rule.county} municipality from the {term} prefix.")
+        if r["status"] == "format":
+            shape = f" ({rule.mask})" if rule.mask else ""
+            return ("warning", f"This {term} has {len(r['digits'])} digits; {rule.county} {term}s have "
+                               f"{' or '.join(map(str, rule.digits))}{shape}. Check the {term} format.")
+        if r["status"] == "prefix":
+            return ("info", f"Couldn’t read a {rule.county} municipality from this APN. Check the {term} format.")
+        msg_prefix = f"APN prefix **{r['prefix']}** → **{r['expected']}**"
+        if r["status"] == "mismatch":
+            return ("warning",
+                    f"{msg_prefix}. You entered **{city or 'Unincorporated'}**. "
+                    "Please double-check which jurisdiction to contact.")
+        if r["status"] == "ok":
+            return ("info", f"{msg_prefix}. ✅ APN and municipality are consistent.")
+        return None
+
+STATUS_LABELS = {"ok": "OK", "valid": "OK", "prefix": "Unknown prefix", "format": "Unexpected format",
+                 "missing": "Missing", "": ""}
+
+def check_labels(chk):
+    """Short per-row text for ``ApnRegistry.check`` output, for batch tables."""
+    labels = chk["status"].map(STATUS_LABELS).fillna("")
+    mism = chk["status"] == "mismatch"
+    labels[mism] = "Prefix → " + chk.loc[mism, "expected"]
+    return labels
+
+@shared
+def get_apn_registry(path: Path = APN_REGISTRY_PATH) -> ApnRegistry:
+    return ApnRegistry.from_file(path)
+
+def apn_notice(final_county, final_city, apn):
+    """APN → municipality validation for the resolved jurisdiction -> (level, message) or None."""
+    return get_apn_registry().notice(final_county, final_city, apn)
@@ -0,0 +1,121 @@
+"""Offline jurisdiction: local county / municipal boundary polygons."""
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+from .config import BOUNDARIES_DIR
+from .resources import shared
+
+# data/boundaries/counties.geojson and municipalities.geojson (WGS84 lon/lat).
+BOUNDARY_NAME_KEYS = ["NAME", "Name", "name", "MUNICIPALITY", "CITYNAME", "CITY", "COUNTY", "COUNTYNAME"]
+
+def _point_in_rings(x: float, y: float, rings) -> bool:
+    """Even-odd ray cast over a polygon's outer ring and holes."""
+    inside = False
+    for ring in rings:
+        j = len(ring) - 1
+        for i in range(len(ring)):
+            xi, yi = ring[i]; xj, yj = ring[j]
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+    return inside
+
+class PolygonIndex:
+    """Named polygons behind a static STR-packed R-tree of bounding boxes.
+
+    ``locate(lon, lat)`` walks only the tree nodes whose boxes contain the point
+    and ray-casts the few candidate polygons, so a lookup is microseconds.
+    """
+
+    def __init__(self, items, node_size: int = 16):
+        # items: [(name, rings)]; one entry per polygon part
+        self.size = len(items)
+        entries = []
+        for name, rings in items:
+            xs = [p[0] for p in rings[0]]; ys = [p[1] for p in rings[0]]
+            entries.append(((min(xs), min(ys), max(xs), max(ys)), (name, rings)))
+        level = [(bbox, None, leaf) for bbox, leaf in entries]       # (bbox, children, leaf)
+        while len(level) > node_size:
+            level = self._pack(level, node_size)
+        self.root = (self._union([e[0] for e in level]), level, None) if level else None
+
+    @staticmethod
+    def _union(boxes):
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def _pack(self, level, node_size):
+        """Sort-Tile-Recursive: x-sorted slabs, y-sorted runs of ``node_size``."""
+        n_nodes = -(-len(level) // node_size)
+        slabs = max(1, int(n_nodes ** 0.5 + 0.999))
+        per_slab = -(-len(level) // slabs)
+        level = sorted(level, key=lambda e: e[0][0] + e[0][2])
+        out = []
+        for s0 in range(0, len(level), per_slab):
+            slab = sorted(level[s0:s0 + per_slab], key=lambda e: e[0][1] + e[0][3])
+            for k in range(0, len(slab), node_size):
+                kids = slab[k:k + node_size]
+                out.append((self._union([e[0] for e in kids]), kids, None))
+        return out
+
+    def locate(self, lon: float, lat: float):
+        if self.root is None:
+            return None
+        stack = [self.root]
+        while stack:
+            (x0, y0, x1, y1), kids, leaf = stack.pop()
+            if not (x0 <= lon <= x1 and y0 <= lat <= y1):
+                continue
+            if leaf is not None:
+                if _point_in_rings(lon, lat, leaf[1]):
+                    return leaf[0]
+            else:
+                stack.extend(kids)
+        return None
+
+    @classmethod
+    def from_geojson(cls, path: Path, name_keys=BOUNDARY_NAME_KEYS):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        items = []
+        for feat in data.get("features", []):
+            props, geom = feat.get("properties") or {}, feat.get("geometry") or {}
+            name = next((str(props[k]).strip() for k in name_keys if props.get(k)), "")
+            if not name:
+                continue
+            if geom.get("type") == "Polygon":
+                parts = [geom["coordinates"]]
+            elif geom.get("type") == "MultiPolygon":
+                parts = geom["coordinates"]
+            else:
+                continue
+            for rings in parts:
+                if rings and len(rings[0]) >= 3:
+                    items.append((name, [[(float(p[0]), float(p[1])) for p in ring] for ring in rings]))
+        return cls(items)
+
+class Boundaries(NamedTuple):
+    counties: "PolygonIndex | None"
+    municipalities: "PolygonIndex | None"
+
+    def resolve(self, lat, lon):
+        """-> (city, county) from polygons; city "" means unincorporated, None unknown."""
+        if lat is None or lon is None:
+            return None, None
+        county = self.counties.locate(lon, lat) if self.counties else None
+        city = None
+        if self.municipalities:
+            city = self.municipalities.locate(lon, lat) or ""
+        return city, county
+
+def get_boundaries(folder: Path = BOUNDARIES_DIR) -> "Boundaries | None":
+    return _load_boundaries(Path(folder))
+
+@shared
+def _load_boundaries(folder: Path) -> "Boundaries | None":
+    layers = {}
+    for key, fname in (("counties", "counties.geojson"), ("municipalities", "municipalities.geojson")):
+        p = folder / fname
+        layers[key] = PolygonIndex.from_geojson(p) if p.exists() else None
+    return Boundaries(**layers) if any(layers.values()) else None
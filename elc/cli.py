@@ -0,0 +1,211 @@
+"""Command line: resolve sites and export request packages without Streamlit.
+
+    python -m elc resolve "17520 Rockefeller Circle, Fort Myers, FL 33967" [--json]
+    python -m elc resolve --sites sites.csv [--out jurisdictions.csv]
+    python -m elc export "1 Main St, Boynton Beach" --apn 08-46-25 --project 25-0001 --out drafts.zip
+    python -m elc export --sites sites.csv --type AEI --out request-packages.zip
+    python -m elc export --sites sites.csv --queue depts     # needs ELC_SMTP_HOST + ELC_MAIL_FROM
+    python -m elc dispatch [--drain 300] [--status]
+    python -m elc memory
+
+Heavy modules are imported inside each command, so ``--help`` and argument
+errors return immediately.
+"""
+import argparse, json, sys
+from pathlib import Path
+
+from .config import BATCH_MAX_WORKERS, DATA_PATH, DEFAULT_STATE, DIRECTORIES_DIR, METRICS_PROM_PATH
+
+
+def _say(msg: str):
+    print(msg, file=sys.stderr)
+
+
+def _load_index(workbook):
+    """One workbook's index, or without ``--workbook`` the per-state registry (routed by geocoded state)."""
+    if workbook is None:
+        from .store import get_directory_registry
+        return get_directory_registry(0)
+    from .contacts import JurisdictionIndex, load_contacts
+    notices = []
+    df = load_contacts(workbook, notices)
+    for level, msg in notices:
+        _say(f"{level}: {msg}")
+    if "_n_county" not in df.columns:
+        raise SystemExit(2)
+    return JurisdictionIndex(df)
+
+
+def _load_sites(path: Path):
+    from .resolve import read_sites
+    sites = read_sites(path.name, path.read_bytes())
+    if sites.empty:
+        _say(f"error: no rows with an address in {path}")
+        raise SystemExit(2)
+    return sites
+
+
+def _resolve_all(jindex, sites, args):
+    from .resolve import collect_results, resolve_sites
+    rows = []
+    for row in resolve_sites(jindex, sites, census_batch=not args.no_census_batch, max_workers=args.workers):
+        rows.append(row)
+        if args.progress:
+            _say(f"{len(rows)}/{len(sites)} resolved")
+    return collect_results(rows)
+
+
+def cmd_resolve(args) -> int:
+    jindex = _load_index(args.workbook)
+    if args.sites:
+        results = _resolve_all(jindex, _load_sites(args.sites), args)
+        out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+        try:
+            results.to_csv(out, index=False)
+        finally:
+            if args.out:
+                out.close()
+        ok = int((results["Status"] == "OK").sum())
+        _say(f"{ok}/{len(results)} site(s) resolved")
+        return 0 if ok else 1
+
+    import requests
+    from .resolve import DEPT_LABELS, resolve_site
+    try:
+        res = resolve_site(jindex, args.address, args.county, args.city)
+    except requests.RequestException as e:   # includes ServiceUnavailable (circuit open)
+        _say(f"error: the Census geocoder is not responding ({e}); give --county (and --city) to resolve without it")
+        return 1
+    pts = res["points"]
+    depts = {key: {"emails": pts["emails"][key], "portals": pts["portals"][key]}
+             for key, _ in DEPT_LABELS if not res["depts"][key].empty} if pts else {}
+    if args.json:
+        print(json.dumps({"address": args.address, "city": res["city"], "county": res["county"],
+                          "state": res["state"], "error": res["error"], "departments": depts}, indent=2))
+    elif res["error"]:
+        _say(f"error: {res['error']}")
+    else:
+        print(f"{res['city'] or '(unincorporated)'} — {res['county']}, {res['state']}")
+        for key, label in DEPT_LABELS:
+            d = depts.get(key)
+            print(f"  {label}: {', '.join(d['emails']) if d and d['emails'] else '-'}")
+            for url in (d or {}).get("portals", []):
+                print(f"    portal: {url}")
+    return 1 if res["error"] else 0
+
+
+def cmd_export(args) -> int:
+    from .export import iter_batch_packages, iter_package_files, write_zip
+    jindex = _load_index(args.workbook)
+    if args.sites:
+        results = _resolve_all(jindex, _load_sites(args.sites), args)
+        packages = iter_batch_packages(jindex, results, args.type)
+    else:
+        from .resolve import build_search_package
+        pkg = build_search_package(jindex, args.address, args.county, args.city, args.apn, args.project, args.type)
+        for level, msg in pkg["notices"]:
+            _say(f"{level}: {msg.replace('**', '')}")
+        packages = [("drafts", pkg)]
+    from .tracking import get_request_tracker
+    packages = get_request_tracker().logged(packages, args.type)
+    if args.queue:
+        return _queue_packages(packages, args.queue, args.out, args.type)
+    with open(args.out, "wb") as f:
+        n = write_zip(iter_package_files(packages), f)
+    _say(f"{n} draft(s) written to {args.out}")
+    return 0 if n else 1
+
+
+def _queue_packages(packages, which, out, project_type):
+    from .dispatch import dispatch_config_error, get_dispatch_queue
+    from .export import package_drafts
+    from .tracking import RequestTracker
+    if dispatch_config_error():
+        _say(f"error: {dispatch_config_error()}")
+        return 2
+    if out:
+        _say("note: --out is ignored with --queue")
+    queue, new = get_dispatch_queue(), 0
+    for _, pkg, *rest in packages:
+        for d in package_drafts(pkg, *rest):
+            if d["emails"] and (d["key"] == "all") == (which == "all"):
+                new += queue.enqueue(d, track=RequestTracker.dispatch_track(pkg, project_type, d))[1]
+    _say(f"{new} message(s) queued; {queue.stats()}")
+    return 0
+
+
+def cmd_dispatch(args) -> int:
+    from .dispatch import dispatch_config_error, get_dispatch_queue, get_dispatcher
+    queue = get_dispatch_queue()
+    if args.status:
+        for r in queue.items(args.status):
+            print(f"{r['id']:>5}  {r['status']:<8} {r['attempts']}  {r['rcpts']}  {r['last_error'] or ''}")
+        print(queue.stats())
+        return 0
+    if dispatch_config_error():
+        _say(f"error: {dispatch_config_error()}")
+        return 2
+    dispatcher = get_dispatcher()
+    try:
+        out = dispatcher.drain(args.drain, on_batch=lambda o: args.progress and _say(str(o)))
+    finally:
+        dispatcher.close()
+    _say(f"{out}; queue {queue.stats()}")
+    return 1 if out["failed"] else 0
+
+
+def cmd_memory(args) -> int:
+    from .contacts import load_contacts, memory_report
+    df = load_contacts(args.workbook or DATA_PATH)
+    rep = memory_report(df)
+    print(rep.to_string(index=False))
+    print(f"{len(df):,} rows, {rep['bytes'].sum() / 1e6:.2f} MB")
+    return 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="elc", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--workbook", type=Path,
+                   help=f"one contacts workbook for every address (default: {DATA_PATH} plus per-state "
+                        f"workbooks in {DIRECTORIES_DIR}, picked by the geocoded state)")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    def site_args(sp):
+        sp.add_argument("address", nargs="?", help=f"site address ({DEFAULT_STATE} is appended if it names no state)")
+        sp.add_argument("--sites", type=Path, help="CSV/XLSX of sites instead of one address")
+        sp.add_argument("--county", default="", help="county override")
+        sp.add_argument("--city", default="", help="city / municipality override")
+        sp.add_argument("--no-census-batch", action="store_true", help="skip the Census bulk pre-geocode for --sites")
+        sp.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS, help="concurrent geocodes for --sites")
+        sp.add_argument("--progress", action="store_true", help="report each resolved site on stderr")
+
+    r = sub.add_parser("resolve", help="address(es) -> jurisdiction and department contacts")
+    site_args(r)
+    r.add_argument("--json", action="store_true", help="JSON output for a single address")
+    r.add_argument("--out", help="CSV output for --sites (default stdout)")
+    e = sub.add_parser("export", help="build request drafts (.eml) into a ZIP")
+    site_args(e)
+    e.add_argument("--apn", default="", help="parcel ID / folio")
+    e.add_argument("--project", default="", help="project number")
+    e.add_argument("--type", choices=["ELC", "AEI"], default="ELC", help="template set (default ELC)")
+    e.add_argument("--out", help="ZIP to write")
+    e.add_argument("--queue", choices=["depts", "all"], help="queue per-department or all-in-one emails for sending")
+    d = sub.add_parser("dispatch", help="send queued email (ELC_SMTP_HOST, ELC_MAIL_FROM)")
+    d.add_argument("--drain", type=float, default=0, metavar="SECONDS",
+                   help="keep sending through throttles and retries for up to SECONDS (default: one pass)")
+    d.add_argument("--status", type=int, nargs="?", const=50, default=0, metavar="N", help="list the last N messages instead of sending")
+    d.add_argument("--progress", action="store_true", help="report each batch on stderr")
+    sub.add_parser("memory", help="per-column memory use of the loaded contacts frame")
+    args = p.parse_args(argv)
+    if args.cmd in ("resolve", "export") and bool(args.address) == bool(args.sites):
+        p.error("give either an address or --sites")
+    if args.cmd == "export" and not (args.out or args.queue):
+        p.error("give --out or --queue")
+
+    from .tracing import get_tracer
+    get_tracer().begin()
+    try:
+        return {"resolve": cmd_resolve, "export": cmd_export, "dispatch": cmd_dispatch,
+                "memory": cmd_memory}[args.cmd](args)
+    finally:
+        get_tracer().write_prometheus(METRICS_PROM_PATH, min_interval=0)
@@ -0,0 +1,43 @@
+"""Paths and tunables, each overridable through an ELC_* environment variable."""
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DATA_PATH = Path(os.environ.get("ELC_DATA_PATH", ROOT / "data" / "master.xlsx"))      # DEFAULT_STATE's directory
+DEFAULT_STATE = os.environ.get("ELC_DEFAULT_STATE", "FL").upper()                      # for addresses that name none
+DIRECTORIES_DIR = Path(os.environ.get("ELC_DIRECTORIES_DIR", ROOT / "data" / "states"))  # GA.xlsx, NC.xlsx, ...
+DIRECTORY_MAX_STATES = int(os.environ.get("ELC_DIRECTORY_MAX_STATES", 4))              # state directories kept loaded (LRU)
+GEOCODE_CACHE_PATH = Path(os.environ.get("ELC_GEOCODE_CACHE", ROOT / "data" / "geocode_cache.sqlite"))
+GEOCODE_CACHE_TTL = int(os.environ.get("ELC_GEOCODE_CACHE_TTL", 30 * 24 * 3600))       # seconds, good matches
+GEOCODE_CACHE_NEG_TTL = int(os.environ.get("ELC_GEOCODE_CACHE_NEG_TTL", 24 * 3600))    # seconds, "No geocoder match"
+GEOCODE_CACHE_MAX = int(os.environ.get("ELC_GEOCODE_CACHE_MAX", 20000))                # rows kept (LRU)
+CENSUS_GEOCODER_BASE = os.environ.get("ELC_CENSUS_GEOCODER", "https://geocoding.geo.census.gov/geocoder")
+CENSUS_BATCH_MAX_ROWS = 10000                                                          # Census addressbatch limit
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("ELC_HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get("ELC_HTTP_READ_TIMEOUT", 12))
+HTTP_RETRIES = int(os.environ.get("ELC_HTTP_RETRIES", 2))                             # extra attempts
+HTTP_MAX_PER_HOST = int(os.environ.get("ELC_HTTP_MAX_PER_HOST", 8))                   # concurrent requests
+GEOCODE_RPS = float(os.environ.get("ELC_GEOCODE_RPS", 10))                           # Census calls/s, all sessions; 0 = unlimited
+GEOCODE_BURST = int(os.environ.get("ELC_GEOCODE_BURST", 20))                          # token bucket size
+GEOCODE_WORKERS = int(os.environ.get("ELC_GEOCODE_WORKERS", HTTP_MAX_PER_HOST))       # lookups in flight
+BREAKER_FAILURES = int(os.environ.get("ELC_BREAKER_FAILURES", 3))                     # consecutive failed requests, to open
+BREAKER_COOLDOWN = float(os.environ.get("ELC_BREAKER_COOLDOWN", 60))                  # seconds open
+RELOAD_POLL_SECONDS = float(os.environ.get("ELC_RELOAD_POLL", 5))                      # 0 disables live reload
+BOUNDARIES_DIR = Path(os.environ.get("ELC_BOUNDARIES_DIR", ROOT / "data" / "boundaries"))
+APN_REGISTRY_PATH = Path(os.environ.get("ELC_APN_REGISTRY", ROOT / "data" / "apn_registry.json"))
+FACILITIES_PATH = Path(os.environ.get("ELC_DEP_FACILITIES", ROOT / "data" / "dep_facilities.csv"))   # OCULUS extract
+MAIL_FROM = os.environ.get("ELC_MAIL_FROM", "")                                       # From: on drafts; required to send
+SMTP_HOST = os.environ.get("ELC_SMTP_HOST", "")                                       # "" = sending disabled
+SMTP_PORT = int(os.environ.get("ELC_SMTP_PORT", 587))
+SMTP_USER = os.environ.get("ELC_SMTP_USER", "")
+SMTP_PASSWORD = os.environ.get("ELC_SMTP_PASSWORD", "")
+SMTP_STARTTLS = os.environ.get("ELC_SMTP_STARTTLS", "1") == "1"
+DISPATCH_QUEUE_PATH = Path(os.environ.get("ELC_DISPATCH_QUEUE", ROOT / "data" / "dispatch_queue.sqlite"))
+DISPATCH_BATCH = int(os.environ.get("ELC_DISPATCH_BATCH", 50))                        # messages per connection
+DISPATCH_DOMAIN_INTERVAL = float(os.environ.get("ELC_DISPATCH_DOMAIN_INTERVAL", 5))    # seconds between sends per domain
+DISPATCH_MAX_ATTEMPTS = int(os.environ.get("ELC_DISPATCH_MAX_ATTEMPTS", 5))            # then marked failed
+TRACKING_DB_PATH = Path(os.environ.get("ELC_TRACKING_DB", ROOT / "data" / "tracking.sqlite"))
+METRICS_PROM_PATH = os.environ.get("ELC_METRICS_PROM", "")                            # textfile-collector output
+DEBUG_TIMING = os.environ.get("ELC_DEBUG_TIMING", "") == "1"                            # or ?debug=1 in the URL
+BATCH_MAX_WORKERS = int(os.environ.get("ELC_BATCH_MAX_WORKERS", 8))                    # concurrent geocodes
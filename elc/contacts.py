@@ -0,0 +1,349 @@
+"""The contacts workbook: loading (with a pickled snapshot), matching and the jurisdiction index."""
+import hashlib, logging, os, pickle, re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .normalize import norm_city, norm_county
+from .tracing import traced
+
+log = logging.getLogger(__name__)
+
+def _notify(notices, level: str, msg: str):
+    """Log a load message and, if the caller passed a list, hand it on for display."""
+    log.log(logging.ERROR if level == "error" else logging.INFO, msg)
+    if notices is not None:
+        notices.append((level, msg))
+
+# ---- Workbook snapshot: normalized frame pickled next to master.xlsx ----
+SNAPSHOT_VERSION = 3   # bump when load_contacts' output shape changes
+
+def _snapshot_path(path: Path) -> Path:
+    return path.with_name(path.name + ".snapshot.pkl")
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def read_contacts_snapshot(path: Path):
+    """Return the snapshotted frame if it still matches the workbook, else None.
+
+    A matching mtime/size is trusted as is; otherwise the workbook is hashed so
+    a touched-but-unchanged file still reuses the snapshot (and is re-stamped).
+    """
+    try:
+        st_ = path.stat()
+        with open(_snapshot_path(path), "rb") as f:
+            meta = pickle.load(f)
+            if meta.get("version") != SNAPSHOT_VERSION or meta.get("size") != st_.st_size:
+                return None
+            fresh = meta.get("mtime_ns") == st_.st_mtime_ns
+            if not fresh and meta.get("sha256") != _file_sha256(path):
+                return None
+            df = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if not fresh:
+        write_contacts_snapshot(path, df, sha256=meta["sha256"], stat=st_)
+    return df
+
+def write_contacts_snapshot(path: Path, df: pd.DataFrame, sha256: str | None = None, stat=None):
+    """Atomically write the snapshot; failures (e.g. read-only data dir) are ignored."""
+    snap = _snapshot_path(path)
+    tmp = snap.with_name(snap.name + f".{os.getpid()}.tmp")
+    try:
+        st_ = stat or path.stat()
+        meta = {"version": SNAPSHOT_VERSION, "mtime_ns": st_.st_mtime_ns, "size": st_.st_size,
+                "sha256": sha256 or _file_sha256(path), "rows": len(df)}
+        with open(tmp, "wb") as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, snap)
+    except OSError:
+        try: tmp.unlink()
+        except OSError: pass
+
+@traced("load_contacts")
+def load_contacts(path: Path, notices: list | None = None) -> pd.DataFrame:
+    """Normalized contacts frame; ``notices`` collects (level, message) pairs for the UI."""
+    path = Path(path)
+    df = read_contacts_snapshot(path)
+    if df is not None:
+        return df
+    st_, sha = path.stat(), _file_sha256(path)   # stamp what we parse, not what is on disk later
+    df = parse_contacts_workbook(path, notices)
+    if "_n_county" in df.columns:
+        write_contacts_snapshot(path, df, sha256=sha, stat=st_)
+    return df
+
+def parse_contacts_workbook(path: Path, notices: list | None = None) -> pd.DataFrame:
+    xl = pd.ExcelFile(path)
+    lower_map = {name.strip().lower(): name for name in xl.sheet_names}
+    for candidate in ("contacts", "contact", "directory", "master", "data", "sheet1"):
+        if candidate in lower_map:
+            sheet = lower_map[candidate]; break
+    else:
+        sheet = xl.sheet_names[0]
+        _notify(notices, "info", f"Using sheet '{sheet}' (no sheet named 'contacts' found).")
+
+    df = xl.parse(sheet).copy()
+    df.columns = [c.strip() for c in df.columns]
+
+    rename_pairs = {
+        "County": ["County"],
+        "City": ["City", "Municipality", "Municipality / City", "Municipality/City"],
+        "Dept Type": ["Dept Type", "Department Type", "Dept"],
+        "Dept Name": ["Dept Name", "Department Name"],
+        "Contact": ["Contact", "Contact Person", "Contacts"],
+        "Title/Role": ["Title/Role", "Title", "Role"],
+        "Phone": ["Phone", "Phone Number"],
+        "Email": ["Email", "Emails"],
+        "Portal URL": ["Portal URL", "Portal", "Public Records Portal", "Records Portal"],
+        "Preferred Method": ["Preferred Method", "Method"],
+        "Notes": ["Notes", "Note"],
+        "Verified": ["Verified"],
+        "Date Verified": ["Date Verified", "Verified Date", "Date Verified (YYYY-MM-DD)"],
+    }
+
+    rename_map = {}
+    for std, alts in rename_pairs.items():
+        for alt in alts:
+            if alt in df.columns:
+                rename_map[alt] = std; break
+    df = df.rename(columns=rename_map)
+
+    required = ["County", "City", "Dept Type", "Dept Name"]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        _notify(notices, "error",
+                "Your workbook is missing required columns: "
+                f"{missing}. Found: {list(df.columns)}")
+        return pd.DataFrame(columns=required + [
+            "Contact","Title/Role","Phone","Email","Portal URL",
+            "Preferred Method","Notes","Verified","Date Verified"
+        ])
+
+    df = df.fillna("")
+    if "Date Verified" in df.columns:
+        df["Date Verified"] = pd.to_datetime(df["Date Verified"], errors="coerce", format="mixed")
+    df = compact_frame(df)
+    df["_n_county"] = _normalized_codes(df["County"], norm_county)
+    df["_n_city"]   = _normalized_codes(df["City"], norm_city)
+    df["_n_dept"]   = _normalized_codes(df["Dept Type"], lambda v: v.strip().lower())
+    return df
+
+# ---- Compact frame: categoricals for repetitive text, keys as category codes ----
+CATEGORY_COLUMNS = ["County", "City", "Dept Type"]   # always categorical: the lookup keys
+CATEGORY_MAX_RATIO = 0.5                             # other text columns: distinct / rows at most this
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the key columns, and any text column that repeats enough, as categoricals."""
+    for c in df.columns:
+        col = df[c]
+        if not (col.dtype == object or pd.api.types.is_string_dtype(col)):
+            continue
+        if c in CATEGORY_COLUMNS or col.nunique() <= CATEGORY_MAX_RATIO * len(col):
+            df[c] = col.astype("category")
+    return df
+
+def _normalized_codes(col: pd.Series, fn) -> pd.Categorical:
+    """Normalize each distinct value once; rows keep integer codes into the folded keys."""
+    col = col.astype("category")
+    keys = np.asarray([fn(str(v)) for v in col.cat.categories], dtype=object)
+    uniq, key_of_cat = np.unique(keys, return_inverse=True) if len(keys) else (keys, np.empty(0, dtype=np.int64))
+    return pd.Categorical.from_codes(key_of_cat[col.cat.codes.to_numpy()], categories=uniq)
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Deep bytes, dtype and distinct values per column, largest first."""
+    usage = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({
+        "column": usage.index, "dtype": [str(df[c].dtype) for c in usage.index],
+        "bytes": usage.to_numpy(), "distinct": [df[c].nunique() for c in usage.index],
+    }).sort_values("bytes", ascending=False, ignore_index=True)
+
+@traced("match_contacts")
+def match_contacts(contacts, county, city):
+    ncounty, ncity = norm_county(county), norm_city(city)
+    in_county = contacts[contacts["_n_county"] == ncounty]
+    exact     = in_county[in_county["_n_city"] == ncity]
+    uninc     = in_county[in_county["_n_city"] == "unincorporated"]
+    wildcard  = in_county[in_county["_n_city"] == "*"]
+    if not exact.empty:
+        return pd.concat([exact, wildcard], ignore_index=True).drop_duplicates(), True
+    if not uninc.empty:
+        return pd.concat([uninc, wildcard], ignore_index=True).drop_duplicates(), False
+    if not wildcard.empty:
+        return wildcard, False
+    return contacts.iloc[0:0], False
+
+DEPTS = ["building","planning","environmental","fire"]
+
+# ---- Contact channels: one email / portal URL per row, normalized at load ----
+EMAIL_RE = r"[a-z0-9._%+'-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}"
+
+def explode_emails(df) -> pd.DataFrame:
+    """Long table (row, email): every valid address in the Email cells, lower-cased."""
+    if "Email" not in df.columns:
+        return pd.DataFrame({"row": np.empty(0, dtype=np.int64), "email": np.empty(0, dtype=object)})
+    parts = df["Email"].astype(str).str.lower().str.split(r"[,;\s<>]+", regex=True)
+    long = pd.DataFrame({"row": np.arange(len(df)), "email": parts.to_numpy(dtype=object)}).explode("email")
+    long = long[long["email"].str.fullmatch(EMAIL_RE, na=False)]
+    return long.drop_duplicates().astype({"row": np.int64}).reset_index(drop=True)
+
+def explode_portals(df) -> pd.DataFrame:
+    """Long table (row, url): each non-blank Portal URL."""
+    if "Portal URL" not in df.columns:
+        return pd.DataFrame({"row": np.empty(0, dtype=np.int64), "url": np.empty(0, dtype=object)})
+    urls = df["Portal URL"].astype(str).str.strip().to_numpy(dtype=object)
+    keep = np.flatnonzero(urls != "")
+    return pd.DataFrame({"row": keep.astype(np.int64), "url": urls[keep]})
+
+def _by_row(rows, vals, n: int):
+    """CSR over a long table: values of row p are vals[off[p]:off[p + 1]]."""
+    order = np.argsort(rows, kind="stable")
+    return np.searchsorted(rows[order], np.arange(n + 1)), vals[order]
+
+# Per-frame versions, same normalization as the long tables
+_EMAIL_SPLIT, _EMAIL_OK = re.compile(r"[,;\s<>]+"), re.compile(EMAIL_RE)
+
+def email_list(df):
+    if "Email" not in df.columns: return []
+    return sorted({m for v in df["Email"].astype(str).str.lower().tolist()
+                   for m in _EMAIL_SPLIT.split(v) if _EMAIL_OK.fullmatch(m)})
+
+def portal_urls(df):
+    if "Portal URL" not in df.columns: return []
+    return list(dict.fromkeys(u for u in df["Portal URL"].astype(str).str.strip().tolist() if u))
+
+def split_by_dept(df):
+    out = {}
+    for dep in DEPTS:
+        out[dep] = df[df["_n_dept"]==dep]
+    return out
+
+class JurisdictionIndex:
+    """Precomputed match_contacts/split_by_dept results for a loaded directory.
+
+    Row positions are grouped once by (_n_county, _n_city, _n_dept); a lookup is
+    then a dict hit instead of eight boolean-mask scans. Results follow
+    match_contacts exactly: exact city (+ "*"), else "unincorporated" (+ "*"),
+    else "*" alone, with the same drop_duplicates / index behaviour.
+
+    Passing the index of the previous load as ``previous`` rebuilds only the
+    counties whose rows changed; the others are re-pointed at their new rows.
+
+    Emails and portal URLs are exploded once into long tables (``emails``,
+    ``portals``); ``contact_points`` gathers them per jurisdiction from the
+    cell positions and memoizes the result, all-emails list included.
+    """
+
+    def __init__(self, df: pd.DataFrame, previous: "JurisdictionIndex | None" = None):
+        self.df = df
+        self.empty = df.iloc[0:0]
+        self._memo, self._points = {}, {}
+        self.emails, self.portals = explode_emails(df), explode_portals(df)
+        self._email_off, self._email_val = _by_row(self.emails["row"].to_numpy(), self.emails["email"].to_numpy(), len(df))
+        self._portal_off, self._portal_val = _by_row(self.portals["row"].to_numpy(), self.portals["url"].to_numpy(), len(df))
+        self._cells, self._fallback, self._sig, self._pos = {}, {}, {}, {}
+        self.rebuilt = self.reused = 0
+        if df.empty:
+            return
+        # Identical rows share a hash, mirroring drop_duplicates() on the concat
+        row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        cols = (df["_n_city"].to_numpy(dtype=object), df["_n_dept"].to_numpy(dtype=object), row_hash)
+        for c, pos in df.groupby("_n_county", sort=False, observed=True).indices.items():
+            sig = row_hash[pos].tobytes()
+            self._sig[c], self._pos[c] = sig, pos
+            if previous is not None and previous._sig.get(c) == sig:
+                self._reuse_county(c, previous, pos)
+            else:
+                self._build_county(c, pos, *cols)
+
+    def _build_county(self, c, pos, city_of, dept_of, row_hash):
+        by_city = {}                                   # city -> [positions], workbook order
+        for p in pos.tolist():
+            by_city.setdefault(city_of[p], []).append(p)
+
+        def dedupe(pos):
+            # -> (positions kept, their labels in the ignore_index concat)
+            seen, out, labels = set(), [], []
+            for i, p in enumerate(pos):
+                h = row_hash[p]
+                if h not in seen:
+                    seen.add(h); out.append(p); labels.append(i)
+            return out, labels
+
+        def entry(pos, labels, exact):
+            split = {dep: [i for i, p in enumerate(pos) if dept_of[p] == dep] for dep in DEPTS}
+            return np.asarray(pos, dtype=np.int64), labels, split, exact
+
+        wildcard = by_city.get("*", [])
+        for city, cpos in by_city.items():
+            self._cells[(c, city)] = entry(*dedupe(cpos + wildcard), True)
+        uninc = by_city.get("unincorporated", [])
+        if uninc:
+            self._fallback[c] = entry(*dedupe(uninc + wildcard), False)
+        elif wildcard:
+            self._fallback[c] = entry(wildcard, None, False)
+        self.rebuilt += 1
+
+    def _reuse_county(self, c, previous, pos):
+        remap = dict(zip(previous._pos[c].tolist(), pos.tolist()))
+        move = np.vectorize(remap.__getitem__, otypes=[np.int64])
+        for key, e in previous._cells.items():
+            if key[0] == c:
+                self._cells[key] = (move(e[0]),) + e[1:]
+        if c in previous._fallback:
+            e = previous._fallback[c]
+            self._fallback[c] = (move(e[0]),) + e[1:]
+        self.reused += 1
+
+    @traced("match_contacts.index")
+    def lookup(self, county, city):
+        """-> (matched, {dept: frame}, exact), same as match_contacts + split_by_dept."""
+        key = (norm_county(county), norm_city(city))
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        e = self._cells.get(key) or self._fallback.get(key[0])
+        if e is None:
+            hit = (self.empty, {dep: self.empty for dep in DEPTS}, False)
+        else:
+            pos, labels, split, exact = e
+            matched = self.df.iloc[pos]
+            if labels is not None:
+                matched = matched.set_axis(pd.Index(labels, dtype="int64"))
+            hit = (matched, {dep: matched.iloc[split[dep]] for dep in DEPTS}, exact)
+        if len(self._memo) > 4096:
+            self._memo.clear()
+        self._memo[key] = hit
+        return hit
+
+    def match(self, county, city):
+        matched, _, exact = self.lookup(county, city)
+        return matched, exact
+
+    def contact_points(self, county, city) -> dict:
+        """-> {"emails": {dept: [...]}, "portals": {dept: [...]}, "all_emails": [...]}, memoized.
+
+        Same values as email_list / portal_urls over the lookup's per-dept frames.
+        """
+        key = (norm_county(county), norm_city(city))
+        hit = self._points.get(key)
+        if hit is not None:
+            return hit
+        e = self._cells.get(key) or self._fallback.get(key[0])
+        emails, portals = {}, {}
+        for dep in DEPTS:
+            pos = e[0][e[2][dep]].tolist() if e is not None else []
+            emails[dep] = sorted({m for p in pos for m in self._email_val[self._email_off[p]:self._email_off[p + 1]]})
+            portals[dep] = list(dict.fromkeys(u for p in pos for u in self._portal_val[self._portal_off[p]:self._portal_off[p + 1]]))
+        hit = {"emails": emails, "portals": portals, "all_emails": sorted(set().union(*emails.values()))}
+        if len(self._points) > 4096:
+            self._points.clear()
+        self._points[key] = hit
+        return hit
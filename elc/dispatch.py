@@ -0,0 +1,267 @@
+"""Opt-in outbound email: a persistent SQLite outbox drained over one reused SMTP connection.
+
+Nothing is sent unless both ``ELC_SMTP_HOST`` and ``ELC_MAIL_FROM`` are set.
+Drafts are rendered to RFC 822 once, at enqueue time, under an idempotency
+key (recipients + subject + body by default), so re-running a search or an
+export can't queue the same request twice. ``SmtpDispatcher.send_due`` sends
+due messages in batches over a single connection, spaces sends to each
+recipient domain, re-queues transient (4xx / network) failures with backoff
+and marks permanent (5xx) ones failed.
+
+A message queued with a ``track`` link reports its final outcome (sent or
+failed) to the request tracker, whichever process drains it.
+"""
+import hashlib, json, smtplib, sqlite3, threading, time
+from pathlib import Path
+
+from .config import (DISPATCH_BATCH, DISPATCH_DOMAIN_INTERVAL, DISPATCH_MAX_ATTEMPTS, DISPATCH_QUEUE_PATH, MAIL_FROM,
+                     SMTP_HOST, SMTP_PASSWORD, SMTP_PORT, SMTP_STARTTLS, SMTP_USER)
+from .export import draft_to_eml
+from .resources import shared
+from .tracking import get_request_tracker
+
+RETRY_BASE_SECONDS = 60          # doubles per attempt
+RETRY_MAX_SECONDS = 3600
+CLAIM_TIMEOUT = 900              # a "sending" row older than this (crashed sender) is due again
+
+def dispatch_enabled() -> bool:
+    return bool(SMTP_HOST and MAIL_FROM)
+
+def dispatch_config_error() -> str:
+    """Why sending is off, as a message naming the missing setting ("" when enabled)."""
+    missing = [name for name, val in (("ELC_SMTP_HOST", SMTP_HOST), ("ELC_MAIL_FROM", MAIL_FROM)) if not val]
+    return f"set {' and '.join(missing)} to send email" if missing else ""
+
+def idempotency_key(draft, mail_from: str = MAIL_FROM) -> str:
+    rcpts = sorted({e.lower() for e in draft["emails"]})
+    doc = json.dumps([mail_from.lower(), rcpts, draft["subject"].strip(), draft["body"]])
+    return hashlib.sha256(doc.encode("utf-8")).hexdigest()
+
+def _domains(rcpts):
+    return {r.rsplit("@", 1)[-1] for r in rcpts}
+
+class DispatchQueue:
+    """SQLite outbox: queued -> sending -> sent | failed, one row per idempotency key."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY, idem TEXT NOT NULL UNIQUE, mail_from TEXT NOT NULL, rcpts TEXT NOT NULL,"
+            " subject TEXT, message BLOB NOT NULL, status TEXT NOT NULL DEFAULT 'queued',"
+            " attempts INTEGER NOT NULL DEFAULT 0, next_at REAL NOT NULL, last_error TEXT,"
+            " created REAL NOT NULL, sent_at REAL, track TEXT)"
+        )
+        if "track" not in {r[1] for r in self._db.execute("PRAGMA table_info(outbox)")}:   # pre-tracking outbox
+            self._db.execute("ALTER TABLE outbox ADD COLUMN track TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox(status, next_at)")
+        self._db.commit()
+
+    def enqueue(self, draft, mail_from: str = MAIL_FROM, key: str = None, track: dict = None):
+        """Queue one draft -> (id, queued). ``queued`` is False when the key was
+        already queued or sent; a previously failed key is queued again.
+        ``track`` (RequestTracker.dispatch_track) is handed back with the outcome."""
+        rcpts = sorted({e.lower() for e in draft["emails"]})
+        if not rcpts:
+            raise ValueError("draft has no recipients")
+        if not mail_from:
+            raise ValueError("no sender address: set ELC_MAIL_FROM before queueing email")
+        key = key or idempotency_key(draft, mail_from)
+        message = draft_to_eml(draft, mail_from, unsent=False, headers={"Message-ID": f"<{key[:40]}@elc>"})
+        now, track = time.time(), json.dumps(track) if track else None
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO outbox (idem, mail_from, rcpts, subject, message, next_at, created, track)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, mail_from, json.dumps(rcpts), draft["subject"].strip(), message, now, now, track))
+            if cur.rowcount:
+                self._db.commit()
+                return cur.lastrowid, True
+            cur = self._db.execute(
+                "UPDATE outbox SET status = 'queued', attempts = 0, next_at = ?, last_error = NULL,"
+                " track = COALESCE(?, track) WHERE idem = ? AND status = 'failed'", (now, track, key))
+            self._db.commit()
+            row = self._db.execute("SELECT id FROM outbox WHERE idem = ?", (key,)).fetchone()
+            return row["id"], bool(cur.rowcount)
+
+    def claim(self, limit: int):
+        """Mark up to ``limit`` due rows as sending and return them, oldest first."""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "UPDATE outbox SET status = 'sending', next_at = ? WHERE id IN ("
+                " SELECT id FROM outbox WHERE (status = 'queued' AND next_at <= ?)"
+                "  OR (status = 'sending' AND next_at <= ?) ORDER BY next_at, id LIMIT ?)"
+                " RETURNING id, idem, mail_from, rcpts, message, attempts, track",
+                (now + CLAIM_TIMEOUT, now, now, limit)).fetchall()
+            self._db.commit()
+        return sorted(({**dict(r), "rcpts": json.loads(r["rcpts"]), "track": r["track"] and json.loads(r["track"])}
+                       for r in rows), key=lambda r: r["id"])
+
+    def _set(self, sql: str, args):
+        with self._lock:
+            self._db.execute(sql, args)
+            self._db.commit()
+
+    def mark_sent(self, msg_id: int, note: str = None):
+        self._set("UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1, last_error = ?"
+                  " WHERE id = ?", (time.time(), note, msg_id))
+
+    def defer(self, msg_id: int, until: float):
+        """Back to the queue without counting an attempt (domain throttle)."""
+        self._set("UPDATE outbox SET status = 'queued', next_at = ? WHERE id = ?", (until, msg_id))
+
+    def retry(self, msg_id: int, attempts: int, err: str, max_attempts: int = DISPATCH_MAX_ATTEMPTS) -> str:
+        if attempts + 1 >= max_attempts:
+            return self.fail(msg_id, err)
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempts)
+        self._set("UPDATE outbox SET status = 'queued', attempts = attempts + 1, next_at = ?, last_error = ?"
+                  " WHERE id = ?", (time.time() + delay, err, msg_id))
+        return "retry"
+
+    def fail(self, msg_id: int, err: str) -> str:
+        self._set("UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                  (err, msg_id))
+        return "failed"
+
+    def next_due(self):
+        """Epoch seconds of the next queued message, or None if nothing is waiting."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT MIN(next_at) FROM outbox WHERE status IN ('queued', 'sending')").fetchone()[0]
+
+    def items(self, limit: int = 200):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, status, subject, rcpts, attempts, last_error, created, sent_at FROM outbox"
+                " ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [{**dict(r), "rcpts": ", ".join(json.loads(r["rcpts"]))} for r in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {"queued": 0, "sending": 0, "sent": 0, "failed": 0, **{s: n for s, n in rows}}
+
+class SmtpDispatcher:
+    """Drains a DispatchQueue over one SMTP connection, kept open between batches
+    and checked with NOOP before reuse. ``on_outcome(track, "sent" | "failed")``
+    runs for each tracked message once it is settled."""
+
+    def __init__(self, queue: DispatchQueue, host: str = SMTP_HOST, port: int = SMTP_PORT, user: str = SMTP_USER,
+                 password: str = SMTP_PASSWORD, starttls: bool = SMTP_STARTTLS,
+                 domain_interval: float = DISPATCH_DOMAIN_INTERVAL, max_attempts: int = DISPATCH_MAX_ATTEMPTS,
+                 timeout: float = 30, on_outcome=None):
+        self.queue, self.host, self.port, self.user, self.password = queue, host, port, user, password
+        self.on_outcome = on_outcome
+        self.starttls, self.timeout = starttls, timeout
+        self.domain_interval, self.max_attempts = domain_interval, max_attempts
+        self._smtp = None
+        self._last = {}                # recipient domain -> time.time() of the last send
+        self._lock = threading.Lock()
+        self.connects = 0
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop()
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.starttls and smtp.has_extn("starttls"):
+            smtp.starttls()
+            smtp.ehlo()
+        if self.user:
+            smtp.login(self.user, self.password)
+        self._smtp = smtp
+        self.connects += 1
+        return smtp
+
+    def _drop(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.close()
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            self._drop()
+
+    def _send(self, row) -> str:
+        if not row["mail_from"]:                # queued before ELC_MAIL_FROM was required
+            return self.queue.fail(row["id"], "no sender address (set ELC_MAIL_FROM)")
+        try:
+            refused = self._connection().sendmail(row["mail_from"], row["rcpts"], row["message"])
+        except smtplib.SMTPRecipientsRefused as e:
+            err = "; ".join(f"{r}: {code} {msg.decode(errors='replace')}" for r, (code, msg) in e.recipients.items())
+            if all(code >= 500 for code, _ in e.recipients.values()):
+                return self.queue.fail(row["id"], err)
+            return self.queue.retry(row["id"], row["attempts"], err, self.max_attempts)
+        except smtplib.SMTPResponseException as e:
+            err = f"{e.smtp_code} {e.smtp_error.decode(errors='replace')}"
+            if e.smtp_code >= 500:
+                return self.queue.fail(row["id"], err)
+            return self.queue.retry(row["id"], row["attempts"], err, self.max_attempts)
+        except (smtplib.SMTPException, OSError) as e:   # connection lost / refused: reconnect next time
+            self._drop()
+            return self.queue.retry(row["id"], row["attempts"], f"{type(e).__name__}: {e}", self.max_attempts)
+        note = "; ".join(f"{r}: {code}" for r, (code, _) in refused.items()) or None
+        self.queue.mark_sent(row["id"], note)
+        return "sent"
+
+    def send_due(self, limit: int = DISPATCH_BATCH) -> dict:
+        """Send up to ``limit`` due messages -> counts per outcome (sent / retry / failed / deferred)."""
+        out = {"sent": 0, "retry": 0, "failed": 0, "deferred": 0}
+        with self._lock:
+            for row in self.queue.claim(limit):
+                domains, now = _domains(row["rcpts"]), time.time()
+                ready = max(self._last.get(d, 0) + self.domain_interval for d in domains)
+                if ready > now:
+                    self.queue.defer(row["id"], ready)
+                    out["deferred"] += 1
+                    continue
+                outcome = self._send(row)
+                out[outcome] += 1
+                if outcome == "sent":
+                    self._last.update(dict.fromkeys(domains, time.time()))
+                if outcome in ("sent", "failed") and row["track"] and self.on_outcome:
+                    self.on_outcome(row["track"], outcome)
+        return out
+
+    def drain(self, max_seconds: float = 300, on_batch=None) -> dict:
+        """``send_due`` until the queue is empty, sleeping through throttles and
+        backoffs for at most ``max_seconds``."""
+        total = {"sent": 0, "retry": 0, "failed": 0, "deferred": 0}
+        deadline = time.time() + max_seconds
+        while True:
+            out = self.send_due()
+            for k, n in out.items():
+                total[k] += n
+            if on_batch:
+                on_batch(out)
+            due = self.queue.next_due()
+            if due is None or due > deadline:
+                return total
+            time.sleep(max(0.0, due - time.time()))
+
+@shared
+def get_dispatch_queue() -> DispatchQueue:
+    return DispatchQueue(DISPATCH_QUEUE_PATH)
+
+@shared
+def get_dispatcher() -> SmtpDispatcher:
+    return SmtpDispatcher(get_dispatch_queue(), on_outcome=get_request_tracker().record_dispatch)
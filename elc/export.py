@@ -0,0 +1,62 @@
+"""Request-package export: drafts -> .eml -> ZIP, one item at a time."""
+import re, zipfile
+from email import policy as email_policy
+from email.message import EmailMessage
+
+from .config import MAIL_FROM
+from .resolve import build_search_package
+
+def package_drafts(pkg, bodies=None):
+    """Yield each draft in a search package; ``bodies`` overrides text by dept key."""
+    bodies = bodies or {}
+    for sec in pkg["sections"]:
+        if sec["draft"]:
+            yield dict(sec["draft"], key=sec["key"], body=bodies.get(sec["key"], sec["draft"]["body"]))
+    if pkg["all"]:
+        yield dict(pkg["all"], key="all", body=bodies.get("all", pkg["all"]["body"]))
+
+def draft_to_eml(draft, mail_from: str = MAIL_FROM, unsent: bool = True, headers=None) -> bytes:
+    """RFC 822 message, marked unsent so mail clients open it as a draft
+    (``unsent=False`` for messages handed to SMTP)."""
+    msg = EmailMessage()
+    if mail_from:
+        msg["From"] = mail_from
+    if draft["emails"]:
+        msg["To"] = ", ".join(draft["emails"])
+    msg["Subject"] = draft["subject"].strip()
+    if unsent:
+        msg["X-Unsent"] = "1"
+    for name, value in (headers or {}).items():
+        msg[name] = value
+    msg.set_content(draft["body"])
+    return msg.as_bytes(policy=email_policy.SMTP)   # CRLF line endings
+
+def safe_name(*parts) -> str:
+    name = "_".join(str(p).strip() for p in parts if str(p).strip())
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-")[:80] or "site"
+
+def iter_package_files(packages):
+    """(folder, pkg[, bodies]) items -> (zip path, .eml bytes), lazily."""
+    for folder, pkg, *rest in packages:
+        for d in package_drafts(pkg, *rest):
+            yield f"{folder}/{d['key']}.eml", draft_to_eml(d)
+
+def iter_batch_packages(jindex, results, project_type):
+    """Build each resolved batch row's search package only when it is consumed."""
+    for _, r in results.iterrows():
+        if r["Status"] != "OK":
+            continue
+        pkg = build_search_package(jindex, r["Address"], r["County"], r["City"],
+                                   r["APN"], r["Project"], project_type, priority="batch")
+        yield safe_name(f"{int(r['#']):04d}", r["Project"], r["Address"]), pkg
+
+def write_zip(files, fileobj, on_file=None) -> int:
+    """Stream (name, bytes) pairs into a ZIP; only one draft is in memory at a time."""
+    n = 0
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files:
+            zf.writestr(name, data)
+            n += 1
+            if on_file:
+                on_file(n, name)
+    return n
@@ -0,0 +1,141 @@
+"""Nearest DEP facilities: a local extract of Facility-Site IDs behind a k-d tree.
+
+The extract (``ELC_DEP_FACILITIES``, CSV or XLSX) needs a Facility-Site ID and
+coordinates; name, address, county and program columns are shown when present.
+Points go onto the unit sphere, where straight-line (chord) distance orders
+the same as great-circle distance, so one Euclidean tree answers radius and
+k-nearest queries anywhere in the state without a projection.
+"""
+import heapq, math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import FACILITIES_PATH
+from .resources import shared
+
+EARTH_RADIUS_MI = 3958.8
+
+FACILITY_COLUMN_ALIASES = {
+    "Facility-Site ID": ["Facility-Site ID", "Facility Site ID", "Facility ID", "FACILITY_ID", "SITE_ID", "ID"],
+    "Name": ["Name", "Facility Name", "Site Name", "FACILITY_NAME", "SITE_NAME"],
+    "Latitude": ["Latitude", "Lat", "LAT", "LATITUDE", "Y"],
+    "Longitude": ["Longitude", "Lon", "Long", "LON", "LONG", "LONGITUDE", "X"],
+    "Address": ["Address", "Site Address", "Location Address", "ADDRESS"],
+    "City": ["City", "CITY"],
+    "County": ["County", "COUNTY", "County Name"],
+    "Program": ["Program", "Program Area", "PROGRAM", "Facility Type"],
+}
+
+def _unit_xyz(lat, lon):
+    lat, lon = np.radians(np.asarray(lat, dtype=float)), np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+class KDTree:
+    """Static k-d tree: median splits on the widest axis, leaves of ``leaf_size`` points.
+
+    Points are stored in tree order so a leaf is one contiguous slice, scored
+    with a single numpy expression; ``query`` descends the near side first and
+    skips any subtree whose splitting plane is farther than the current k-th
+    best (or the radius).
+    """
+
+    def __init__(self, pts, leaf_size: int = 16):
+        pts = np.asarray(pts, dtype=float)
+        self.leaf_size = leaf_size
+        self.perm = np.arange(len(pts))
+        self.nodes = []                  # (lo, hi, dim, split, left, right); dim -1 marks a leaf
+        if len(pts):
+            self._build(pts, 0, len(pts))
+        self.pts = pts[self.perm]
+
+    def _build(self, pts, lo, hi) -> int:
+        node = len(self.nodes)
+        self.nodes.append(None)
+        if hi - lo <= self.leaf_size:
+            self.nodes[node] = (lo, hi, -1, 0.0, -1, -1)
+            return node
+        seg = pts[self.perm[lo:hi]]
+        dim = int(np.ptp(seg, axis=0).argmax())
+        mid = (lo + hi) // 2
+        self.perm[lo:hi] = self.perm[lo:hi][np.argpartition(seg[:, dim], mid - lo)]
+        split = float(pts[self.perm[mid], dim])
+        left = self._build(pts, lo, mid)
+        right = self._build(pts, mid, hi)
+        self.nodes[node] = (lo, hi, dim, split, left, right)
+        return node
+
+    def query(self, x, k: int = 1, max_dist: float = math.inf):
+        """-> (distances, indices into the original points), nearest first."""
+        x = np.asarray(x, dtype=float)
+        best = []                        # max-heap of (-d2, index) holding the k best so far
+        r2 = max_dist * max_dist
+
+        def bound():
+            return min(r2, -best[0][0]) if len(best) == k else r2
+
+        def visit(node):
+            lo, hi, dim, split, left, right = self.nodes[node]
+            if dim < 0:
+                d2 = ((self.pts[lo:hi] - x) ** 2).sum(axis=1)
+                for j in np.flatnonzero(d2 <= bound()):
+                    item = (-float(d2[j]), int(self.perm[lo + j]))
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+                return
+            diff = x[dim] - split
+            near, far = (left, right) if diff <= 0 else (right, left)
+            visit(near)
+            if diff * diff <= bound():
+                visit(far)
+
+        if self.nodes and k > 0:
+            visit(0)
+        best.sort(reverse=True)
+        return np.sqrt([-d for d, _ in best]), np.array([i for _, i in best], dtype=np.int64)
+
+class FacilityIndex:
+    """DEP facilities with coordinates -> ranked neighbours of a property."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self.tree = KDTree(_unit_xyz(self.df["Latitude"], self.df["Longitude"]))
+
+    def __len__(self):
+        return len(self.df)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "FacilityIndex":
+        path = Path(path)
+        if path.suffix.lower() in (".xlsx", ".xls"):
+            raw = pd.read_excel(path, dtype=str)
+        else:
+            raw = pd.read_csv(path, dtype=str)
+        raw.columns = [str(c).strip() for c in raw.columns]
+        lower_cols = {c.lower(): c for c in raw.columns}
+        df = pd.DataFrame(index=raw.index)
+        for std, alts in FACILITY_COLUMN_ALIASES.items():
+            src = next((lower_cols[a.lower()] for a in alts if a.lower() in lower_cols), None)
+            df[std] = raw[src].fillna("").str.strip() if src else ""
+        df["Latitude"] = pd.to_numeric(df["Latitude"], errors="coerce")
+        df["Longitude"] = pd.to_numeric(df["Longitude"], errors="coerce")
+        ok = df["Latitude"].between(-90, 90) & df["Longitude"].between(-180, 180) & (df["Facility-Site ID"] != "")
+        return cls(df[ok])
+
+    def nearest(self, lat: float, lon: float, k: int = 10, radius_mi: float = 1.0) -> pd.DataFrame:
+        """Up to ``k`` facilities within ``radius_mi`` of the point, nearest first, with a Distance (mi) column."""
+        chord = 2 * math.sin(min(radius_mi / EARTH_RADIUS_MI, math.pi) / 2)
+        dist, idx = self.tree.query(_unit_xyz([lat], [lon])[0], k=k, max_dist=chord)
+        out = self.df.iloc[idx].copy()
+        out.insert(0, "Distance (mi)", (2 * EARTH_RADIUS_MI * np.arcsin(np.clip(dist / 2, 0, 1))).round(2))
+        return out.reset_index(drop=True)
+
+def get_facility_index(path: Path = FACILITIES_PATH) -> "FacilityIndex | None":
+    return _load_facilities(Path(path))
+
+@shared
+def _load_facilities(path: Path) -> "FacilityIndex | None":
+    return FacilityIndex.from_file(path) if path.exists() else None
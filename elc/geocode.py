@@ -0,0 +1,418 @@
+"""Census geocoding: single-line lookups behind an SQLite cache, plus bulk addressbatch."""
+import csv, heapq, io, itertools, json, re, sqlite3, threading, time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from .config import (BATCH_MAX_WORKERS, CENSUS_BATCH_MAX_ROWS, CENSUS_GEOCODER_BASE, DEFAULT_STATE, GEOCODE_BURST,
+                     GEOCODE_CACHE_MAX,
+                     GEOCODE_CACHE_NEG_TTL, GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL, GEOCODE_RPS, GEOCODE_WORKERS)
+from .httpclient import get_http_client
+from .normalize import address_key, norm_state
+from .resources import shared
+from .tracing import get_tracer, traced
+
+def _geocode_key(addr: str) -> str:
+    """Cache / in-flight key: the USPS-normalized address, so "123 NW 5th St" and
+    "123 Northwest 5th Street, FL" share one entry."""
+    return address_key(addr or "")
+
+class GeocodeCache:
+    """SQLite-backed geocode cache with TTL, LRU eviction and negative entries."""
+
+    def __init__(self, path: Path, ttl: int = GEOCODE_CACHE_TTL,
+                 neg_ttl: int = GEOCODE_CACHE_NEG_TTL, max_entries: int = GEOCODE_CACHE_MAX):
+        self.path, self.ttl, self.neg_ttl, self.max_entries = Path(path), ttl, neg_ttl, max_entries
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " key TEXT PRIMARY KEY, info TEXT, err TEXT,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode(accessed)")
+        self._db.commit()
+
+    def get(self, addr: str):
+        """Return (hit, info, err); expired rows count as a miss and are dropped."""
+        key, now = _geocode_key(addr), time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT info, err, created FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                info, err, created = row
+                ttl = self.neg_ttl if err else self.ttl
+                if now - created <= ttl:
+                    self._db.execute("UPDATE geocode SET accessed = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self.hits += 1
+                    return True, (json.loads(info) if info else None), err
+                self._db.execute("DELETE FROM geocode WHERE key = ?", (key,))
+                self._db.commit()
+            self.misses += 1
+            return False, None, None
+
+    def put(self, addr: str, info, err):
+        key, now = _geocode_key(addr), time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode (key, info, err, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(info) if info is not None else None, err, now, now),
+            )
+            self._db.execute(
+                "DELETE FROM geocode WHERE key IN ("
+                " SELECT key FROM geocode ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM geocode")
+            self._db.commit()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": n,
+                "hit_rate": (self.hits / total) if total else 0.0}
+
+@shared
+def get_geocode_cache() -> GeocodeCache:
+    return GeocodeCache(GEOCODE_CACHE_PATH)
+
+def _census_geocode(addr: str):
+    url = f"{CENSUS_GEOCODER_BASE}/locations/onelineaddress"
+    params = {"address": addr, "benchmark": "Public_AR_Current", "format": "json"}
+    r = get_http_client().get(url, params=params)
+    r.raise_for_status()
+    data = r.json()
+    matches = data.get("result", {}).get("addressMatches", [])
+    if not matches: return None, "No geocoder match"
+    m = matches[0]
+    comps = m.get("addressComponents", {})
+    geog = m.get("geographies", {})
+    county = ""
+    if geog:
+        for k in ["Counties","County"]:
+            if k in geog and geog[k]:
+                county = geog[k][0].get("NAME", county)
+    if not county:
+        county = comps.get("county","")
+    city = comps.get("city") or comps.get("municipality") or ""
+    coords = m.get("coordinates") or {}
+    return {"city": city, "county": county, "state": norm_state(comps.get("state", "")) or DEFAULT_STATE,
+            "lat": coords.get("y"), "lon": coords.get("x")}, None
+
+# ---- Geocode scheduler: one request budget for every session and batch job ----
+class TokenBucket:
+    """``rate`` tokens/s up to ``burst``; ``take`` blocks until a token is due."""
+
+    def __init__(self, rate: float = GEOCODE_RPS, burst: int = GEOCODE_BURST):
+        self.rate, self.burst = rate, max(1, burst)
+        self.tokens, self._t = float(self.burst), time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._t) * self.rate)
+        self._t = now
+
+    def take(self) -> float:
+        """Reserve one token and sleep until it is earned; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1                    # may go negative: a reservation others queue behind
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def level(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+class GeocodeScheduler:
+    """Process-wide queue in front of the Census single-address geocoder.
+
+    A worker claims one waiting job, spends a TokenBucket token, then takes the
+    best waiting job, interactive lookups before batch ones. Workers never hold
+    more claims than there are queued jobs, so no token is spent idle.
+
+    A lookup for an address that is already queued or running shares that
+    job's Future instead of calling Census again (an interactive duplicate
+    also promotes a queued batch job). Answers are written to the geocode
+    cache before the job leaves the in-flight table. ``metrics()`` reports
+    queue depth and wait times.
+    """
+
+    PRIORITIES = {"interactive": 0, "batch": 1}
+
+    def __init__(self, fn=None, rate: float = GEOCODE_RPS, burst: int = GEOCODE_BURST,
+                 workers: int = GEOCODE_WORKERS):
+        self._fn = fn or _census_geocode
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._heap, self._seq = [], itertools.count()
+        self._inflight = {}           # cache key -> job
+        self._queued = self._claimed = 0
+        self._waits = deque(maxlen=2000)
+        self.calls = self.merged = 0
+        self._threads = []
+
+    def submit(self, addr: str, priority: str = "interactive") -> Future:
+        key, prio = _geocode_key(addr), self.PRIORITIES[priority]
+        with self._cond:
+            job = self._inflight.get(key)
+            if job is not None:
+                self.merged += 1
+                if prio < job["prio"] and job["started"] is None:
+                    job["prio"] = prio
+                    heapq.heappush(self._heap, (prio, next(self._seq), job))
+                    self._cond.notify()
+                return job["future"]
+            job = {"key": key, "addr": addr, "prio": prio, "future": Future(),
+                   "submitted": time.monotonic(), "started": None}
+            self._inflight[key] = job
+            self._queued += 1
+            heapq.heappush(self._heap, (prio, next(self._seq), job))
+            if len(self._threads) < self.workers:
+                t = threading.Thread(target=self._work, name=f"geocode-{len(self._threads)}", daemon=True)
+                self._threads.append(t)
+                t.start()
+            self._cond.notify()
+            return job["future"]
+
+    def _pop(self):
+        # Skip heap entries left behind by a promotion (job already taken)
+        while self._heap:
+            prio, _, job = heapq.heappop(self._heap)
+            if job["started"] is None and prio == job["prio"]:
+                self._queued -= 1
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while self._queued <= self._claimed:
+                    self._cond.wait()
+                self._claimed += 1              # a job is held for us; the token is never wasted
+            self.bucket.take()                  # wait for budget before choosing, so late interactive jobs win
+            with self._cond:
+                self._claimed -= 1
+                job = self._pop()
+                job["started"] = time.monotonic()
+                wait = job["started"] - job["submitted"]
+                self._waits.append(wait)
+                self.calls += 1
+            get_tracer().observe("geocode.wait", wait * 1000)
+            try:
+                info, err = self._fn(job["addr"])
+                get_geocode_cache().put(job["addr"], info, err)
+                job["future"].set_result((info, err))
+            except BaseException as e:          # surfaces in every caller sharing the job
+                job["future"].set_exception(e)
+            finally:
+                with self._cond:
+                    self._inflight.pop(job["key"], None)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            queued = [j["prio"] for j in self._inflight.values() if j["started"] is None]
+            running = len(self._inflight) - len(queued)
+            waits = sorted(self._waits)
+        pct = lambda q: round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1) if waits else None
+        return {"queued_interactive": queued.count(0), "queued_batch": queued.count(1), "running": running,
+                "calls": self.calls, "merged": self.merged, "wait_p50_ms": pct(0.50), "wait_p90_ms": pct(0.90),
+                "wait_max_ms": pct(1.0), "rate_per_s": self.bucket.rate, "tokens": round(self.bucket.level(), 2)}
+
+@shared
+def get_geocode_scheduler() -> GeocodeScheduler:
+    return GeocodeScheduler()
+
+@traced("geocode_address")
+def geocode_address(addr: str, priority: str = "interactive"):
+    """Geocode via Census, answering repeats from the on-disk cache.
+
+    Misses go through the shared GeocodeScheduler (rate limit, dedupe,
+    interactive before ``"batch"``). Only definitive answers are cached (a
+    match, or "No geocoder match"); network/HTTP errors propagate and are
+    retried on the next search.
+    """
+    hit, info, err = get_geocode_cache().get(addr)
+    if hit:
+        return info, err
+    return get_geocode_scheduler().submit(addr, priority).result()
+
+# ---- Census batch geocoding (addressbatch) ----
+# The batch geographies endpoint only returns FIPS codes, not names: FL's are
+# tabled, other states' are looked up once per county (county_name).
+FL_COUNTY_FIPS = {
+    "001": "Alachua", "003": "Baker", "005": "Bay", "007": "Bradford", "009": "Brevard",
+    "011": "Broward", "013": "Calhoun", "015": "Charlotte", "017": "Citrus", "019": "Clay",
+    "021": "Collier", "023": "Columbia", "027": "DeSoto", "029": "Dixie", "031": "Duval",
+    "033": "Escambia", "035": "Flagler", "037": "Franklin", "039": "Gadsden", "041": "Gilchrist",
+    "043": "Glades", "045": "Gulf", "047": "Hamilton", "049": "Hardee", "051": "Hendry",
+    "053": "Hernando", "055": "Highlands", "057": "Hillsborough", "059": "Holmes", "061": "Indian River",
+    "063": "Jackson", "065": "Jefferson", "067": "Lafayette", "069": "Lake", "071": "Lee",
+    "073": "Leon", "075": "Levy", "077": "Liberty", "079": "Madison", "081": "Manatee",
+    "083": "Marion", "085": "Martin", "086": "Miami-Dade", "087": "Monroe", "089": "Nassau",
+    "091": "Okaloosa", "093": "Okeechobee", "095": "Orange", "097": "Osceola", "099": "Palm Beach",
+    "101": "Pasco", "103": "Pinellas", "105": "Polk", "107": "Putnam", "109": "St. Johns",
+    "111": "St. Lucie", "113": "Santa Rosa", "115": "Sarasota", "117": "Seminole", "119": "Sumter",
+    "121": "Suwannee", "123": "Taylor", "125": "Union", "127": "Volusia", "129": "Wakulla",
+    "131": "Walton", "133": "Washington",
+}
+FL_STATE_FIPS = "12"
+_COUNTY_NAMES = {(FL_STATE_FIPS, fips): f"{name} County" for fips, name in FL_COUNTY_FIPS.items()}
+
+def county_name(state_fips: str, county_fips: str, lon, lat, base_url: str = CENSUS_GEOCODER_BASE) -> str:
+    """County name for a FIPS pair ("" if unknown). Outside the FL table, one
+    Census coordinates lookup at a point in the county names it for the process."""
+    key = (state_fips, county_fips)
+    if key not in _COUNTY_NAMES and lon is not None and lat is not None:
+        get_geocode_scheduler().bucket.take()
+        r = get_http_client().get(f"{base_url}/geographies/coordinates", params={
+            "x": lon, "y": lat, "benchmark": "Public_AR_Current", "vintage": "Current_Current",
+            "layers": "Counties", "format": "json"})
+        r.raise_for_status()
+        found = r.json().get("result", {}).get("geographies", {}).get("Counties") or []
+        if found and found[0].get("NAME"):
+            _COUNTY_NAMES[key] = found[0]["NAME"]
+    return _COUNTY_NAMES.get(key, "")
+
+def _split_oneline(addr: str):
+    """'123 Main St, Fort Myers, FL 33967' -> (street, city, state, zip); best effort."""
+    parts = [p.strip() for p in (addr or "").split(",") if p.strip()]
+    street = parts[0] if parts else ""
+    city = state = zipc = ""
+    rest = parts[1:]
+    if rest:
+        m = re.match(r"^([A-Za-z]{2})\s*(\d{5})?(?:-\d{4})?$", rest[-1])
+        if m:
+            state, zipc = m.group(1).upper(), m.group(2) or ""
+            rest = rest[:-1]
+        elif re.fullmatch(r"\d{5}(?:-\d{4})?", rest[-1]):
+            zipc, rest = rest[-1][:5], rest[:-1]
+        if rest:
+            city = rest[-1]
+    return street, city, state, zipc
+
+def _parse_batch_row(row, base_url: str = CENSUS_GEOCODER_BASE):
+    """One addressbatch CSV response row -> (info, err); None if the row needs a
+    single-line retry (Tie, a malformed row, a county that couldn't be named)."""
+    status = row[2].strip() if len(row) >= 3 else ""
+    if status == "No_Match":
+        return None, "No geocoder match"          # definitive, cached like a single-line miss
+    if status != "Match" or len(row) < 5:
+        return None
+    mparts = [p.strip() for p in row[4].split(",")]
+    city = mparts[-3] if len(mparts) >= 4 else ""
+    state = mparts[-2] if len(mparts) >= 4 else ""
+    lon = lat = None
+    if len(row) >= 6 and "," in row[5]:
+        try:
+            lon, lat = (float(v) for v in row[5].split(",")[:2])
+        except ValueError:
+            pass
+    county = ""
+    if len(row) >= 10 and row[8].strip():
+        try:
+            county = county_name(row[8].strip(), row[9].strip(), lon, lat, base_url)
+        except requests.RequestException:
+            return None
+        if not county:
+            return None
+    return {"city": city, "county": county, "state": norm_state(state) or DEFAULT_STATE, "lat": lat, "lon": lon}, None
+
+class CensusBatchGeocoder:
+    """Bulk geocoding through the Census ``geographies/addressbatch`` endpoint.
+
+    Addresses are answered from the geocode cache where possible; the rest are
+    sent in chunks of up to ``chunk_size`` rows. Matches and definitive No_Match
+    rows are cached. Rows the batch couldn't settle (Tie, missing, a failed
+    chunk) are retried through ``geocode_address`` on ``max_workers`` threads,
+    or with ``retry_single=False`` left as None for the caller to look up.
+    ``base_url`` lets a local stand-in replace Census.
+    """
+
+    def __init__(self, base_url: str = CENSUS_GEOCODER_BASE, chunk_size: int = CENSUS_BATCH_MAX_ROWS,
+                 timeout: int = 600, retry_single: bool = True, max_workers: int = BATCH_MAX_WORKERS):
+        self.base_url, self.timeout, self.retry_single = base_url, timeout, retry_single
+        self.chunk_size = max(1, min(chunk_size, CENSUS_BATCH_MAX_ROWS))
+        self.max_workers = max(1, max_workers)
+
+    def _post_chunk(self, addrs):
+        get_geocode_scheduler().bucket.take()        # one bulk call spends one token
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        for i, a in enumerate(addrs):
+            w.writerow([i, *_split_oneline(a)])
+        r = get_http_client().post(
+            f"{self.base_url}/geographies/addressbatch",
+            data={"benchmark": "Public_AR_Current", "vintage": "Current_Current"},
+            files={"addressFile": ("addresses.csv", buf.getvalue().encode("utf-8"), "text/csv")},
+            timeout=self.timeout,
+        )
+        r.raise_for_status()
+        out = {}
+        for row in csv.reader(io.StringIO(r.text)):
+            if row and row[0].strip().isdigit():
+                out[int(row[0])] = _parse_batch_row(row, self.base_url)
+        return [out.get(i) for i in range(len(addrs))]
+
+    def geocode_many(self, addrs, on_progress=None):
+        """Return [(info, err), ...] aligned with ``addrs`` (None for rows left
+        unanswered when ``retry_single`` is off)."""
+        cache = get_geocode_cache()
+        results = [None] * len(addrs)
+        todo = {}                      # cache key -> (address, [positions])
+        for i, a in enumerate(addrs):
+            hit, info, err = cache.get(a)
+            if hit:
+                results[i] = (info, err)
+            else:
+                todo.setdefault(_geocode_key(a), (a, []))[1].append(i)
+
+        pending, retry = list(todo.values()), []
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            try:
+                answers = self._post_chunk([a for a, _ in chunk])
+            except requests.RequestException:
+                answers = [None] * len(chunk)
+            for (a, positions), ans in zip(chunk, answers):
+                if ans is None:
+                    retry.append((a, positions))
+                    continue
+                cache.put(a, *ans)
+                for i in positions:
+                    results[i] = ans
+            if on_progress:
+                on_progress(min(start + self.chunk_size, len(pending)), len(pending))
+
+        if self.retry_single and retry:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for (a, positions), ans in zip(retry, pool.map(self._retry_one, [a for a, _ in retry])):
+                    for i in positions:
+                        results[i] = ans
+        return results
+
+    @staticmethod
+    def _retry_one(addr):
+        try:
+            return geocode_address(addr, priority="batch")
+        except requests.RequestException as e:
+            return None, f"Geocoder error: {e}"
@@ -0,0 +1,141 @@
+"""Shared HTTP client: pooling, retries with jitter, per-host limits, circuit breaker."""
+import random, threading, time, urllib.parse
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import BREAKER_COOLDOWN, BREAKER_FAILURES, HTTP_CONNECT_TIMEOUT, HTTP_MAX_PER_HOST, HTTP_READ_TIMEOUT, HTTP_RETRIES
+from .resources import shared
+
+class ServiceUnavailable(requests.RequestException):
+    """Raised without touching the network while a host's circuit is open."""
+
+class CircuitBreaker:
+    """closed -> open after ``failures`` consecutive failed requests (a request's
+    retries count once); half-open probe after ``cooldown``."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.failures, self.cooldown = failures, cooldown
+        self.state, self.consecutive, self.opened_at, self.trips = "closed", 0, 0.0, 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half-open"
+            if self.state == "half-open" and not self._probing:
+                self._probing = True       # exactly one trial request
+                return True
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.state, self.consecutive = "closed", 0
+                return
+            self.consecutive += 1
+            if self.state == "half-open" or self.consecutive >= self.failures:
+                if self.state != "open":
+                    self.trips += 1
+                self.state, self.opened_at = "open", time.monotonic()
+
+class HttpClient:
+    """Thread-safe requests wrapper shared by every session in the process.
+
+    One pooled Session (keep-alive), at most ``max_per_host`` requests in flight
+    per host, bounded retries with full-jitter backoff on connection errors,
+    429 and 5xx (read timeouts are not retried: they already cost the full
+    timeout), and a per-host CircuitBreaker so callers fail fast while a
+    service is down. Latencies are kept per host for ``metrics()``.
+
+    The breaker sees one outcome per ``request`` call, so a single user's
+    retries can't open it for everyone.
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, retries: int = HTTP_RETRIES, max_per_host: int = HTTP_MAX_PER_HOST,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), backoff: float = 0.25):
+        self.retries, self.max_per_host, self.timeout, self.backoff = retries, max_per_host, timeout, backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._hosts = {}              # host -> {"sem", "breaker", "lat", "ok", "err"}
+
+    def _host(self, url: str) -> dict:
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            h = self._hosts.get(host)
+            if h is None:
+                h = self._hosts[host] = {"sem": threading.BoundedSemaphore(self.max_per_host),
+                                         "breaker": CircuitBreaker(), "lat": deque(maxlen=2000),
+                                         "ok": 0, "err": 0}
+            return h
+
+    def request(self, method: str, url: str, timeout=None, **kw) -> requests.Response:
+        h = self._host(url)
+        breaker = h["breaker"]
+        if not breaker.allow():
+            raise ServiceUnavailable(f"{urllib.parse.urlsplit(url).netloc} is unavailable (circuit open)")
+        ok = False
+        try:
+            for attempt in range(self.retries + 1):
+                t0 = time.perf_counter()
+                try:
+                    with h["sem"]:
+                        r = self.session.request(method, url, timeout=timeout or self.timeout, **kw)
+                except requests.ReadTimeout:
+                    self._record(h, t0, ok=False)
+                    raise
+                except (requests.ConnectionError, requests.Timeout):
+                    self._record(h, t0, ok=False)
+                    if attempt == self.retries:
+                        raise
+                except requests.RequestException:
+                    self._record(h, t0, ok=False)
+                    raise
+                else:
+                    bad = r.status_code in self.RETRY_STATUS
+                    self._record(h, t0, ok=not bad)
+                    if not bad or attempt == self.retries:
+                        ok = not bad
+                        return r
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+            raise AssertionError("unreachable")
+        finally:
+            # One outcome per request, retries included, and always recorded so a half-open probe resolves
+            breaker.record(ok)
+
+    def get(self, url: str, **kw) -> requests.Response:
+        return self.request("GET", url, **kw)
+
+    def post(self, url: str, **kw) -> requests.Response:
+        return self.request("POST", url, **kw)
+
+    def _record(self, h, t0, ok):
+        h["lat"].append(time.perf_counter() - t0)
+        h["ok" if ok else "err"] += 1
+
+    def metrics(self) -> dict:
+        """Per host: request counts, latency percentiles (ms) and breaker state."""
+        out = {}
+        with self._lock:
+            hosts = list(self._hosts.items())
+        for host, h in hosts:
+            lat = sorted(h["lat"])
+            pct = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 1) if lat else None
+            b = h["breaker"]
+            out[host] = {"ok": h["ok"], "errors": h["err"], "p50_ms": pct(0.50), "p90_ms": pct(0.90),
+                         "p99_ms": pct(0.99), "breaker": b.state, "breaker_trips": b.trips}
+        return out
+
+@shared
+def get_http_client() -> HttpClient:
+    return HttpClient()
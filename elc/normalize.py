@@ -0,0 +1,122 @@
+"""County / city name folding shared by the workbook, lookups and APN checks."""
+import re
+
+def norm_county(val: str) -> str:
+    if not isinstance(val, str): return ""
+    v = val.strip().lower()
+    v = re.sub(r"\s+county\b.*", "", v)
+    v = v.replace("saint", "st").replace(".", "").strip()
+    return v
+
+def norm_city(val: str) -> str:
+    if not isinstance(val, str): return ""
+    v = val.strip().lower()
+    v = v.replace("saint", "st").replace(".", "").strip()
+    return v
+
+# Column versions of the above for pandas Series (same results for text, one pass)
+def norm_county_column(s):
+    v = s.fillna("").astype(str).str.strip().str.lower()
+    v = v.str.replace(r"\s+county\b.*", "", regex=True)
+    return v.str.replace("saint", "st", regex=False).str.replace(".", "", regex=False).str.strip()
+
+def norm_city_column(s):
+    v = s.fillna("").astype(str).str.strip().str.lower()
+    return v.str.replace("saint", "st", regex=False).str.replace(".", "", regex=False).str.strip()
+
+# ---- Street addresses: USPS Publication 28 style folding for cache / dedupe keys ----
+STREET_SUFFIXES = {
+    "alley": "aly", "avenue": "ave", "av": "ave", "boulevard": "blvd", "boul": "blvd", "causeway": "cswy",
+    "center": "ctr", "circle": "cir", "circ": "cir", "court": "ct", "cove": "cv", "crossing": "xing",
+    "drive": "dr", "drv": "dr", "expressway": "expy", "freeway": "fwy", "highway": "hwy", "hiway": "hwy",
+    "island": "is", "isle": "isle", "key": "ky", "lake": "lk", "lane": "ln", "loop": "loop", "manor": "mnr",
+    "parkway": "pkwy", "pky": "pkwy", "place": "pl", "plaza": "plz", "point": "pt", "road": "rd",
+    "route": "rte", "run": "run", "square": "sq", "street": "st", "str": "st", "terrace": "ter",
+    "trail": "trl", "turnpike": "tpke", "way": "way",
+}
+DIRECTIONALS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+# Secondary unit designators; all fold to "#" so "Apt 4", "Unit 4" and "#4" key alike
+UNIT_DESIGNATORS = {"apartment", "apt", "unit", "suite", "ste", "room", "rm", "space", "spc", "lot", "#"}
+ORDINALS = {"first": "1st", "second": "2nd", "third": "3rd", "fourth": "4th", "fifth": "5th", "sixth": "6th",
+            "seventh": "7th", "eighth": "8th", "ninth": "9th", "tenth": "10th"}
+STATE_TOKENS = {"fl", "fla", "florida"}
+
+_ZIP_RE = re.compile(r"^(\d{5})(?:-?\d{4})?$")
+
+def norm_address(val: str) -> tuple:
+    """'123 Northwest 5th Street, Apt 4, FL 33967-1234' -> ('123 nw 5th st # 4', '33967').
+
+    Case and punctuation are folded, suffixes / directionals / ordinals take
+    their USPS abbreviations and unit designators collapse to "#". Trailing
+    state names and ZIP (+4) are split off, so an address typed with or
+    without ", FL" folds the same. Returns (street and city, zip5).
+    """
+    if not isinstance(val, str): return "", ""
+    v = val.lower().replace(".", "").replace("#", " # ")
+    tokens = re.sub(r"[^\w\s#-]", " ", v).split()
+    zip5 = ""
+    while tokens and (tokens[-1] in STATE_TOKENS or tokens[-1] in ("usa", "us") or _ZIP_RE.match(tokens[-1])):
+        m = _ZIP_RE.match(tokens.pop())
+        if m and not zip5:
+            zip5 = m.group(1)
+    out = []
+    for t in tokens:
+        if t in UNIT_DESIGNATORS:
+            if out and out[-1] == "#":     # "Apt #4"
+                continue
+            t = "#"
+        else:
+            t = STREET_SUFFIXES.get(t) or DIRECTIONALS.get(t) or ORDINALS.get(t) or t
+        out.append(t)
+    return " ".join(out).strip(" -"), zip5
+
+def address_key(val: str) -> str:
+    """Canonical key for an address: ``norm_address`` parts joined, ZIP last."""
+    street, zip5 = norm_address(val)
+    return f"{street} {zip5}".strip()
+
+# ---- States: which directory an address belongs to ----
+US_STATES = {
+    "AL": "alabama", "AK": "alaska", "AZ": "arizona", "AR": "arkansas", "CA": "california", "CO": "colorado",
+    "CT": "connecticut", "DE": "delaware", "DC": "district of columbia", "FL": "florida", "GA": "georgia",
+    "HI": "hawaii", "ID": "idaho", "IL": "illinois", "IN": "indiana", "IA": "iowa", "KS": "kansas",
+    "KY": "kentucky", "LA": "louisiana", "ME": "maine", "MD": "maryland", "MA": "massachusetts", "MI": "michigan",
+    "MN": "minnesota", "MS": "mississippi", "MO": "missouri", "MT": "montana", "NE": "nebraska", "NV": "nevada",
+    "NH": "new hampshire", "NJ": "new jersey", "NM": "new mexico", "NY": "new york", "NC": "north carolina",
+    "ND": "north dakota", "OH": "ohio", "OK": "oklahoma", "OR": "oregon", "PA": "pennsylvania", "PR": "puerto rico",
+    "RI": "rhode island", "SC": "south carolina", "SD": "south dakota", "TN": "tennessee", "TX": "texas",
+    "UT": "utah", "VT": "vermont", "VA": "virginia", "WA": "washington", "WV": "west virginia", "WI": "wisconsin",
+    "WY": "wyoming",
+}
+_STATE_BY_NAME = {name: code for code, name in US_STATES.items()}
+
+def norm_state(val: str) -> str:
+    """'fl' / 'Florida' / 'Fla.' -> 'FL'; '' when it isn't a state."""
+    if not isinstance(val, str): return ""
+    v = val.strip().replace(".", "")
+    if v.upper() in US_STATES:
+        return v.upper()
+    return "FL" if v.lower() == "fla" else _STATE_BY_NAME.get(v.lower(), "")
+
+def address_state(addr: str) -> str:
+    """State named at the end of a one-line address ('..., Atlanta, GA 30303' -> 'GA'), else ''.
+
+    Only the last comma-separated part counts; a full state name needs a city
+    before it, so '1 Main St, Washington' stays a city.
+    """
+    parts = [p.strip() for p in (addr or "").split(",") if p.strip()]
+    if len(parts) < 2:
+        return ""
+    last = re.sub(r"\s*\d{5}(?:-?\d{4})?$", "", parts[-1]).strip()
+    if not last and len(parts) >= 3:                   # "..., GA, 30303"
+        last = parts[-2]
+    if len(parts) < 3 and len(last.replace(".", "")) > 3:
+        return ""
+    return norm_state(last)
+
+def with_state(addr: str, default: str) -> str:
+    """Append ``default`` unless the address already names a state."""
+    return addr if address_state(addr) else f"{addr}, {default}"
@@ -0,0 +1,219 @@
+"""Address -> jurisdiction -> contacts, for one site (search packages) or a batch."""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+
+import pandas as pd
+import requests
+
+from .apn import apn_notice, check_labels, get_apn_registry
+from .boundaries import get_boundaries
+from .config import BATCH_MAX_WORKERS, DEFAULT_STATE
+from .geocode import CensusBatchGeocoder, geocode_address
+from .normalize import address_key, address_state, norm_city, norm_county, norm_state, with_state
+from .store import DirectoryRegistry
+from .templates import TEMPLATE_SETS, TEMPLATES, render_template
+
+def resolve_location(addr, county_override="", municipality_override="", priority="interactive"):
+    """Geocode ``addr`` and apply overrides -> (city, county, state, err).
+
+    Addresses that don't name a state are taken to be in DEFAULT_STATE. When
+    local boundary polygons are installed, the geocoded point decides county
+    and municipality; the geocoder's own fields are the fallback.
+
+    ``priority`` is the geocode scheduler queue ("interactive" or "batch").
+    """
+    county_override = (county_override or "").strip()
+    municipality_override = (municipality_override or "").strip()
+    state = address_state(addr) or DEFAULT_STATE
+    try:
+        info, err = geocode_address(with_state(addr, state), priority=priority)
+    except requests.RequestException as e:
+        # Geocoder down or circuit open: the overrides alone are enough to continue
+        if not county_override:
+            raise
+        info, err = None, f"Geocoder unavailable ({e})"
+    if err and not county_override and not municipality_override:
+        return "", "", state, err
+    info = dict(info or {})
+    state = norm_state(info.get("state", "")) or state
+    bounds = get_boundaries()
+    if bounds is not None:
+        poly_city, poly_county = bounds.resolve(info.get("lat"), info.get("lon"))
+        if poly_county:
+            info["county"] = poly_county
+            if poly_city is not None:
+                info["city"] = poly_city
+    final_city = municipality_override or info.get("city", "")
+    final_county = county_override or info.get("county", "")
+    if not final_county:
+        return final_city, "", state, "Could not determine county. Please provide a county override."
+    return final_city, final_county, state, None
+
+def resolve_jurisdiction(addr, county_override="", municipality_override="", priority="interactive"):
+    """``resolve_location`` without the state -> (city, county, err)."""
+    city, county, _, err = resolve_location(addr, county_override, municipality_override, priority)
+    return city, county, err
+
+def _index_for(directory, state):
+    """``directory`` is one JurisdictionIndex or a DirectoryRegistry routed by ``state`` -> (jindex, err)."""
+    if not isinstance(directory, DirectoryRegistry):
+        return directory, None
+    jindex = directory.jindex(state)
+    return jindex, None if jindex is not None else f"No contacts directory for {state}."
+
+def resolve_site(jindex, addr, county_override="", municipality_override="", priority="interactive"):
+    """One site end to end: jurisdiction, matched contacts and per-dept split.
+
+    ``jindex`` may be a DirectoryRegistry, which picks the geocoded state's directory.
+    """
+    city, county, state, err = resolve_location(addr, county_override, municipality_override, priority)
+    if not err:
+        jindex, err = _index_for(jindex, state)
+    if err:
+        return {"city": city, "county": county, "state": state, "error": err, "matched": pd.DataFrame(),
+                "depts": {}, "points": None}
+    matched, depts, _ = jindex.lookup(county, city)
+    return {"city": city, "county": county, "state": state, "error": None, "matched": matched, "depts": depts,
+            "points": jindex.contact_points(county, city)}
+
+DEPT_LABELS = [("building","Building"),("planning","Planning"),("environmental","Environmental"),("fire","Fire")]
+
+def build_search_package(jindex, addr, county_override, municipality_override, apn, project, project_type,
+                         priority="interactive"):
+    """Everything a Finder search shows, computed once: notices, per-dept
+    contacts/portals/drafts/emails and the all-in-one draft. ``jindex`` may be
+    a DirectoryRegistry, routed by the geocoded state."""
+    pkg = {"notices": [], "sections": [], "all": None}
+    if not addr.strip():
+        pkg["notices"].append(("error", "Address is required.")); return pkg
+
+    # Pick template set by project type
+    templates = TEMPLATE_SETS.get(project_type, TEMPLATES)
+
+    try:
+        final_city, final_county, state, err = resolve_location(addr, county_override, municipality_override, priority)
+    except requests.RequestException as e:
+        pkg["notices"].append(("error", f"The Census geocoder is not responding ({e}). "
+                                        "Enter a County (and City) to continue without it."))
+        pkg["transient"] = True   # don't memoize; retry on the next rerun
+        return pkg
+    if not err:
+        jindex, err = _index_for(jindex, state)
+    if err:
+        pkg["notices"].append(("error", err)); return pkg
+
+    pkg["state"] = state
+    where = final_county if state == DEFAULT_STATE else f"{final_county}, {state}"
+    pkg["notices"].append(("success", f"Using jurisdiction: {final_city or '(unincorporated)'} — {where} · Project type: {project_type}"))
+    notice = apn_notice(final_county, final_city, apn)
+    if notice:
+        pkg["notices"].append(notice)
+
+    matched, depts, _ = jindex.lookup(final_county, final_city)
+    if matched.empty:
+        pkg["notices"].append(("warning", "No contacts configured yet for this jurisdiction.")); return pkg
+
+    ctx = {"address": addr, "city": final_city, "county": final_county, "apn": apn, "project": project}
+    pkg.update(ctx)
+    show = ["County","City","Dept Type","Dept Name","Contact","Email","Portal URL","Preferred Method","Notes"]
+
+    points = jindex.contact_points(final_county, final_city)
+    dept_emails_map = points["emails"]
+    for dep_key, dep_label in DEPT_LABELS:
+        df = depts.get(dep_key, pd.DataFrame())
+        sec = {"key": dep_key, "label": dep_label, "table": None, "portals": [], "draft": None}
+        if not df.empty:
+            sec["table"] = df[[c for c in show if c in df.columns]]
+            sec["portals"] = points["portals"][dep_key]
+            tpl = templates.get(dep_key)
+            if tpl:
+                sec["draft"] = {"subject": tpl["subject"], "body": render_template(tpl, ctx),
+                                "emails": dept_emails_map[dep_key]}
+        pkg["sections"].append(sec)
+
+    all_emails = points["all_emails"]
+    ctx_all = dict(ctx)
+    ctx_all.update({f"{k}_emails": ", ".join(v) for k, v in dept_emails_map.items()})
+    ctx_all["all_emails"] = ", ".join(all_emails)
+    tpl_all = templates.get("all")
+    if tpl_all:
+        pkg["all"] = {"subject": tpl_all["subject"], "body": render_template(tpl_all, ctx_all), "emails": all_emails}
+    return pkg
+
+# ---- Batch input: column aliases for uploaded site lists ----
+SITE_COLUMN_ALIASES = {
+    "Address": ["Address", "Site Address", "Property Address", "Street Address"],
+    "APN": ["APN", "APN #", "APN#", "Parcel ID", "Parcel", "Folio"],
+    "Project": ["Project", "Project #", "Project No", "Project Number"],
+    "County": ["County", "County Override"],
+    "City": ["City", "Municipality", "City / Municipality"],
+}
+
+def read_sites(name: str, data: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV/XLSX of sites into Address/APN/Project/County/City."""
+    if name.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(BytesIO(data), dtype=str)
+    else:
+        df = pd.read_csv(BytesIO(data), dtype=str)
+    df.columns = [str(c).strip() for c in df.columns]
+    lower_cols = {c.lower(): c for c in df.columns}
+    out = pd.DataFrame(index=df.index)
+    for std, alts in SITE_COLUMN_ALIASES.items():
+        src = next((lower_cols[a.lower()] for a in alts if a.lower() in lower_cols), None)
+        out[std] = df[src] if src else ""
+    out = out.fillna("").astype(str).apply(lambda col: col.str.strip())
+    return out[out["Address"] != ""].reset_index(drop=True)
+
+def _batch_row(i, site, res):
+    row = {"#": i + 1, "Address": site["Address"], "APN": site["APN"], "Project": site["Project"],
+           "City": res["city"], "County": res["county"], "State": res["state"], "Status": res["error"] or "OK"}
+    if not res["error"] and res["matched"].empty:
+        row["Status"] = "No contacts configured"
+    for dep_key, dep_label in DEPT_LABELS:
+        row[dep_label] = ", ".join(res["points"]["emails"][dep_key]) if res["points"] else ""
+    return row
+
+def _resolve_site_safe(jindex, site):
+    try:
+        return resolve_site(jindex, site["Address"], site["County"], site["City"], priority="batch")
+    except Exception as e:  # network / HTTP errors stay per-row in batch mode
+        return {"city": "", "county": "", "state": address_state(site["Address"]) or DEFAULT_STATE,
+                "error": f"Geocoder error: {e}", "matched": pd.DataFrame(), "depts": {}, "points": None}
+
+def resolve_sites(jindex, sites: pd.DataFrame, census_batch: bool = True, max_workers: int = BATCH_MAX_WORKERS,
+                  on_census_progress=None):
+    """Resolve every row of ``read_sites`` output concurrently, yielding result rows as they finish.
+
+    With ``census_batch`` the geocode cache is warmed in bulk first, so the
+    per-row pass mostly hits it; rows the batch couldn't settle are geocoded by
+    that pass, on the same pool. Rows repeating an earlier site (``address_key``
+    plus the same overrides) share its result. ``on_census_progress(done, total)``
+    follows the bulk step.
+    """
+    if census_batch:
+        # Same query text resolve_location geocodes, so the per-row pass hits these entries
+        CensusBatchGeocoder(retry_single=False).geocode_many(
+            [with_state(a, address_state(a) or DEFAULT_STATE) for a in sites["Address"]],
+            on_progress=on_census_progress)
+    # Repeats of one site (same normalized address and overrides) resolve once
+    groups = {}
+    for i, site in sites.iterrows():
+        key = (address_key(site["Address"]), norm_county(site["County"]), norm_city(site["City"]))
+        groups.setdefault(key, []).append(i)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_resolve_site_safe, jindex, sites.loc[rows[0]]): rows for rows in groups.values()}
+        for fut in as_completed(futures):
+            res = fut.result()
+            for i in futures[fut]:
+                yield _batch_row(i, sites.loc[i], res)
+
+def collect_results(rows) -> pd.DataFrame:
+    """Batch rows -> table in input order, APNs normalized and cross-checked in one pass."""
+    results = pd.DataFrame(rows)
+    if results.empty:
+        return results
+    results = results.sort_values("#").reset_index(drop=True)
+    chk = get_apn_registry().check(results["APN"], results["County"], results["City"])
+    results["APN"] = chk["normalized"]
+    results.insert(results.columns.get_loc("APN") + 1, "APN Check", check_labels(chk))
+    return results
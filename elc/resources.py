@@ -0,0 +1,20 @@
+"""Process-wide shared objects, the headless stand-in for ``st.cache_resource``."""
+import functools, threading
+
+def shared(fn):
+    """Build ``fn(*args)`` once per distinct arguments and hand every caller the same object.
+
+    Construction holds a lock, so two threads (or Streamlit sessions) racing on
+    first use don't start two reload watchers or open two cache connections.
+    """
+    made, lock = {}, threading.Lock()
+
+    @functools.wraps(fn)
+    def wrapper(*args):
+        with lock:
+            if args not in made:
+                made[args] = fn(*args)
+            return made[args]
+
+    wrapper.clear = made.clear
+    return wrapper
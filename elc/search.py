@@ -0,0 +1,139 @@
+"""Directory search: inverted index + trigram typo tolerance."""
+import bisect, re
+
+import numpy as np
+import pandas as pd
+
+SEARCH_FIELDS = {  # column -> weight
+    "Dept Name": 3.0, "Contact": 3.0, "Title/Role": 2.0, "Email": 2.0,
+    "City": 2.0, "County": 2.0, "Dept Type": 1.5, "Notes": 1.0, "Preferred Method": 1.0, "Portal URL": 0.5,
+}
+SEARCH_STOPWORDS = {"a", "an", "and", "the", "of", "for", "with", "that", "in", "at", "to", "on", "or"}
+
+def _search_tokens(text) -> list:
+    return [t for t in re.split(r"[^0-9a-z]+", str(text).lower()) if t and t not in SEARCH_STOPWORDS]
+
+def _trigrams(token: str) -> set:
+    t = f"  {token} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+class ContactSearchIndex:
+    """Ranked, typo-tolerant search over the contact text fields.
+
+    Tokens are kept as a sorted vocabulary with CSR-style postings (row,
+    field weight), plus a trigram -> token-id index for near-miss spellings
+    scored by trigram Dice similarity; prefixes count too, so results update
+    as you type. Scoring is done with numpy over the postings. Per-row token
+    tables are keyed by row hash, so a reload (``previous``) only re-tokenizes
+    rows that changed.
+    """
+
+    PREFIX_LIMIT = 500   # vocabulary tokens a short prefix may expand to
+
+    def __init__(self, df: pd.DataFrame, previous: "ContactSearchIndex | None" = None):
+        self.n_rows = len(df)
+        self.vocab, self._tok_id, self._gram_id = [], {}, {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._rows, self._w = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        self._tok_len = np.empty(0, dtype=np.int64)
+        self._tokens = pd.DataFrame({"h": pd.Series(dtype="uint64"), "token": pd.Series(dtype=object),
+                                     "w": pd.Series(dtype="float32")})
+        self.retokenized = 0
+        fields = [c for c in SEARCH_FIELDS if c in df.columns]
+        if df.empty or not fields:
+            return
+        hashes = pd.util.hash_pandas_object(df[fields], index=False).to_numpy()
+        prev = previous._tokens if previous is not None else self._tokens
+        fresh = ~np.isin(hashes, prev["h"].to_numpy())
+        self.retokenized = int(fresh.sum())
+        self._tokens = pd.concat([prev[prev["h"].isin(hashes)],
+                                  self._tokenize(df.loc[fresh, fields], hashes[fresh])], ignore_index=True)
+
+        long = pd.DataFrame({"h": hashes, "row": np.arange(len(df))}).merge(self._tokens, on="h")
+        codes, vocab = pd.factorize(long["token"], sort=True)
+        order = np.lexsort((long["row"].to_numpy(), codes))
+        self.vocab = vocab.tolist()
+        self._tok_id = {t: i for i, t in enumerate(self.vocab)}
+        self._offsets = np.searchsorted(codes[order], np.arange(len(self.vocab) + 1))
+        self._rows = long["row"].to_numpy()[order]
+        self._w = long["w"].to_numpy(dtype=np.float32)[order]
+        self._tok_len = np.fromiter((len(t) for t in self.vocab), dtype=np.int64, count=len(self.vocab))
+
+        # Trigram -> token ids, built column-wise: slice k of every padded token at once
+        padded = pd.Series([f"  {t} " for t in self.vocab], dtype=object)
+        plen = padded.str.len().to_numpy()
+        gram_parts, id_parts = [], []
+        for k in range(int(plen.max()) - 2):
+            idx = np.flatnonzero(plen - 2 > k)
+            gram_parts.append(padded.iloc[idx].str.slice(k, k + 3).to_numpy(dtype=object))
+            id_parts.append(idx)
+        gcodes, guniq = pd.factorize(np.concatenate(gram_parts))
+        key = np.sort(gcodes.astype(np.int64) * len(self.vocab) + np.concatenate(id_parts))
+        key = key[np.r_[True, key[1:] != key[:-1]]]          # a gram repeated within a token counts once
+        self._gram_tok = key % len(self.vocab)
+        self._gram_off = np.searchsorted(key // len(self.vocab), np.arange(len(guniq) + 1))
+        self._gram_id = {g: j for j, g in enumerate(guniq.tolist())}
+
+    @staticmethod
+    def _tokenize(sub: pd.DataFrame, hashes) -> pd.DataFrame:
+        parts = []
+        for c in sub.columns:
+            toks = sub[c].astype(str).str.lower().str.findall(r"[0-9a-z]+")
+            ex = pd.DataFrame({"h": hashes, "token": toks.to_numpy(dtype=object)}).explode("token")
+            ex = ex[ex["token"].notna() & ~ex["token"].isin(SEARCH_STOPWORDS)]
+            parts.append(ex.assign(w=np.float32(SEARCH_FIELDS[c])))
+        if not parts:
+            return pd.DataFrame(columns=["h", "token", "w"])
+        tab = pd.concat(parts, ignore_index=True)
+        return tab.groupby(["h", "token"], as_index=False, sort=False)["w"].max()
+
+    def _expand(self, q: str) -> dict:
+        """Vocabulary token ids close to ``q`` -> similarity in (0, 1]."""
+        out = {}
+        if q in self._tok_id:
+            out[self._tok_id[q]] = 1.0
+        if len(q) >= 3:
+            lo = bisect.bisect_left(self.vocab, q)
+            hi = bisect.bisect_left(self.vocab, q + "\uffff", lo, min(len(self.vocab), lo + self.PREFIX_LIMIT))
+            for i in range(lo, hi):
+                out.setdefault(i, 0.9)
+        if len(q) >= 4:                   # too short for fuzzy matching otherwise
+            grams = _trigrams(q)
+            ids = [self._gram_id[g] for g in grams if g in self._gram_id]
+            hits = [self._gram_tok[self._gram_off[j]:self._gram_off[j + 1]] for j in ids]
+            if hits:
+                shared = np.bincount(np.concatenate(hits), minlength=len(self.vocab))
+                cand = np.flatnonzero(shared)
+                dice = 2 * shared[cand] / (len(grams) + self._tok_len[cand] + 1)
+                keep = dice >= 0.5
+                for i, d in zip(cand[keep].tolist(), dice[keep].tolist()):
+                    if 0.8 * d > out.get(i, 0):
+                        out[i] = 0.8 * d
+        return out
+
+    def search(self, query: str, limit: "int | None" = 200, within=None) -> list:
+        """Row positions, best first. Rows matching more query terms rank higher.
+
+        ``within`` (row positions, e.g. the Directory filters) restricts the
+        candidates before ranking, so ``limit`` counts only rows that qualify.
+        """
+        terms = list(dict.fromkeys(_search_tokens(query)))
+        if not terms or not self.vocab:
+            return []
+        hits = np.zeros(self.n_rows, dtype=np.int32)
+        score = np.zeros(self.n_rows, dtype=np.float32)
+        for q in terms:
+            best = np.zeros(self.n_rows, dtype=np.float32)
+            for i, sim in self._expand(q).items():
+                a, b = self._offsets[i], self._offsets[i + 1]
+                rows = self._rows[a:b]
+                best[rows] = np.maximum(best[rows], sim * self._w[a:b])
+            hits += best > 0
+            score += best
+        if within is not None:
+            keep = np.zeros(self.n_rows, dtype=bool)
+            keep[np.asarray(within, dtype=np.int64)] = True
+            hits[~keep] = 0
+        cand = np.flatnonzero(hits)
+        order = np.lexsort((cand, -score[cand], -hits[cand]))
+        return cand[order][:limit].tolist()
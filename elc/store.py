@@ -0,0 +1,218 @@
+"""Live directories: each loaded workbook plus derived indexes, reloaded in the
+background, and the per-state registry that loads them on first use."""
+import threading, time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .config import DATA_PATH, DEFAULT_STATE, DIRECTORIES_DIR, DIRECTORY_MAX_STATES, RELOAD_POLL_SECONDS
+from .contacts import JurisdictionIndex, load_contacts
+from .normalize import norm_state
+from .resources import shared
+from .search import ContactSearchIndex
+
+def build_facets(df: pd.DataFrame) -> dict:
+    """Directory page filter lists plus the row positions behind each value."""
+    facets = {"counties": [], "cities": [], "cities_in": {}, "dept_types": [],
+              "by_county": {}, "by_city": {}, "by_dept": {}}
+    if df.empty or not {"County", "City", "Dept Type"} <= set(df.columns):
+        return facets
+    dept_cap = df["Dept Type"].astype(str).str.capitalize()
+    facets["by_county"] = df.groupby("County", sort=False, observed=True).indices
+    facets["by_city"] = df.groupby("City", sort=False, observed=True).indices
+    facets["by_dept"] = dept_cap.groupby(dept_cap, sort=False, observed=True).indices
+    city_col = df["City"].to_numpy(dtype=object)
+    facets["counties"] = sorted(facets["by_county"], key=str)
+    facets["cities"] = sorted(facets["by_city"], key=str)
+    facets["cities_in"] = {c: sorted(set(city_col[pos].tolist()), key=str)
+                           for c, pos in facets["by_county"].items()}
+    facets["dept_types"] = sorted(facets["by_dept"], key=str)
+    return facets
+
+def filter_positions(facets, n_rows, county="(All)", city="(All)", dept="(All)"):
+    """Row positions matching the Directory filters, from the precomputed facets."""
+    pos = None
+    for chosen, groups in ((county, facets["by_county"]), (city, facets["by_city"]), (dept, facets["by_dept"])):
+        if chosen == "(All)":
+            continue
+        hit = groups.get(chosen, np.empty(0, dtype=np.int64))
+        pos = hit if pos is None else np.intersect1d(pos, hit, assume_unique=True)
+    return np.arange(n_rows) if pos is None else pos
+
+class Directory(NamedTuple):
+    """One consistent load of the workbook and everything derived from it."""
+    contacts: pd.DataFrame
+    jindex: JurisdictionIndex
+    facets: dict
+    search: ContactSearchIndex
+    stamp: tuple
+    loaded_at: float
+    notices: tuple = ()           # (level, message) from parsing the workbook
+
+def _file_stamp(path: Path):
+    try:
+        s_ = path.stat()
+        return (s_.st_mtime_ns, s_.st_size)
+    except OSError:
+        return None
+
+class ContactsStore:
+    """Holds the current Directory and reloads it when the workbook changes.
+
+    A daemon thread polls the workbook's mtime/size every ``poll`` seconds and,
+    once a change has been stable for one poll (i.e. the save finished), loads
+    it off the request path. Derived structures are updated incrementally from
+    the previous load and the new Directory replaces the old one in a single
+    assignment, so a rerun that grabbed ``current()`` keeps a consistent view.
+    A workbook that fails to load or lacks required columns is ignored and the
+    last good directory stays live.
+    """
+
+    def __init__(self, path: Path, poll: float = RELOAD_POLL_SECONDS):
+        self.path, self.poll = Path(path), poll
+        self.reloads = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._current = self._build(self.path, None)
+        if poll > 0:
+            threading.Thread(target=self._watch, name="contacts-reload", daemon=True).start()
+
+    def current(self) -> Directory:
+        return self._current
+
+    def close(self):
+        """Stop watching the workbook; readers holding ``current()`` are unaffected."""
+        self._stop.set()
+
+    def _build(self, path: Path, previous):
+        stamp = _file_stamp(path)
+        notices = []
+        df = load_contacts(path, notices)
+        jindex = JurisdictionIndex(df, previous.jindex if previous else None)
+        search = ContactSearchIndex(df, previous.search if previous else None)
+        return Directory(df, jindex, build_facets(df), search, stamp, time.time(), tuple(notices))
+
+    def reload(self, force: bool = False) -> bool:
+        """Reload now if the workbook changed (or ``force``); True if swapped."""
+        with self._lock:
+            cur = self._current
+            if not force and _file_stamp(self.path) == cur.stamp:
+                return False
+            try:
+                new = self._build(self.path, cur)
+            except Exception as e:  # half-written / locked workbook: keep serving the old one
+                self.last_error = str(e)
+                return False
+            if "_n_county" not in new.contacts.columns:
+                self.last_error = "Reloaded workbook is missing required columns; keeping the previous directory."
+                return False
+            self._current, self.last_error = new, None
+            self.reloads += 1
+            return True
+
+    def _watch(self):
+        seen = failed = self._current.stamp
+        while not self._stop.wait(self.poll):
+            stamp = _file_stamp(self.path)
+            if stamp is None or stamp in (self._current.stamp, failed):
+                seen = stamp
+                continue
+            if stamp == seen and not self.reload():   # unchanged since last poll -> save is done
+                failed = stamp                         # don't re-parse a bad file every poll
+            seen = stamp
+
+@shared
+def get_contacts_store(path: Path) -> ContactsStore:
+    return ContactsStore(path)
+
+# ---- Per-state directories ----
+def discover_directories(folder: Path = DIRECTORIES_DIR, default_path: Path = DATA_PATH,
+                         default_state: str = DEFAULT_STATE) -> dict:
+    """State -> workbook: ``folder``/<state>.xlsx (code or name, e.g. GA.xlsx,
+    north carolina.xlsx), plus ``default_path`` for ``default_state`` unless
+    the folder has its own file for it."""
+    paths = {default_state: Path(default_path)}
+    if folder.is_dir():
+        for path in sorted(folder.iterdir()):
+            state = norm_state(path.stem.replace("_", " "))
+            if state and path.suffix.lower() in (".xlsx", ".xls"):
+                paths[state] = path
+    return paths
+
+class DirectoryRegistry:
+    """One ContactsStore per state, loaded the first time that state is asked
+    for and kept under an LRU limit.
+
+    Only states actually resolved cost startup time and memory. Loading one
+    state doesn't block lookups in the others; when more than ``max_loaded``
+    are resident the least recently used is dropped (its reload watcher
+    stopped) and loads again, from its snapshot, on the next request.
+    """
+
+    def __init__(self, paths: dict, max_loaded: int = DIRECTORY_MAX_STATES, poll: float = RELOAD_POLL_SECONDS):
+        self.paths = {s_.upper(): Path(p) for s_, p in paths.items()}
+        self.max_loaded, self.poll = max(1, max_loaded), poll
+        self.loads = self.evictions = 0
+        self._stores = OrderedDict()      # state -> ContactsStore, least recently used first
+        self._loading = {}                # state -> lock held while that state loads
+        self._lock = threading.Lock()
+
+    def states(self):
+        return sorted(self.paths)
+
+    def loaded(self):
+        with self._lock:
+            return list(self._stores)
+
+    def store(self, state: str) -> "ContactsStore | None":
+        """The state's store, loading it on first use; None if it has no directory."""
+        state = (state or DEFAULT_STATE).upper()
+        if state not in self.paths:
+            return None
+        with self._lock:
+            store = self._stores.get(state)
+            if store is not None:
+                self._stores.move_to_end(state)
+                return store
+            loading = self._loading.setdefault(state, threading.Lock())
+        with loading:                      # concurrent first requests for a state load it once
+            with self._lock:
+                store = self._stores.get(state)
+                if store is not None:
+                    self._stores.move_to_end(state)
+                    return store
+            store = ContactsStore(self.paths[state], self.poll)
+            with self._lock:
+                self._stores[state] = store
+                self.loads += 1
+                while len(self._stores) > self.max_loaded:
+                    self._stores.popitem(last=False)[1].close()
+                    self.evictions += 1
+            return store
+
+    def current(self, state: str) -> "Directory | None":
+        store = self.store(state)
+        return store.current() if store is not None else None
+
+    def jindex(self, state: str) -> "JurisdictionIndex | None":
+        directory = self.current(state)
+        return directory.jindex if directory is not None else None
+
+    def stamp(self, state: str):
+        """Workbook stamp of a resident state's directory, without loading it (None if not resident)."""
+        with self._lock:
+            store = self._stores.get((state or "").upper())
+        return store.current().stamp if store is not None else None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"states": len(self.paths), "loaded": list(self._stores), "max_loaded": self.max_loaded,
+                    "loads": self.loads, "evictions": self.evictions}
+
+@shared
+def get_directory_registry(poll: float = RELOAD_POLL_SECONDS) -> DirectoryRegistry:
+    return DirectoryRegistry(discover_directories(), poll=poll)
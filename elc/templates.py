@@ -0,0 +1,276 @@
+"""Request-letter templates per company (ELC, AEI) and their rendering."""
+from .tracing import traced
+
+# =============== Hard-coded templates — ELC (current) ===============
+TEMPLATES = {
+    "building": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
+        "body": """{county} Building Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To whom it may concern:
+
+Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
+
+I am currently conducting a Phase I Environmental Site Assessment for the above property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Permit summary (date, type of permit, applicant/tenant) or available permits from construction to present. Upon review of a permit summary we may request review of individual permits.
+- Construction date (current building, previous buildings if applicable)
+- List of tenants which have occupied the subject property
+- Permits of environmental concern (petroleum storage tanks, septic systems, oil/water separators)
+- Oldest and most recent site layout plan from the above mentioned property if available
+- Erosion control plans on record for the subject property
+- Record violations or complaints registered against the subject property
+
+Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
+"""
+    },
+    "planning": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
+        "body": """{county} Planning Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To whom it may concern:
+
+Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
+
+I am currently conducting a Phase I Environmental Site Assessment for the above property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Record of any Activity Use Limitations (AULs) in connection with the property. An AUL is a legal or physical restriction or limitation on the use of, or access to, a site or facility. (1) to reduce or eliminate potential exposure to hazardous substances or petroleum products in the soil, soil vapor, groundwater, and/or surface water on the property, or (2) to prevent activities that could interfere with the effectiveness of a response action, in order to ensure maintenance of a condition of no significance risk to public health or the environment. These legal or physical restrictions, which may include institutional and/or engineering controls, are intended to prevent adverse impacts to individuals or populations that may be exposed to hazardous substances and petroleum products in the soil, soil vapor, groundwater, and/or surface water on a property. AULs are typically in place at sites which would prevent future uses of a property.
+- Subject property zoning and any current zoning violations.
+
+Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
+"""
+    },
+    "fire": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
+        "body": """{county} Fire Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To whom it may concern:
+
+Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
+
+I am currently conducting a Phase I Environmental Site Assessment for the above property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Records regarding hazardous materials usage/storage/incidents or fires at the property,
+- Records regarding aboveground or underground storage tank (UST) systems, which are currently or historically located at the property,
+- Records of fire inspections at the subject property.
+
+Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
+"""
+    },
+    "environmental": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
+        "body": """{county} Environmental Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To whom it may concern:
+
+Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property.
+
+I am currently conducting a Phase I Environmental Site Assessment for the property. The ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for the following items:
+
+- Records regarding hazardous materials usage/storage/incidents or known environmental concerns/contamination which may have affected the property,
+- Records regarding aboveground or underground storage tank (UST) systems, which are currently or historically located at the property,
+- Record of septic systems installation and repairs at the subject property, and/or
+- Records of wells in connection with the subject property.
+
+Please call (954-658-8177) or email (admin@envlogcon.com) me to discuss the file information or if you require further information. Thank you for your time and attention regarding this matter.
+"""
+    },
+    "all": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request",
+        "body": """{county} County Clerk
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To whom it may concern:
+
+Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property. ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+Building Department
+- Permit summary or available permits from construction to present. Upon review of a permit summary we may request review of individual permits. 
+- Construction date (current building, previous buildings if applicable) 
+- List of tenants which have occupied the subject property
+- Oldest and most recent site layout plan from the above mentioned property if available
+- Record violations or complaints registered against the subject property
+
+Planning Department
+- Record of any Activity Use Limitations (AULs) in connection with the property. AULs are typically in place at sites which would prevent future uses of a property.
+- Subject property zoning and any current zoning violations.
+
+Fire Department
+- Records regarding hazardous materials incidents or fires at the property.
+- Records of fire inspections at the subject property.
+
+Environmental Department
+- Records regarding hazardous materials usage/storage/incidents or known environmental concerns/contamination which may have affected the property,
+- Records regarding aboveground or underground storage tank (UST) systems, which are currently or historically located at the property,  
+- Record of septic systems installation and repairs at the subject property, and/or
+- Records of wells in connection with the subject property.
+
+"""
+    },
+}
+
+# =============== Hard-coded templates — AEI (placeholder; edit me) ===============
+# Keep the same keys so the app can swap seamlessly. Replace the bodies with AEI’s exact language.
+TEMPLATES_AEI = {
+    "building": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
+        "body": """{county} Building Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To Whom It May Concern:
+
+Please accept this request for any information/documentation/files with your department regarding the above-referenced subject property. 
+
+AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Available permits, licenses, and certificates of occupancy (including oldest historical records) OR permit summary (date, type of permit, applicant/tenant) 
+  (NOTE: upon review of a permit summary, we may request review of individual permits)
+- Construction date(s) [current building(s), and previous building(s) if applicable]
+- List of tenants which have occupied the subject property
+- Permits of environmental concern (e.g., petroleum storage tanks, septic systems, oil/water separators)
+- Oldest and most recent maps and site layout plan of the subject property (if available)
+- Records of any major environmental violations or significant complaints registered against the subject property
+
+Please indicate if older historical records have been archived and require additional fees for retrieval.
+"""
+    },
+    "planning": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
+        "body": """{county} Planning Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To Whom It May Concern:
+
+Please accept this request for any information/documentation/files with your department regarding the above-referenced subject property. 
+
+AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Building permit history (including recent, historical, and archived records);
+- Other relevant information regarding historical development and former use/occupancy at the subject property; and/or
+- Environmental property use limitations/restrictions related to contamination and/or other environmental conditions at the subject property (e.g., environmental deed restrictions, groundwater use restrictions, methane zones)
+"""
+    },
+    "fire": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
+        "body": """{county} Fire Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To Whom It May Concern:
+
+Please accept this request for any information/documentation/files with your department regarding the above-referenced property. 
+
+AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Records of fire inspections at the subject property; 
+- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
+- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
+- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property; and/or
+- Records of significant fires that may have used AFFF/Class B firefighting foams at the subject property.
+
+NOTE: we are interested in both current and historical records pertaining to the items listed above.
+"""
+    },
+    "environmental": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
+        "body": """{county} Environmental/Health Department
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To Whom It May Concern:
+
+Please accept this request for any information/documentation/files with your department regarding the above-referenced property. 
+
+AEI Consultants is currently conducting a Phase I Environmental Site Assessment for the property. The current ASTM E1527 Standard Practice for Environmental Site Assessments requires a records search be conducted with regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
+- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
+- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property;
+- Records of violations or corrective actions;
+- Records of septic system installations and repairs at the subject property; 
+- Records of wells in connection with the subject property; and/or
+- Environmental permits (wastewater discharges and/or air emissions) and the most recent associated effluent/emission sampling.
+
+NOTE: we are interested in both current and historical records pertaining to the items listed above.
+"""
+    },
+    "all": {
+        "subject": "Freedom of Information Act (FOIA) Request/File Review Request ",
+        "body": """{county} County/City Clerk
+
+Address: {address}
+Parcel ID#: {apn}
+Project No. {project}
+
+To whom it may concern:
+
+Please accept this as a request for any information/documentation/files with your department regarding the above-referenced property. ASTM Practice E1527 Standard Practice of Environmental Site Assessments requires that a records search be conducted with local regulatory departments for information regarding the subject property. Of particular interest are the following items:
+
+Building Department
+- Available permits, licenses, and certificates of occupancy (including oldest historical records) OR permit summary (date, type of permit, applicant/tenant) 
+  (NOTE: upon review of a permit summary, we may request review of individual permits)
+- Construction date(s) [current building(s), and previous building(s) if applicable]
+- List of tenants which have occupied the subject property
+- Permits of environmental concern (e.g., petroleum storage tanks, septic systems, oil/water separators)
+- Oldest and most recent maps and site layout plan of the subject property (if available)
+- Records of any major environmental violations or significant complaints registered against the subject property
+
+Planning Department
+- Environmental property use limitations/restrictions related to contamination and/or other environmental conditions at the subject property (e.g., environmental deed restrictions, groundwater use restrictions, methane zones)
+- Subject property zoning and any current zoning violations.
+
+Fire Department
+- Records of fire inspections at the subject property; 
+- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
+- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
+- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property; and/or
+- Records of significant fires that may have used AFFF/Class B firefighting foams at the subject property.
+
+Environmental Department
+- Records regarding petroleum product and/or hazardous substance usage/storage at the subject property (i.e., permits, inspections, hazardous materials business plans, SPCC plans, maps, site plans, chemical inventories);
+- Records regarding aboveground storage tank (AST) and/or underground storage tank (UST) systems at the subject property;
+- Records of hazardous substance and/or petroleum product releases, contamination or other known environmental concerns which may have affected the subject property;
+- Records of violations or corrective actions;
+- Records of septic system installations and repairs at the subject property; 
+- Records of wells in connection with the subject property; and/or
+- Environmental permits (wastewater discharges and/or air emissions) and the most recent associated effluent/emission sampling.
+
+"""
+    },
+}
+
+# Group for easy switching
+TEMPLATE_SETS = {"ELC": TEMPLATES, "AEI": TEMPLATES_AEI}
+
+@traced("render_template")
+def render_template(tpl, ctx) -> str:
+    return tpl["body"].format(**ctx)
@@ -0,0 +1,107 @@
+"""Span timings: per-run breakdown for the debug panel plus Prometheus-style histograms."""
+import bisect, contextlib, datetime, functools, json, os, threading, time
+
+from .resources import shared
+
+SPAN_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 12000)
+
+class Tracer:
+    """Process-wide span timings: per-run breakdown plus aggregated histograms.
+
+    ``span(name)`` times a block. Spans opened on the thread that called
+    ``begin()`` (a Streamlit rerun, a CLI command) are also collected for the
+    debug panel; spans from worker threads only feed the histograms.
+    """
+
+    def __init__(self, buckets=SPAN_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._hist = {}                # name -> [counts per bucket..., +Inf], sum_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._written = 0.0
+
+    def begin(self):
+        self._local.spans, self._local.depth, self._local.t0 = [], 0, time.perf_counter()
+
+    def collected(self) -> list:
+        return list(getattr(self._local, "spans", []) or [])
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        loc = self._local
+        spans = getattr(loc, "spans", None)
+        depth = getattr(loc, "depth", 0)
+        t0 = time.perf_counter()
+        if spans is not None:
+            rec = {"span": name, "depth": depth, "start_ms": (t0 - loc.t0) * 1000, "ms": None}
+            spans.append(rec)
+            loc.depth = depth + 1
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            if spans is not None:
+                rec["ms"], loc.depth = ms, depth
+            self.observe(name, ms)
+
+    def observe(self, name: str, ms: float):
+        i = bisect.bisect_left(self.buckets, ms)
+        with self._lock:
+            h = self._hist.get(name)
+            if h is None:
+                h = self._hist[name] = [[0] * (len(self.buckets) + 1), 0.0]
+            h[0][i] += 1
+            h[1] += ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {k: (list(c), s) for k, (c, s) in self._hist.items()}
+
+    def prometheus(self) -> str:
+        lines = ["# HELP elc_span_duration_seconds Time spent in traced spans.",
+                 "# TYPE elc_span_duration_seconds histogram"]
+        for name, (counts, total) in sorted(self.snapshot().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cum = 0
+            for le, c in zip(self.buckets, counts):
+                cum += c
+                lines.append(f'elc_span_duration_seconds_bucket{{span="{label}",le="{le / 1000:g}"}} {cum}')
+            cum += counts[-1]
+            lines.append(f'elc_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {cum}')
+            lines.append(f'elc_span_duration_seconds_sum{{span="{label}"}} {total / 1000:.6f}')
+            lines.append(f'elc_span_duration_seconds_count{{span="{label}"}} {cum}')
+        return "\n".join(lines) + "\n"
+
+    def jsonl(self) -> str:
+        ts = datetime.datetime.now().isoformat(timespec="seconds")
+        return "".join(json.dumps({"ts": ts, "span": name, "count": sum(counts), "sum_ms": round(total, 3),
+                                   "buckets_ms": dict(zip([*map(str, self.buckets), "+Inf"], counts))}) + "\n"
+                       for name, (counts, total) in sorted(self.snapshot().items()))
+
+    def write_prometheus(self, path: str, min_interval: float = 10.0):
+        """Atomically refresh a node_exporter textfile, at most every ``min_interval`` s."""
+        now = time.monotonic()
+        if not path or now - self._written < min_interval:
+            return
+        self._written = now
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(self.prometheus())
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+@shared
+def get_tracer() -> Tracer:
+    return Tracer()
+
+def traced(name: str):
+    """Decorator: run the function inside ``get_tracer().span(name)``."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
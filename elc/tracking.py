@@ -0,0 +1,205 @@
+"""Request tracking: which jurisdictions were asked for what, for which project, and when they answered.
+
+One row per (project, site, jurisdiction, department, template set), written
+when a package is actually issued (drafts downloaded or exported, email
+queued), not for every exploratory search; issuing it again refreshes the row
+instead of adding another. Filtering, paging and aggregation all run in
+SQLite against indexed columns, so the tracking page stays fast with
+hundreds of thousands of requests.
+
+Queued email moves its rows to "sent" or "failed" only once the outbox has
+actually delivered the message or given up on it.
+"""
+import sqlite3, threading, time
+from pathlib import Path
+
+from .config import TRACKING_DB_PATH
+from .normalize import address_key, norm_city, norm_county
+from .resources import shared
+
+STATUSES = ["open", "sent", "failed", "responded", "closed"]
+FILTER_COLUMNS = {"project": "project = ?", "county": "n_county = ?", "city": "n_city = ?", "dept": "dept = ?",
+                  "project_type": "project_type = ?", "status": "status = ?", "address": "address_key = ?",
+                  "since": "created >= ?", "until": "created < ?"}
+ORDERS = {"newest": "created DESC", "oldest": "created ASC", "county": "n_county, n_city, created DESC"}
+
+class RequestTracker:
+    """SQLite log of issued records requests (WAL, one shared connection)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS requests ("
+            " id INTEGER PRIMARY KEY, project TEXT NOT NULL, address TEXT NOT NULL, address_key TEXT NOT NULL,"
+            " apn TEXT, county TEXT NOT NULL, city TEXT NOT NULL, n_county TEXT NOT NULL, n_city TEXT NOT NULL,"
+            " dept TEXT NOT NULL, project_type TEXT NOT NULL, recipients TEXT, status TEXT NOT NULL DEFAULT 'open',"
+            " created REAL NOT NULL, updated REAL NOT NULL, sent_at REAL, responded_at REAL, response_days REAL,"
+            " UNIQUE (project, address_key, n_county, n_city, dept, project_type));"
+            "CREATE INDEX IF NOT EXISTS requests_project ON requests(project, created);"
+            "CREATE INDEX IF NOT EXISTS requests_address ON requests(address_key);"
+            "CREATE INDEX IF NOT EXISTS requests_jurisdiction ON requests(n_county, n_city, created);"
+            # Covering indexes for the per-county / per-department rollups
+            "CREATE INDEX IF NOT EXISTS requests_county_rollup ON requests(n_county, status, dept, response_days);"
+            "CREATE INDEX IF NOT EXISTS requests_dept_rollup ON requests(dept, status, n_county, response_days);"
+            "CREATE INDEX IF NOT EXISTS requests_status ON requests(status, created);"
+            "CREATE INDEX IF NOT EXISTS requests_created ON requests(created);"
+            # Answered requests only, ordered by turnaround: medians are an index seek per group
+            "CREATE INDEX IF NOT EXISTS requests_response_county ON requests(n_county, response_days)"
+            " WHERE response_days IS NOT NULL;"
+            "CREATE INDEX IF NOT EXISTS requests_response_dept ON requests(dept, response_days)"
+            " WHERE response_days IS NOT NULL;"
+        )
+        self._db.execute("PRAGMA optimize")       # refresh planner statistics when they've gone stale
+        self._db.commit()
+
+    def log_package(self, pkg, project_type: str) -> int:
+        """Record every department a search package has contacts for -> rows written."""
+        if not pkg.get("sections"):
+            return 0
+        now = time.time()
+        base = (pkg.get("project", "") or "", pkg["address"], address_key(pkg["address"]), pkg.get("apn", "") or "",
+                pkg["county"], pkg["city"] or "", norm_county(pkg["county"]), norm_city(pkg["city"] or ""))
+        rows = [base + (sec["key"], project_type, ", ".join(sec["draft"]["emails"] if sec["draft"] else []), now, now)
+                for sec in pkg["sections"] if sec["table"] is not None]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO requests (project, address, address_key, apn, county, city, n_county, n_city, dept,"
+                " project_type, recipients, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (project, address_key, n_county, n_city, dept, project_type) DO UPDATE SET"
+                " apn = excluded.apn, recipients = excluded.recipients, updated = excluded.updated", rows)
+            self._db.commit()
+        return len(rows)
+
+    def logged(self, packages, project_type: str):
+        """Pass (folder, pkg, ...) export items through, logging each package as it is consumed."""
+        for item in packages:
+            self.log_package(item[1], project_type)
+            yield item
+
+    def set_status(self, ids, status: str, when: float = None) -> int:
+        """Move requests to ``status``; "sent" / "responded" also stamp that time."""
+        if status not in STATUSES:
+            raise ValueError(f"unknown status {status!r}")
+        when = when or time.time()
+        stamp = {"sent": ", sent_at = COALESCE(sent_at, ?)",
+                 "responded": ", responded_at = ?, response_days = (? - COALESCE(sent_at, created)) / 86400.0"
+                 }.get(status, "")
+        args = [status, when] + [when] * stamp.count("?")
+        ids = list(ids)
+        with self._lock:
+            cur = self._db.execute(
+                f"UPDATE requests SET status = ?, updated = ?{stamp} WHERE id IN ({', '.join('?' * len(ids))})",
+                args + ids)
+            self._db.commit()
+        return cur.rowcount
+
+    @staticmethod
+    def dispatch_track(pkg, project_type: str, draft) -> dict:
+        """The outbox link for one queued draft: which logged rows it settles."""
+        depts = [draft["key"]] if draft["key"] != "all" else \
+                [sec["key"] for sec in pkg["sections"] if sec["draft"] and sec["draft"]["emails"]]
+        return {"project": pkg.get("project", "") or "", "address": pkg["address"], "county": pkg["county"],
+                "city": pkg["city"] or "", "project_type": project_type, "depts": depts}
+
+    def record_dispatch(self, track: dict, outcome: str) -> int:
+        """An outbox message was sent or finally failed -> stamp its departments' rows."""
+        keys = (track["project"], address_key(track["address"]), norm_county(track["county"]),
+                norm_city(track["city"]), track["project_type"])
+        depts = list(track["depts"])
+        before = ("open", "failed") if outcome == "sent" else ("open",)
+        with self._lock:
+            ids = [r[0] for r in self._db.execute(
+                "SELECT id FROM requests WHERE project = ? AND address_key = ? AND n_county = ? AND n_city = ?"
+                f" AND project_type = ? AND dept IN ({', '.join('?' * len(depts))})"
+                f" AND status IN ({', '.join('?' * len(before))})", keys + tuple(depts) + before)]
+        return self.set_status(ids, outcome) if ids else 0
+
+    @staticmethod
+    def _where(filters):
+        clauses, args = [], []
+        for name, value in (filters or {}).items():
+            if value in (None, "", "(All)"):
+                continue
+            if name == "county":
+                value = norm_county(value)
+            elif name == "city":
+                value = norm_city(value)
+            elif name == "address":
+                value = address_key(value)
+            clauses.append(FILTER_COLUMNS[name])
+            args.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def count(self, filters=None) -> int:
+        where, args = self._where(filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM requests{where}", args).fetchone()[0]
+
+    def query(self, filters=None, limit: int = 100, offset: int = 0, order: str = "newest"):
+        """One page of matching requests, as dicts."""
+        where, args = self._where(filters)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, project, address, apn, county, city, dept, project_type, recipients, status,"
+                f" created, sent_at, responded_at FROM requests{where} ORDER BY {ORDERS[order]} LIMIT ? OFFSET ?",
+                args + [limit, offset]).fetchall()
+        return [dict(r) for r in rows]
+
+    def summary(self, filters=None, by: str = "county"):
+        """Per county (or ``by="dept"``): request counts by status and median days to a response."""
+        group = {"county": "n_county", "dept": "dept"}[by]
+        where, args = self._where(filters)
+        with_days = (where + " AND" if where else " WHERE") + " response_days IS NOT NULL"
+        with self._lock:
+            # (group, status) counts come straight off a covering index; pivoted below
+            counts = self._db.execute(
+                f"SELECT {group}, status, COUNT(*), COUNT(response_days) FROM requests{where}"
+                f" GROUP BY {group}, status", args).fetchall()
+            answered = {}
+            for k, _, _, n in counts:
+                answered[k] = answered.get(k, 0) + n
+            medians = {}
+            for k, n in answered.items():
+                if not n:
+                    continue
+                # The middle one (odd n) or two rows of the group, read in response_days order
+                medians[k] = self._db.execute(
+                    f"SELECT AVG(response_days) FROM (SELECT response_days FROM requests{with_days} AND {group} = ?"
+                    " ORDER BY response_days LIMIT ? OFFSET ?)", args + [k, 2 - n % 2, (n - 1) // 2]).fetchone()[0]
+        labels = self._county_labels() if by == "county" else {}
+        out = {}
+        for k, status, n, _ in counts:
+            row = out.setdefault(k, {"key": k, "label": labels.get(k, k), "total": 0, **dict.fromkeys(STATUSES, 0)})
+            row[status] += n
+            row["total"] += n
+        for k, row in out.items():
+            row["median_days"] = medians.get(k)
+        return sorted(out.values(), key=lambda r: (-(r["open"] + r["sent"]), -r["total"]))
+
+    def _distinct(self, col: str):
+        # Skip scan: one index seek per distinct value instead of walking every row
+        return [r[0] for r in self._db.execute(
+            f"WITH RECURSIVE v(x) AS (SELECT MIN({col}) FROM requests"
+            f" UNION ALL SELECT (SELECT MIN({col}) FROM requests WHERE {col} > x) FROM v WHERE x IS NOT NULL)"
+            " SELECT x FROM v WHERE x IS NOT NULL")]
+
+    def _county_labels(self) -> dict:
+        with self._lock:
+            return {k: self._db.execute("SELECT county FROM requests WHERE n_county = ? LIMIT 1", (k,)).fetchone()[0]
+                    for k in self._distinct("n_county")}
+
+    def facets(self) -> dict:
+        """Distinct projects / counties / departments for the filter widgets."""
+        counties = self._county_labels()
+        with self._lock:
+            return {"projects": [p for p in self._distinct("project") if p], "counties": list(counties.values()),
+                    "depts": self._distinct("dept")}
+
+@shared
+def get_request_tracker() -> RequestTracker:
+    return RequestTracker(TRACKING_DB_PATH)
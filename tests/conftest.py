@@ -0,0 +1,6 @@
+"""Run from the repository root: ``pip install -r tests/requirements.txt && python -m pytest tests``."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "bench")]        # elc, and the bench stand-ins / synthetic data
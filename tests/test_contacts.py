@@ -0,0 +1,87 @@
+"""JurisdictionIndex / ContactSearchIndex against the reference scans, and incremental reloads."""
+import pandas as pd
+import pytest
+
+from synth import synthetic_contacts
+from elc import contacts
+from elc.search import ContactSearchIndex
+from elc.store import ContactsStore
+
+ROWS = 1500
+
+
+def write(path, df):
+    df.to_excel(path, index=False, sheet_name="contacts")
+    return path
+
+
+def queries(df):
+    pairs = df[["County", "City"]].astype(str).drop_duplicates().values.tolist()
+    counties = sorted({c for c, _ in pairs})
+    return pairs + [(c, "Nowhere Springs") for c in counties] + [("Atlantis County", "Atlantis")]
+
+
+def assert_same_lookups(jindex, df):
+    for county, city in queries(df):
+        m_ref, exact_ref = contacts.match_contacts(df, county, city)
+        d_ref = contacts.split_by_dept(m_ref)
+        m_idx, d_idx, exact_idx = jindex.lookup(county, city)
+        assert exact_idx == exact_ref, (county, city)
+        pd.testing.assert_frame_equal(m_idx, m_ref, check_index_type=False)
+        for dep in contacts.DEPTS:
+            pd.testing.assert_frame_equal(d_idx[dep], d_ref[dep], check_index_type=False)
+        points = jindex.contact_points(county, city)
+        assert points["emails"] == {dep: contacts.email_list(d_ref[dep]) for dep in contacts.DEPTS}
+        assert points["portals"] == {dep: contacts.portal_urls(d_ref[dep]) for dep in contacts.DEPTS}
+
+
+@pytest.fixture(scope="module")
+def raw():
+    df = synthetic_contacts(ROWS, seed=3, cities_per_county=6)
+    return pd.concat([df, df.sample(frac=0.02, random_state=3)], ignore_index=True)   # duplicate rows
+
+
+@pytest.fixture(scope="module")
+def loaded(raw, tmp_path_factory):
+    return contacts.load_contacts(write(tmp_path_factory.mktemp("wb") / "contacts.xlsx", raw))
+
+
+def test_lookup_matches_reference_scans(loaded):
+    assert_same_lookups(contacts.JurisdictionIndex(loaded), loaded)
+
+
+def test_incremental_reload_matches_fresh_build(raw, tmp_path):
+    path = write(tmp_path / "contacts.xlsx", raw)
+    store = ContactsStore(path, poll=0)
+    before = store.current()
+
+    edited = raw.copy()
+    broward = edited["County"] == "Broward"
+    edited.loc[broward[broward].index[:5], "Emails"] = "new.clerk@broward.gov"           # edit rows in one county
+    edited = edited[~((edited["County"] == "Leon") & (edited["Municipality"] == "Unincorporated"))]   # "*" fallback only
+    edited = pd.concat([edited, synthetic_contacts(40, seed=99)], ignore_index=True)     # rows added everywhere
+    edited = edited[edited["County"] != "Monroe"]                                        # a county removed
+    write(path, edited)
+    assert store.reload(force=True)
+    cur = store.current()
+
+    fresh = contacts.load_contacts(path)
+    pd.testing.assert_frame_equal(cur.contacts, fresh)
+    assert cur.jindex.reused and cur.jindex.rebuilt            # some counties re-pointed, some rebuilt
+    assert_same_lookups(cur.jindex, fresh)
+    assert cur.jindex.lookup("Monroe County", "Key West")[0].empty
+
+    assert 0 < cur.search.retokenized < len(fresh)
+    rebuilt = ContactSearchIndex(fresh)
+    for q in ["broward clerk", "new.clerk", "fire marshal", "portal", "hillsborogh", "leon", "permit desk"]:
+        assert cur.search.search(q, limit=None) == rebuilt.search(q, limit=None), q
+    assert before.jindex is not cur.jindex                     # readers of the old view keep it
+
+
+def test_search_within_filters_keeps_every_match(loaded):
+    sidx = ContactSearchIndex(loaded)
+    within = (loaded["_n_dept"] == "fire").to_numpy().nonzero()[0]
+    allowed = set(within.tolist())
+    assert sidx.search("fire", limit=None, within=within) == \
+        [r for r in sidx.search("fire", limit=None) if r in allowed]
+    assert len(sidx.search("fire", limit=5, within=within)) == 5
@@ -0,0 +1,82 @@
+"""Outbox -> SMTP against the local stand-in (bench/smtp_standin.py)."""
+import pytest
+
+import smtp_standin
+from elc import dispatch
+from elc.dispatch import DispatchQueue, SmtpDispatcher
+from elc.tracking import RequestTracker
+
+SENDER = "records@example.com"
+
+
+def draft(key, *emails, subject="Public records request"):
+    return {"key": key, "emails": list(emails), "subject": f"{subject} ({key})", "body": "Please send the records."}
+
+
+@pytest.fixture
+def standin():
+    server, port, stats = smtp_standin.start(0, fail={"tempfail": "451 try later", "bounce": "550 no such user"})
+    yield port, stats
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return DispatchQueue(tmp_path / "outbox.sqlite")
+
+
+def test_enqueue_is_idempotent(queue):
+    d = draft("Building", "Clerk@City.gov")
+    first = queue.enqueue(d, SENDER)
+    assert first[1]
+    assert queue.enqueue(dict(d, emails=["clerk@city.gov"]), SENDER) == (first[0], False)   # same key, any case
+    assert queue.enqueue(dict(d, body="Edited."), SENDER)[1]                                # edited text is new
+    assert queue.stats()["queued"] == 2
+
+
+def test_failed_key_is_queued_again(queue):
+    msg_id, _ = queue.enqueue(draft("Fire", "fm@county.gov"), SENDER)
+    queue.fail(msg_id, "550 no such user")
+    assert queue.enqueue(draft("Fire", "fm@county.gov"), SENDER) == (msg_id, True)
+    assert queue.stats() == {"queued": 1, "sending": 0, "sent": 0, "failed": 0}
+
+
+def test_enqueue_needs_sender_and_recipients(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue(draft("Building", "clerk@city.gov"), "")
+    with pytest.raises(ValueError):
+        queue.enqueue(draft("Building"), SENDER)
+
+
+def test_send_due_and_drain(standin, queue, tmp_path, monkeypatch):
+    port, stats = standin
+    monkeypatch.setattr(dispatch, "RETRY_BASE_SECONDS", 0.05)
+    tracker = RequestTracker(tmp_path / "tracking.sqlite")
+    pkg = {"project": "25-0001", "address": "1 Main St, Boynton Beach, FL", "county": "Palm Beach",
+           "city": "Boynton Beach", "sections": [
+               {"key": k, "table": object(), "draft": {"emails": [e]}} for k, e in
+               (("Building", "a@city.gov"), ("Planning", "b@city.gov"), ("Fire", "bounce@fire.gov"),
+                ("Environmental", "tempfail@county.gov"))]}
+    tracker.log_package(pkg, "AEI")
+    for sec in pkg["sections"]:
+        d = draft(sec["key"], *sec["draft"]["emails"])
+        queue.enqueue(d, SENDER, track=tracker.dispatch_track(pkg, "AEI", d))
+
+    sender = SmtpDispatcher(queue, "127.0.0.1", port, starttls=False, domain_interval=0.2, max_attempts=2,
+                            on_outcome=tracker.record_dispatch)
+    out = sender.send_due()
+    # city.gov twice: the second waits out the domain interval; 550 fails now, 451 is retried
+    assert out == {"sent": 1, "retry": 1, "failed": 1, "deferred": 1}
+    status = {r["dept"]: r["status"] for r in tracker.query()}
+    assert status == {"Building": "sent", "Planning": "open", "Fire": "failed", "Environmental": "open"}
+
+    total = sender.drain(max_seconds=10)
+    sender.close()
+    assert total["sent"] == 1 and total["failed"] == 1           # Planning delivered; 451 out of attempts
+    assert queue.stats() == {"queued": 0, "sending": 0, "sent": 2, "failed": 2}
+    assert {r["dept"]: r["status"] for r in tracker.query()} == \
+        {"Building": "sent", "Planning": "sent", "Fire": "failed", "Environmental": "failed"}
+    assert stats["connections"] == 1                               # one connection, reused across batches
+    assert sorted(m["to"][0] for m in stats["messages"]) == ["a@city.gov", "b@city.gov"]
+    assert all(m["from"] == SENDER for m in stats["messages"])
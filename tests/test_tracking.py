@@ -0,0 +1,84 @@
+"""RequestTracker: upserts, filters, paging and the per-county / per-department summary."""
+import pytest
+
+from elc.tracking import RequestTracker
+
+DAY = 86400.0
+
+
+def package(address, county, city, depts, project="25-0001"):
+    return {"project": project, "address": address, "county": county, "city": city,
+            "sections": [{"key": d, "table": object(), "draft": {"emails": [f"{d}@{city.lower().replace(' ', '')}.gov"]}}
+                         for d in depts] + [{"key": "fire", "table": None, "draft": None}]}
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    t = RequestTracker(tmp_path / "tracking.sqlite")
+    t.log_package(package("1 Main St, Fort Myers", "Lee County", "Fort Myers", ["building", "planning"]), "ELC")
+    t.log_package(package("9 Ocean Blvd", "Palm Beach", "Boynton Beach", ["building", "environmental"]), "AEI")
+    t.log_package(package("5 Elm Ave", "Palm Beach", "Riviera Beach", ["building"], project="25-0002"), "ELC")
+    return t
+
+
+def ids(tracker, **filters):
+    return {(r["address"], r["dept"]) for r in tracker.query(filters, limit=1000)}
+
+
+def test_log_package_upserts(tracker):
+    assert tracker.count() == 5                                # departments without contacts aren't logged
+    again = package("1 MAIN STREET, Fort Myers", "Lee", "Fort Myers", ["building"])
+    assert tracker.log_package(again, "ELC") == 1
+    assert tracker.count() == 5                                # same normalized site: refreshed, not added
+    assert tracker.log_package(again, "AEI") == 1
+    assert tracker.count() == 6                                # another template set is another request
+
+
+def test_filters(tracker):
+    assert ids(tracker, county="Palm Beach County") == {("9 Ocean Blvd", "building"), ("9 Ocean Blvd", "environmental"),
+                                                        ("5 Elm Ave", "building")}
+    assert ids(tracker, city="boynton beach", dept="building") == {("9 Ocean Blvd", "building")}
+    assert ids(tracker, project="25-0002") == {("5 Elm Ave", "building")}
+    assert ids(tracker, project_type="ELC", county="(All)", dept="") == \
+        {("1 Main St, Fort Myers", "building"), ("1 Main St, Fort Myers", "planning"), ("5 Elm Ave", "building")}
+    assert ids(tracker, address="1 main street, fort myers") == {("1 Main St, Fort Myers", "building"),
+                                                                 ("1 Main St, Fort Myers", "planning")}
+    assert tracker.count({"county": "Dade"}) == 0
+    page = tracker.query({}, limit=2, offset=0, order="oldest") + tracker.query({}, limit=10, offset=2, order="oldest")
+    assert [r["id"] for r in page] == sorted(r["id"] for r in page) and len(page) == 5
+
+
+def test_status_and_summary(tracker):
+    rows = {(r["address"], r["dept"]): r["id"] for r in tracker.query({}, limit=100)}
+    t0 = tracker.query({}, limit=1)[0]["created"]
+    assert tracker.set_status([rows[("9 Ocean Blvd", "building")], rows[("5 Elm Ave", "building")],
+                               rows[("9 Ocean Blvd", "environmental")]], "sent", when=t0) == 3
+    tracker.set_status([rows[("9 Ocean Blvd", "building")]], "responded", when=t0 + 2 * DAY)
+    tracker.set_status([rows[("5 Elm Ave", "building")]], "responded", when=t0 + 6 * DAY)
+    tracker.set_status([rows[("1 Main St, Fort Myers", "planning")]], "closed")
+    assert ids(tracker, status="sent") == {("9 Ocean Blvd", "environmental")}
+    with pytest.raises(ValueError):
+        tracker.set_status([1], "lost")
+
+    by_county = {r["label"]: r for r in tracker.summary()}
+    pb = by_county["Palm Beach"]
+    assert (pb["total"], pb["sent"], pb["responded"], pb["open"]) == (3, 1, 2, 0)
+    assert pb["median_days"] == pytest.approx(4.0)            # (2 + 6) / 2
+    lee = by_county["Lee County"]
+    assert (lee["total"], lee["open"], lee["closed"], lee["median_days"]) == (2, 1, 1, None)
+
+    by_dept = {r["key"]: r for r in tracker.summary({"county": "Palm Beach"}, by="dept")}
+    assert by_dept["building"]["total"] == 2 and by_dept["building"]["median_days"] == pytest.approx(4.0)
+    assert by_dept["environmental"]["median_days"] is None
+    assert tracker.facets() == {"projects": ["25-0001", "25-0002"], "counties": ["Lee County", "Palm Beach"],
+                                "depts": ["building", "environmental", "planning"]}
+
+
+def test_dispatch_outcomes(tracker):
+    pkg = package("9 Ocean Blvd", "Palm Beach", "Boynton Beach", ["building", "environmental"])
+    all_in_one = RequestTracker.dispatch_track(pkg, "AEI", {"key": "all"})
+    assert all_in_one["depts"] == ["building", "environmental"]
+    assert tracker.record_dispatch(dict(all_in_one, depts=["building"]), "failed") == 1
+    assert tracker.record_dispatch(all_in_one, "sent") == 2       # a failed row can still be sent later
+    assert ids(tracker, status="sent") == {("9 Ocean Blvd", "building"), ("9 Ocean Blvd", "environmental")}
+    assert tracker.record_dispatch(all_in_one, "failed") == 0     # sent rows stay sent